@@ -11,6 +11,7 @@ class ExampleWindow(Window):
 
         self.webcam = WebCam(0)
         self.webcam.open()
+        self.webcam.start_reader()
 
         image = self.webcam.capture()
         image.anchor_x, image.anchor_y = image.width // 2, image.height // 2
@@ -1,8 +1,23 @@
 import linecache
+import re
 
 videodev2_h = "/usr/include/linux/videodev2.h"
 now_line = 512
 
+fourcc_re = re.compile(r'v4l2_fourcc(_be)?\("(.)", *"(.)", *"(.)", *"(.)"\)')
+
+
+# The codes are printed as literals, so importing webcam.v4l2.fourcc does not
+# evaluate a few hundred v4l2_fourcc() calls. The call stays as a comment.
+def fourcc_literal(value: str) -> str:
+    be, *chars = fourcc_re.fullmatch(value).groups()
+    code = sum(ord(char) << (8 * i) for i, char in enumerate(chars))
+    if be:
+        code |= 1 << 31
+    quoted = ", ".join(f'"{char}"' for char in chars)
+    return f"0x{code:08X}  # v4l2_fourcc{be or ''}({quoted})"
+
+
 while True:
     line = linecache.getline(videodev2_h, now_line).strip()
     now_line += 1
@@ -17,4 +32,4 @@ while True:
         line = line.replace("\t", " ")[: line.find("/*")]
     _, name, value = line.split(" ", 2)
     value = value.replace("'", '"').strip()
-    print(f"{name} = {value}")
+    print(f"{name} = {fourcc_literal(value)}")
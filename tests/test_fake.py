@@ -0,0 +1,186 @@
+import gc
+import os
+from ctypes import sizeof
+
+import pytest
+
+from webcam import WebCamException
+from webcam.v4l2 import v4l2WebCam
+from webcam.v4l2.controls import V4L2_CID_BRIGHTNESS
+from webcam.v4l2.fake import v4l2FakeDevice
+from webcam.v4l2.fourcc import V4L2_PIX_FMT_MJPEG, V4L2_PIX_FMT_YUYV
+from webcam.v4l2.pool import v4l2FramePool
+from webcam.v4l2.record import _rec_index, _rec_trailer, v4l2Recorder, v4l2Recording
+from webcam.v4l2.videodev2 import V4L2_EVENT_SOURCE_CHANGE
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture
+def camera(request):
+    # Parametrized with the device's formats, the first one is captured.
+    formats = getattr(request, "param", (V4L2_PIX_FMT_YUYV,))
+    device = v4l2FakeDevice(formats, ((640, 480), (320, 240)), fps=120)
+    camera = v4l2WebCam(0, 640, 480, device=device, pixelformat=formats[0])
+    yield camera
+    camera.close()
+
+
+mjpeg = pytest.mark.parametrize(
+    "camera", [(V4L2_PIX_FMT_MJPEG, V4L2_PIX_FMT_YUYV)], indirect=True
+)
+
+
+@pytest.fixture
+def decoder():
+    decode = pytest.importorskip("webcam.v4l2.decode")
+    pytest.importorskip("PIL")
+    return decode.v4l2PILDecoder
+
+
+@mjpeg
+def test_configure_remakes_decoder(camera, decoder):
+    camera.set_decoder(decoder(640, 480, scale=2))
+    camera.configure(size=(320, 240))
+    assert camera.capture_array().shape == (120, 160, 3)
+    assert camera._decoder.size == (320, 240)
+    assert camera._decoder.scale == 2
+
+
+@mjpeg
+def test_configure_drops_decoder_without_mjpeg(camera, decoder):
+    camera.set_decoder(decoder(640, 480))
+    camera.configure(V4L2_PIX_FMT_YUYV)
+    assert camera._decoder is None
+    assert camera.capture_array().shape == (480, 640, 3)
+
+
+@mjpeg
+def test_set_decoder_checks_size(camera, decoder):
+    with pytest.raises(WebCamException):
+        camera.set_decoder(decoder(320, 240))
+
+
+@mjpeg
+def test_set_roi_remakes_decoder(camera, decoder):
+    camera.set_decoder(decoder(640, 480))
+    camera.set_roi((160, 120, 320, 240))
+    assert camera.capture_array().shape == (240, 320, 3)
+    camera.set_roi()
+    assert camera.capture_array().shape == (480, 640, 3)
+
+
+def test_set_roi_scales_default_crop(camera):
+    camera.set_roi(None, (320, 240))
+    assert camera.size == (320, 240)
+    assert camera.capture_array().shape == (240, 320, 3)
+    camera.set_roi()
+    assert camera.size == (640, 480)
+
+
+def test_source_change(camera):
+    camera.subscribe(V4L2_EVENT_SOURCE_CHANGE)
+    camera.capture_frame().release()
+    camera._fd.change_source((320, 240))
+    events = camera.process_events()
+    assert [event.type for event in events] == [V4L2_EVENT_SOURCE_CHANGE]
+    with camera.capture_frame() as frame:
+        assert len(frame.data) == 320 * 240 * 2
+    assert camera.size == (320, 240)
+
+
+@mjpeg
+def test_source_change_remakes_decoder(camera, decoder):
+    camera.set_decoder(decoder(640, 480))
+    camera.subscribe(V4L2_EVENT_SOURCE_CHANGE)
+    camera._fd.change_source((320, 240))
+    assert camera.capture_array().shape == (240, 320, 3)
+
+
+def test_subscribed_control_without_capture(camera):
+    camera.controls.subscribe(["brightness"])
+    camera._fd.set_control(V4L2_CID_BRIGHTNESS, 42)
+    assert camera.controls["brightness"] == 42
+
+
+def _pool_stats(pool):
+    (stats,) = pool.stats().values()
+    return stats
+
+
+def test_pool_refcounts():
+    pool = v4l2FramePool()
+    device = v4l2FakeDevice(sizes=((320, 240),), fps=120)
+    camera = v4l2WebCam(0, 320, 240, device=device, pool=pool)
+    try:
+        with camera.capture_raw() as frame:
+            assert _pool_stats(pool).in_use == 1
+        assert _pool_stats(pool).in_use == 0
+        frame = camera.capture_raw()
+        assert _pool_stats(pool).hits == 1
+        frame.buffer.retain()
+        frame.release()
+        assert _pool_stats(pool).in_use == 1
+        frame.buffer.release()
+        assert _pool_stats(pool).in_use == 0
+    finally:
+        camera.close()
+
+
+def test_pool_views_keep_buffer():
+    pool = v4l2FramePool()
+    device = v4l2FakeDevice(sizes=((320, 240),), fps=120)
+    camera = v4l2WebCam(0, 320, 240, device=device, pool=pool)
+    try:
+        data = camera.capture_raw().data
+        gc.collect()
+        assert _pool_stats(pool).in_use == 1
+        assert len(data) == 320 * 240 * 2
+        del data
+        gc.collect()
+        assert _pool_stats(pool).in_use == 0
+    finally:
+        camera.close()
+
+
+def _record(camera, path, count):
+    frames = []
+    with v4l2Recorder(str(path), camera, chunk_size=1 << 16) as recorder:
+        for _ in range(count):
+            with camera.capture_frame() as frame:
+                recorder.record(frame)
+                frames.append((bytes(frame.data), frame.timestamp, frame.sequence))
+    return frames
+
+
+def test_recorder_round_trip(camera, tmp_path):
+    path = tmp_path / "camera.wrec"
+    frames = _record(camera, path, 5)
+    with v4l2Recording(str(path)) as recording:
+        assert len(recording) == 5
+        assert recording.size == (640, 480)
+        assert recording.pixelformat == V4L2_PIX_FMT_YUYV
+        for (data, timestamp, sequence), frame in zip(frames, recording):
+            assert bytes(frame.data) == data
+            assert frame.timestamp == timestamp
+            assert frame.sequence == sequence
+            del frame
+        timestamps = [timestamp for _, timestamp, _ in frames]
+        assert recording.seek(timestamps[2]) == 2
+        between = list(recording.between(timestamps[1], timestamps[3]))
+        assert [frame.sequence for frame in between] == [
+            sequence for _, _, sequence in frames[1:3]
+        ]
+        del between
+
+
+def test_recording_without_index(camera, tmp_path):
+    path = tmp_path / "camera.wrec"
+    frames = _record(camera, path, 3)
+    # Cut off the index and trailer, as if the recorder never closed.
+    index = 3 * sizeof(_rec_index) + sizeof(_rec_trailer)
+    os.truncate(path, os.path.getsize(path) - index)
+    with v4l2Recording(str(path)) as recording:
+        assert [bytes(frame.data) for frame in recording] == [
+            data for data, _, _ in frames
+        ]
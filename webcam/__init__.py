@@ -1,7 +1,8 @@
 from sys import platform
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from pyglet.image import AbstractImage
+if TYPE_CHECKING:
+    from pyglet.image import AbstractImage
 
 
 class WebCamException(Exception):
@@ -31,7 +32,7 @@ class BaseWebCam:
     def close(self) -> None:
         raise NotImplementedError("this method is not implemented yet")
 
-    def capture(self) -> AbstractImage:
+    def capture(self) -> "AbstractImage":
         raise NotImplementedError("this method is not implemented yet")
 
     @property
@@ -50,3 +51,29 @@ class BaseWebCam:
 if platform.startswith("linux") or platform.startswith("freebsd"):
     from webcam.v4l2 import v4l2WebCam as WebCam
     from webcam.v4l2 import v4l2WebCamControlsManager as WebCamControlsManager
+
+    # Imported on first access, so a plain capture worker does not pay for
+    # asyncio, select.epoll bookkeeping or the discovery thread pool.
+    _lazy = {
+        "AsyncWebCam": ("webcam.v4l2.aio", "v4l2AsyncWebCam"),
+        "CameraGroup": ("webcam.v4l2.group", "v4l2CameraGroup"),
+        "FrameBus": ("webcam.v4l2.bus", "v4l2FrameBus"),
+        "BusClient": ("webcam.v4l2.bus", "v4l2BusClient"),
+        "Recorder": ("webcam.v4l2.record", "v4l2Recorder"),
+        "Recording": ("webcam.v4l2.record", "v4l2Recording"),
+        "DmabufServer": ("webcam.v4l2.share", "v4l2DmabufServer"),
+        "DmabufClient": ("webcam.v4l2.share", "v4l2DmabufClient"),
+        "FramePool": ("webcam.v4l2.pool", "v4l2FramePool"),
+        "Pipeline": ("webcam.v4l2.pipeline", "v4l2Pipeline"),
+        "discover": ("webcam.v4l2.discover", "discover"),
+        "find_device": ("webcam.v4l2.discover", "find_device"),
+    }
+
+    def __getattr__(name: str) -> Any:
+        if name not in _lazy:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        from importlib import import_module
+
+        module, attr = _lazy[name]
+        value = globals()[name] = getattr(import_module(module), attr)
+        return value
@@ -0,0 +1,293 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from io import BytesIO
+from typing import Callable
+
+from webcam import WebCam, WebCamException
+from webcam.v4l2.fake import v4l2FakeDevice
+from webcam.v4l2.pool import v4l2FramePool
+from webcam.v4l2.videodev2 import *
+
+v4l2BenchResult = namedtuple(
+    "v4l2BenchResult",
+    ["name", "iterations", "fps", "p50", "p90", "p99", "alloc_bytes", "cpu"],
+)
+
+# Raw formats whose conversion is benchmarked, one per converter code path,
+# with their bytes per pixel.
+_convert_formats = {
+    V4L2_PIX_FMT_YUYV: 2,
+    V4L2_PIX_FMT_NV12: 1.5,
+    V4L2_PIX_FMT_YUV420: 1.5,
+    V4L2_PIX_FMT_BGR24: 3,
+    V4L2_PIX_FMT_RGB565: 2,
+}
+
+
+def _percentile(samples: list[int], fraction: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))] / 1e6
+
+
+def measure(
+    name: str, fn: Callable[[], object], iterations: int, warmup: int = 10
+) -> v4l2BenchResult:
+    for _ in range(warmup):
+        fn()
+    # Timing and allocation tracking run separately, as tracemalloc slows
+    # every allocation down. CPU time is the calling thread's only, so work a
+    # simulated device does in its own thread is not charged to the frame.
+    samples = []
+    cpu = time.thread_time()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t)
+    elapsed = time.perf_counter() - start
+    cpu = time.thread_time() - cpu
+    samples.sort()
+
+    allocated = 0
+    tracemalloc.start()
+    for _ in range(min(iterations, 50)):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        allocated += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return v4l2BenchResult(
+        name=name,
+        iterations=iterations,
+        fps=iterations / elapsed,
+        p50=_percentile(samples, 0.5),
+        p90=_percentile(samples, 0.9),
+        p99=_percentile(samples, 0.99),
+        alloc_bytes=allocated // min(iterations, 50),
+        cpu=cpu / iterations * 1e3,
+    )
+
+
+def _camera(args: argparse.Namespace, pixelformat: int) -> WebCam:
+    width, height = args.size
+    if args.device is not None:
+        return WebCam(args.device, width, height, pixelformat=pixelformat)
+    device = v4l2FakeDevice((pixelformat,), (args.size,), fps=args.fps)
+    return WebCam(0, width, height, pixelformat=pixelformat, device=device)
+
+
+def _release(frame) -> None:
+    frame.release()
+
+
+def bench_capture(args: argparse.Namespace) -> list[v4l2BenchResult]:
+    camera = _camera(args, V4L2_PIX_FMT_YUYV)
+    camera.open()
+    try:
+        results = [measure("capture.copy", camera.capture_raw, args.iterations)]
+        camera.set_pool(v4l2FramePool())
+        results.append(
+            measure(
+                "capture.pooled",
+                lambda: _release(camera.capture_raw()),
+                args.iterations,
+            )
+        )
+        camera.set_pool(None)
+        return results + [
+            measure(
+                "capture.zero_copy",
+                lambda: _release(camera.capture_frame()),
+                args.iterations,
+            ),
+            measure("capture.array", camera.capture_array, args.iterations),
+        ]
+    finally:
+        camera.close()
+
+
+def bench_convert(args: argparse.Namespace) -> list[v4l2BenchResult]:
+    import numpy as np
+
+    from webcam.v4l2.convert import v4l2Converter
+
+    results = []
+    width, height = args.size
+    for pixelformat in _convert_formats:
+        converter = v4l2Converter(pixelformat, width, height)
+        size = int(width * height * _convert_formats[pixelformat])
+        data = np.random.default_rng(0).integers(0, 256, size, np.uint8)
+        out = np.empty(converter.shape, np.uint8)
+        name = f"convert.{v4l2_fourcc_str(pixelformat).strip()}"
+        results.append(
+            measure(name, lambda: converter(data, out), args.iterations),
+        )
+    return results
+
+
+def bench_decode(args: argparse.Namespace) -> list[v4l2BenchResult]:
+    import numpy as np
+    from PIL import Image
+
+    from webcam.v4l2.decode import v4l2PILDecoder, v4l2SimpleJPEGDecoder
+
+    width, height = args.size
+    gradient = np.linspace(0, 255, width * height * 3).astype(np.uint8)
+    output = BytesIO()
+    Image.fromarray(gradient.reshape(height, width, 3)).save(output, "JPEG")
+    data = output.getvalue()
+    results = []
+    for decoder_class in (v4l2SimpleJPEGDecoder, v4l2PILDecoder):
+        for scale in (1, 2, 4):
+            try:
+                decoder = decoder_class(width, height, scale)
+            except ImportError:
+                break
+            out = np.empty(decoder.shape, np.uint8)
+            name = f"decode.{decoder_class.__name__[4:-7].lower()}.1_{scale}"
+            results.append(
+                measure(name, lambda: decoder(data, out), args.iterations),
+            )
+    return results
+
+
+def bench_controls(args: argparse.Namespace) -> list[v4l2BenchResult]:
+    camera = _camera(args, V4L2_PIX_FMT_YUYV)
+    try:
+        controls = camera.controls
+        value = controls["brightness"]
+
+        def set_brightness() -> None:
+            controls["brightness"] = value
+
+        return [
+            measure("controls.get", lambda: controls["brightness"], args.iterations),
+            measure("controls.set", set_brightness, args.iterations),
+            measure(
+                "controls.get_many",
+                lambda: controls.get_many(("brightness", "contrast", "gamma")),
+                args.iterations,
+            ),
+        ]
+    finally:
+        camera.close()
+
+
+def bench_ioctl(args: argparse.Namespace) -> list[v4l2BenchResult]:
+    camera = _camera(args, V4L2_PIX_FMT_YUYV)
+    try:
+        fd = camera.handle
+        vfmt = v4l2_format(type=camera._buf_type)
+        return [
+            measure("ioctl.querycap", lambda: VIDIOC_QUERYCAP(fd), args.iterations),
+            measure("ioctl.g_fmt", lambda: VIDIOC_G_FMT(fd, vfmt), args.iterations),
+            measure("ioctl.g_fmt.bound", VIDIOC_G_FMT.bind(fd, vfmt), args.iterations),
+        ]
+    finally:
+        camera.close()
+
+
+benchmarks = {
+    "capture": bench_capture,
+    "convert": bench_convert,
+    "decode": bench_decode,
+    "controls": bench_controls,
+    "ioctl": bench_ioctl,
+}
+
+
+def compare(
+    results: dict[str, dict], baseline: dict[str, dict], threshold: float
+) -> list[str]:
+    # A benchmark regresses if its throughput drops, or its tail latency grows,
+    # by more than `threshold` relative to the baseline.
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if result["fps"] < before["fps"] * (1 - threshold):
+            regressions.append(
+                f"{name}: {result['fps']:.1f} fps, was {before['fps']:.1f} fps"
+            )
+        if result["p99"] > before["p99"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p99 {result['p99']:.3f} ms, was {before['p99']:.3f} ms"
+            )
+    return regressions
+
+
+def _size(value: str) -> tuple[int, int]:
+    width, _, height = value.partition("x")
+    return int(width), int(height)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m webcam.bench",
+        description="Benchmark the capture, conversion and decode paths.",
+    )
+    parser.add_argument(
+        "groups", nargs="*", metavar="group", help=f"one of {', '.join(benchmarks)}"
+    )
+    parser.add_argument("--size", type=_size, default=(640, 480))
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--fps", type=float, default=1000.0)
+    parser.add_argument(
+        "--device", type=int, help="use /dev/videoN instead of a simulated device"
+    )
+    parser.add_argument("--output", help="save the results to a JSON file")
+    parser.add_argument("--baseline", help="compare with a saved JSON file")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    for group in args.groups:
+        if group not in benchmarks:
+            parser.error(f"unknown benchmark group {group!r}")
+
+    results = {}
+    print(
+        f"{'benchmark':<28}{'fps':>10}{'p50 ms':>10}{'p90 ms':>10}"
+        f"{'p99 ms':>10}{'alloc B':>10}{'cpu ms':>10}"
+    )
+    for group in args.groups or benchmarks:
+        try:
+            group_results = benchmarks[group](args)
+        except (ImportError, WebCamException) as exc:
+            print(f"{group}: skipped, {exc}")
+            continue
+        for result in group_results:
+            results[result.name] = result._asdict()
+            print(
+                f"{result.name:<28}{result.fps:>10.1f}{result.p50:>10.3f}"
+                f"{result.p90:>10.3f}{result.p99:>10.3f}"
+                f"{result.alloc_bytes:>10}{result.cpu:>10.3f}"
+            )
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "size": args.size,
+        "device": "simulated" if args.device is None else f"/dev/video{args.device}",
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
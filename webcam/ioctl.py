@@ -1,5 +1,6 @@
 from ctypes import sizeof
 from fcntl import ioctl
+from functools import partial
 
 _IOC_NRBITS = 8
 _IOC_TYPEBITS = 8
@@ -25,14 +26,34 @@ def _IOC(dir, type, nr, size):
     )
 
 
+def _ioctl(fileno, request, buffer):
+    # Anything that is not a file descriptor is a device object emulating the
+    # driver in-process, like webcam.v4l2.fake.v4l2FakeDevice.
+    if isinstance(fileno, int):
+        return ioctl(fileno, request, buffer)
+    return fileno.ioctl(request, buffer)
+
+
+def _bind(fileno, request, buffer):
+    # Binding the descriptor, request and a preallocated buffer up front leaves
+    # a C-level partial, so each call is one ioctl() with no Python frame, no
+    # type check and no struct construction.
+    if isinstance(fileno, int):
+        return partial(ioctl, fileno, request, buffer)
+    return partial(fileno.ioctl, request, buffer)
+
+
 def _IOR(type, nr, struct):
     request = _IOC(_IOC_READ, ord(type), nr, sizeof(struct))
 
-    def f(fileno):
-        buffer = struct()
-        ioctl(fileno, request, buffer)
+    def f(fileno, buffer=None):
+        if buffer is None:
+            buffer = struct()
+        _ioctl(fileno, request, buffer)
         return buffer
 
+    f.request = request
+    f.bind = lambda fileno, buffer: _bind(fileno, request, buffer)
     return f
 
 
@@ -42,8 +63,15 @@ def _IOW(type, nr, struct):
     def f(fileno, buffer):
         if not isinstance(buffer, struct):
             buffer = struct(buffer)
-        ioctl(fileno, request, buffer)
+        _ioctl(fileno, request, buffer)
+
+    def bind(fileno, buffer):
+        if not isinstance(buffer, struct):
+            buffer = struct(buffer)
+        return _bind(fileno, request, buffer)
 
+    f.request = request
+    f.bind = bind
     return f
 
 
@@ -51,7 +79,9 @@ def _IOWR(type, nr, struct):
     request = _IOC(_IOC_READ | _IOC_WRITE, ord(type), nr, sizeof(struct))
 
     def f(fileno, buffer):
-        ioctl(fileno, request, buffer)
+        _ioctl(fileno, request, buffer)
         return buffer
 
+    f.request = request
+    f.bind = lambda fileno, buffer: _bind(fileno, request, buffer)
     return f
@@ -1,22 +1,44 @@
+import ctypes
+import errno
 import os
+import re
+import select
 from collections import namedtuple
-from ctypes import string_at
-from io import BytesIO
-from mmap import mmap
-
-from pyglet.image import AbstractImage, ImageData
-from pyglet.image import load as load_image
+from ctypes import addressof, c_char, memmove, sizeof, string_at
+from fractions import Fraction
+from mmap import PAGESIZE, mmap
+from threading import RLock
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Sequence
 
 from webcam import BaseWebCam, BaseWebCamControlsManager, WebCamException
 from webcam.v4l2.controls import *
 from webcam.v4l2.fourcc import *
+from webcam.v4l2.frame import v4l2Frame, v4l2RawFrame
+from webcam.v4l2.metrics import v4l2Metrics
+from webcam.v4l2.pool import v4l2FramePool, v4l2PoolBuffer, v4l2PooledRawFrame
+from webcam.v4l2.reader import v4l2FrameReader
 from webcam.v4l2.videodev2 import *
 
+if TYPE_CHECKING:
+    from numpy import ndarray
+    from pyglet.image import AbstractImage
+
+    from webcam.v4l2.convert import v4l2Converter
+    from webcam.v4l2.decode import v4l2Decoder
+    from webcam.v4l2.fake import v4l2FakeDevice
+
 v4l2ControlInfo = namedtuple(
     "v4l2ControlInfo",
-    "name cid minimum maximum default type available",
-    defaults=["", 0, 0, 0, 0, int, False],
+    "name cid minimum maximum default type available step flags ctrl_type menu",
+    defaults=["", 0, 0, 0, 0, int, False, 1, 0, 0, None],
 )
+v4l2Mode = namedtuple("v4l2Mode", "pixelformat width height fps")
+v4l2Event = namedtuple("v4l2Event", "type id sequence timestamp changes value")
+v4l2Rect = namedtuple("v4l2Rect", "left top width height")
+v4l2CropCap = namedtuple("v4l2CropCap", "bounds default pixelaspect")
+# Relative CPU cost per pixel of turning each kind of format into RGB.
+_decode_cost = {"RGB": 1, "RGBA": 1, "RAW": 2, "MJPEG": 8}
 _str2cid = {
     "brightness": V4L2_CID_BRIGHTNESS,
     "contrast": V4L2_CID_CONTRAST,
@@ -32,48 +54,122 @@ _str2cid = {
 }
 
 
+def _data_format(pixelformat: int) -> str:
+    if pixelformat in (V4L2_PIX_FMT_MJPEG, V4L2_PIX_FMT_JPEG):
+        return "MJPEG"
+    elif pixelformat in pixfmt_rgba:
+        return "RGBA"
+    elif pixelformat in pixfmt_rgb:
+        return "RGB"
+    elif pixelformat in pixfmt_raw:
+        return "RAW"
+    return v4l2_fourcc_str(pixelformat)
+
+
+def _control_key(name: str) -> str:
+    # "White Balance Temperature, Auto" -> "white_balance_temperature_auto"
+    return "_".join(re.findall(r"[a-z0-9]+", name.lower()))
+
+
+def _rect(rect: v4l2_rect) -> v4l2Rect:
+    return v4l2Rect(rect.left, rect.top, rect.width, rect.height)
+
+
+def _fract2fps(interval: v4l2_fract) -> float:
+    if interval.numerator == 0:
+        return 0.0
+    return interval.denominator / interval.numerator
+
+
 class v4l2WebCamControlsManager(BaseWebCamControlsManager):
-    def __init__(self, fd: int) -> None:
+    def __init__(
+        self,
+        fd: int,
+        metrics: v4l2Metrics | None = None,
+        lock: "RLock | None" = None,
+        poll_events: Callable[[], None] | None = None,
+    ) -> None:
         super().__init__(fd)
         self._fd = fd
+        # Shared with the camera: events update the cache and control ranges
+        # from whichever thread processes them.
+        self._lock = RLock() if lock is None else lock
+        self._poll_events = poll_events
         self._ctrl_info = {}
+        self._discovered = False
+        self._metrics = metrics
+        self._cache = {}
+        self._subscribed = set()
+
+    def _ioctl(self, stage: str, request, ctrl) -> None:
+        if self._metrics is None:
+            request(self._fd, ctrl)
+            return
+        start = perf_counter()
+        request(self._fd, ctrl)
+        self._metrics.observe(stage, perf_counter() - start)
 
     def __getitem__(self, name: str) -> int | bool:
-        if name not in self._ctrl_info:
-            self.get_info(name)
-        if not self._ctrl_info[name].available:
-            raise WebCamException(f"control {name!r} is not supported")
-        info = self._ctrl_info[name]
-        ctrl = v4l2_control(id=_str2cid[name])
-        VIDIOC_G_CTRL(self._fd, ctrl)
-        return info.type(ctrl.value)
+        # Pending events are handled first, so the cache is current even when
+        # nothing captures or processes events.
+        if self._subscribed and self._poll_events is not None:
+            self._poll_events()
+        with self._lock:
+            info = self._available(name)
+            if info.cid in self._cache:
+                return info.type(self._cache[info.cid])
+            ctrl = v4l2_control(id=info.cid)
+            self._ioctl("control.get", VIDIOC_G_CTRL, ctrl)
+            return info.type(ctrl.value)
 
     def __setitem__(self, name: str, value: int | bool) -> None:
-        if name not in self._ctrl_info:
-            self.get_info(name)
-        if not self._ctrl_info[name].available:
-            raise WebCamException(f"control {name!r} is not supported")
-        info = self._ctrl_info[name]
-        value = max(info.minimum, min(info.maximum, int(value)))
-        ctrl = v4l2_control(id=_str2cid[name], value=value)
-        VIDIOC_S_CTRL(self._fd, ctrl)
+        with self._lock:
+            info = self._available(name)
+            value = max(info.minimum, min(info.maximum, int(value)))
+            ctrl = v4l2_control(id=info.cid, value=value)
+            self._cache.pop(info.cid, None)
+            self._ioctl("control.set", VIDIOC_S_CTRL, ctrl)
 
-    def get_info(self, name: str) -> v4l2ControlInfo:
-        if name not in _str2cid:
-            raise WebCamException(f"control {name!r} is not supported")
-        if name in self._ctrl_info:
-            return self._ctrl_info[name]
-        ctrl = v4l2_queryctrl(id=_str2cid[name])
+    def __contains__(self, name: str) -> bool:
         try:
-            VIDIOC_QUERYCTRL(self._fd, ctrl)
-        except:
-            self._ctrl_info[name] = v4l2ControlInfo(cid=ctrl.id)
-            return self._ctrl_info[name]
+            return self.get_info(name).available
+        except WebCamException:
+            return False
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.discover())
+
+    def _available(self, name: str) -> v4l2ControlInfo:
+        info = self.get_info(name)
+        if not info.available:
+            raise WebCamException(f"control {name!r} is not supported")
+        return info
+
+    def _make_info(
+        self, ctrl: "v4l2_queryctrl | v4l2_query_ext_ctrl"
+    ) -> v4l2ControlInfo:
+        menu = None
+        if ctrl.type in (
+            v4l2_ctrl_type.V4L2_CTRL_TYPE_MENU,
+            v4l2_ctrl_type.V4L2_CTRL_TYPE_INTEGER_MENU,
+        ):
+            menu = {}
+            for index in range(ctrl.minimum, ctrl.maximum + 1):
+                item = v4l2_querymenu(id=ctrl.id, index=index)
+                try:
+                    self._ioctl("control.query", VIDIOC_QUERYMENU, item)
+                except OSError:
+                    # Drivers may leave holes in a menu.
+                    continue
+                if ctrl.type == v4l2_ctrl_type.V4L2_CTRL_TYPE_MENU:
+                    menu[index] = string_at(item.name).decode()
+                else:
+                    menu[index] = item.value
         if ctrl.type == v4l2_ctrl_type.V4L2_CTRL_TYPE_BOOLEAN:
             ctrl_type = bool
         else:
             ctrl_type = int
-        self._ctrl_info[name] = v4l2ControlInfo(
+        return v4l2ControlInfo(
             name=string_at(ctrl.name).decode(),
             cid=ctrl.id,
             minimum=ctrl.minimum,
@@ -81,41 +177,317 @@ class v4l2WebCamControlsManager(BaseWebCamControlsManager):
             default=ctrl.default_value,
             type=ctrl_type,
             available=True,
+            step=ctrl.step,
+            flags=ctrl.flags,
+            ctrl_type=ctrl.type,
+            menu=menu,
+        )
+
+    def get_info(self, name: str) -> v4l2ControlInfo:
+        with self._lock:
+            if name in self._ctrl_info:
+                return self._ctrl_info[name]
+            if name not in _str2cid:
+                self.discover()
+                if name not in self._ctrl_info:
+                    raise WebCamException(f"control {name!r} is not supported")
+                return self._ctrl_info[name]
+            ctrl = v4l2_queryctrl(id=_str2cid[name])
+            try:
+                self._ioctl("control.query", VIDIOC_QUERYCTRL, ctrl)
+            except:
+                self._ctrl_info[name] = v4l2ControlInfo(cid=ctrl.id)
+                return self._ctrl_info[name]
+            self._ctrl_info[name] = self._make_info(ctrl)
+            return self._ctrl_info[name]
+
+    def _query_all(self) -> Iterator["v4l2_queryctrl | v4l2_query_ext_ctrl"]:
+        # QUERY_EXT_CTRL also reports 64-bit ranges, QUERYCTRL is the fallback
+        # for kernels before 3.17. Both walk the controls with NEXT_CTRL.
+        for struct, request in (
+            (v4l2_query_ext_ctrl, VIDIOC_QUERY_EXT_CTRL),
+            (v4l2_queryctrl, VIDIOC_QUERYCTRL),
+        ):
+            ctrl = struct(id=V4L2_CTRL_FLAG_NEXT_CTRL)
+            try:
+                self._ioctl("control.query", request, ctrl)
+            except OSError as exc:
+                if exc.errno == errno.ENOTTY:
+                    continue
+                return
+            while True:
+                yield ctrl
+                ctrl = struct(id=ctrl.id | V4L2_CTRL_FLAG_NEXT_CTRL)
+                try:
+                    self._ioctl("control.query", request, ctrl)
+                except OSError:
+                    return
+
+    def discover(self) -> dict[str, v4l2ControlInfo]:
+        with self._lock:
+            if not self._discovered:
+                aliases = {cid: name for name, cid in _str2cid.items()}
+                for ctrl in self._query_all():
+                    if ctrl.type == v4l2_ctrl_type.V4L2_CTRL_TYPE_CTRL_CLASS:
+                        continue
+                    if ctrl.flags & V4L2_CTRL_FLAG_DISABLED:
+                        continue
+                    info = self._make_info(ctrl)
+                    self._ctrl_info[
+                        aliases.get(info.cid) or _control_key(info.name)
+                    ] = info
+                self._discovered = True
+            return {
+                name: info for name, info in self._ctrl_info.items() if info.available
+            }
+
+    def _ext_controls(
+        self, infos: list[v4l2ControlInfo]
+    ) -> tuple[v4l2_ext_controls, ctypes.Array]:
+        controls = (v4l2_ext_control * len(infos))()
+        for ctrl, info in zip(controls, infos):
+            ctrl.id = info.cid
+        ext = v4l2_ext_controls(
+            which=V4L2_CTRL_WHICH_CUR_VAL, count=len(infos), controls=controls
         )
-        return self._ctrl_info[name]
+        return ext, controls
+
+    def _ext_error(
+        self, exc: OSError, ext: v4l2_ext_controls, names: list[str]
+    ) -> WebCamException:
+        # error_idx equals count when the request was rejected as a whole.
+        if ext.error_idx < len(names):
+            return WebCamException(
+                f"control {names[ext.error_idx]!r} failed: {exc.strerror}"
+            )
+        return WebCamException(f"controls {names!r} failed: {exc.strerror}")
+
+    def get_many(self, names: Iterable[str]) -> dict[str, int | bool]:
+        with self._lock:
+            names = list(names)
+            infos = [self._available(name) for name in names]
+            ext, controls = self._ext_controls(infos)
+            try:
+                self._ioctl("control.get_many", VIDIOC_G_EXT_CTRLS, ext)
+            except OSError as exc:
+                if exc.errno == errno.ENOTTY:
+                    return {name: self[name] for name in names}
+                raise self._ext_error(exc, ext, names) from exc
+            result = {}
+            for name, info, ctrl in zip(names, infos, controls):
+                if info.ctrl_type == v4l2_ctrl_type.V4L2_CTRL_TYPE_INTEGER64:
+                    result[name] = ctrl.value64
+                else:
+                    result[name] = info.type(ctrl.value)
+            return result
+
+    def set_many(self, values: dict[str, int | bool]) -> None:
+        # The driver validates the whole set before applying any of it, so a
+        # profile is either applied completely or not at all.
+        with self._lock:
+            names = list(values)
+            infos = [self._available(name) for name in names]
+            ext, controls = self._ext_controls(infos)
+            for name, info, ctrl in zip(names, infos, controls):
+                if info.flags & V4L2_CTRL_FLAG_READ_ONLY:
+                    raise WebCamException(f"control {name!r} is read-only")
+                value = max(info.minimum, min(info.maximum, int(values[name])))
+                if info.ctrl_type == v4l2_ctrl_type.V4L2_CTRL_TYPE_INTEGER64:
+                    ctrl.value64 = value
+                else:
+                    ctrl.value = value
+            for info in infos:
+                self._cache.pop(info.cid, None)
+            try:
+                self._ioctl("control.set_many", VIDIOC_S_EXT_CTRLS, ext)
+            except OSError as exc:
+                if exc.errno == errno.ENOTTY:
+                    for name in names:
+                        self[name] = values[name]
+                    return
+                raise self._ext_error(exc, ext, names) from exc
+
+    def subscribe(self, names: Iterable[str] | None = None) -> None:
+        # The kernel reports every change of a subscribed control as an event,
+        # including the current value right away and changes made through this
+        # handle, so reads are served from a cache the events keep current.
+        # Volatile controls change without events and are always read.
+        with self._lock:
+            infos = (
+                self.discover().values() if names is None else map(self.get_info, names)
+            )
+            for info in infos:
+                if not info.available or info.flags & V4L2_CTRL_FLAG_VOLATILE:
+                    continue
+                subscription = v4l2_event_subscription(
+                    type=V4L2_EVENT_CTRL,
+                    id=info.cid,
+                    flags=V4L2_EVENT_SUB_FL_SEND_INITIAL
+                    | V4L2_EVENT_SUB_FL_ALLOW_FEEDBACK,
+                )
+                VIDIOC_SUBSCRIBE_EVENT(self._fd, subscription)
+                self._subscribed.add(info.cid)
+
+    def unsubscribe(self, names: Iterable[str] | None = None) -> None:
+        with self._lock:
+            if names is None:
+                cids = list(self._subscribed)
+            else:
+                cids = [self.get_info(name).cid for name in names]
+            for cid in cids:
+                if cid not in self._subscribed:
+                    continue
+                subscription = v4l2_event_subscription(type=V4L2_EVENT_CTRL, id=cid)
+                VIDIOC_UNSUBSCRIBE_EVENT(self._fd, subscription)
+                self._subscribed.discard(cid)
+                self._cache.pop(cid, None)
+
+    def _apply_event(self, event: v4l2_event) -> None:
+        with self._lock:
+            if event.id not in self._subscribed:
+                return
+            ctrl = event.u.ctrl
+            if ctrl.changes & V4L2_EVENT_CTRL_CH_VALUE:
+                if ctrl.type == v4l2_ctrl_type.V4L2_CTRL_TYPE_INTEGER64:
+                    self._cache[event.id] = ctrl.value64
+                else:
+                    self._cache[event.id] = ctrl.value
+            if ctrl.changes & (V4L2_EVENT_CTRL_CH_RANGE | V4L2_EVENT_CTRL_CH_FLAGS):
+                for name, info in self._ctrl_info.items():
+                    if info.cid == event.id and info.available:
+                        self._ctrl_info[name] = info._replace(
+                            minimum=ctrl.minimum,
+                            maximum=ctrl.maximum,
+                            step=ctrl.step,
+                            default=ctrl.default_value,
+                            flags=ctrl.flags,
+                        )
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self._subscribed)
 
 
 class v4l2WebCam(BaseWebCam):
-    def __init__(self, index: int, width: int = 640, height: int = 480) -> None:
+    _open_flags = os.O_RDWR
+
+    def __init__(
+        self,
+        index: int,
+        width: int = 640,
+        height: int = 480,
+        buffer_count: int = 4,
+        memory: v4l2_memory = v4l2_memory.V4L2_MEMORY_MMAP,
+        buffers: Sequence | None = None,
+        pixelformat: int | None = None,
+        device: "v4l2FakeDevice | None" = None,
+        metrics: v4l2Metrics | None = None,
+        pool: v4l2FramePool | None = None,
+    ) -> None:
         super().__init__(index, width, height)
-        self._device = f"/dev/video{index}"
-        self._fd = os.open(self._device, os.O_RDWR)
+        if device is None:
+            self._device = f"/dev/video{index}"
+            self._fd = os.open(self._device, self._open_flags)
+        else:
+            self._device = device.path
+            self._fd = device
+            device.open(self._open_flags)
         self._data_fmt = ""
-        self._controls = v4l2WebCamControlsManager(self._fd)
+        self._pixelformat = pixelformat
+        self._metrics = metrics
+        self._pool = pool
+        # Guards the control and format state against the reader thread or a
+        # CameraGroup processing events while the caller uses the camera.
+        self._lock = RLock()
+        self._controls = v4l2WebCamControlsManager(
+            self._fd, metrics, self._lock, self._poll_events
+        )
         self._available_pixfmt = []
+        self._buffer_count = buffer_count
+        self._memory = v4l2_memory(memory)
+        self._user_buffers = buffers
+        self._buffers = []
         self._mmaps = []
+        self._slots = []
+        self._planes = []
+        self._vplanes = []
+        self._dqplanes = None
+        self._vbuffers = []
+        self._dmabufs = []
+        self._qbuf_calls = []
+        self._dqbuf = v4l2_buffer()
+        self._dqbuf_call = None
+        self._dequeued = set()
+        self._reader = None
+        self._decoder = None
+        self._frames = 0
+        self._lost_frames = 0
+        self._gaps = 0
+        self._last_sequence = None
+        self._events = set()
+        self._event_poll = None
+        self._event_handler = None
+        self._source_changed = False
+        self._eos = False
 
+        self._check_buffer_count(buffer_count)
+        start = perf_counter()
         self._check()
+        self._observe("init.query", start)
         self._init()
 
     def __del__(self) -> None:
         if self._is_open:
             self.close()
-        for m in self._mmaps:
-            m.close()
-        os.close(self._fd)
+        self._free_buffers()
+        if isinstance(self._fd, int):
+            os.close(self._fd)
+        else:
+            self._fd.close()
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(device={self._device!r})"
 
+    def fileno(self) -> int:
+        if isinstance(self._fd, int):
+            return self._fd
+        return self._fd.fileno()
+
+    @property
+    def handle(self) -> "int | v4l2FakeDevice":
+        # What the VIDIOC_* wrappers take: the descriptor, or the simulated
+        # device, whose fileno() only signals readiness.
+        return self._fd
+
+    def _mmap(self, length: int, offset: int) -> mmap:
+        if isinstance(self._fd, int):
+            return mmap(self._fd, length=length, offset=offset)
+        return self._fd.mmap(length, offset)
+
+    def _observe(self, stage: str, start: float) -> None:
+        if self._metrics is not None:
+            self._metrics.observe(stage, perf_counter() - start)
+
     def _check(self) -> None:
         self._capability = VIDIOC_QUERYCAP(self._fd)
-        if not self._capability.capabilities & V4L2_CAP_VIDEO_CAPTURE:
+        capabilities = self._capability.capabilities
+        if capabilities & V4L2_CAP_DEVICE_CAPS:
+            capabilities = self._capability.device_caps
+        # Many SoC ISPs only offer the multi-planar API, even for formats that
+        # fit in one plane.
+        if capabilities & V4L2_CAP_VIDEO_CAPTURE:
+            self._buf_type = v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE
+        elif capabilities & V4L2_CAP_VIDEO_CAPTURE_MPLANE:
+            self._buf_type = v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE_MPLANE
+        else:
             raise WebCamException(f"{self._device} can not capture video")
-        if not self._capability.capabilities & V4L2_CAP_STREAMING:
+        self._mplane = (
+            self._buf_type == v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE_MPLANE
+        )
+        if not capabilities & V4L2_CAP_STREAMING:
             raise WebCamException(f"{self._device} does not support streaming")
 
-        vfmt = v4l2_fmtdesc(index=0, type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE)
+        vfmt = v4l2_fmtdesc(index=0, type=self._buf_type)
         while True:
             try:
                 VIDIOC_ENUM_FMT(self._fd, vfmt)
@@ -125,77 +497,900 @@ class v4l2WebCam(BaseWebCam):
             self._available_pixfmt.append(vfmt.pixelformat)
 
     def _init(self) -> None:
-        vfmt = v4l2_format(type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE)
-        vfmt.fmt.pix.width = self._size[0]
-        vfmt.fmt.pix.height = self._size[1]
-        if V4L2_PIX_FMT_MJPEG in self._available_pixfmt:
+        vfmt = v4l2_format(type=self._buf_type)
+        pix = vfmt.fmt.pix_mp if self._mplane else vfmt.fmt.pix
+        pix.width = self._size[0]
+        pix.height = self._size[1]
+        if self._pixelformat is not None:
+            if self._pixelformat not in self._available_pixfmt:
+                raise WebCamException(
+                    f"{self._device} does not support "
+                    f"{v4l2_fourcc_str(self._pixelformat)} format"
+                )
+            self._data_fmt = _data_format(self._pixelformat)
+            pix.pixelformat = self._pixelformat
+        elif V4L2_PIX_FMT_MJPEG in self._available_pixfmt:
             self._data_fmt = "MJPEG"
-            vfmt.fmt.pix.pixelformat = V4L2_PIX_FMT_MJPEG
+            pix.pixelformat = V4L2_PIX_FMT_MJPEG
         elif any(l := [fmt in self._available_pixfmt for fmt in pixfmt_rgba]):
             self._data_fmt = "RGBA"
-            vfmt.fmt.pix.pixelformat = pixfmt_rgba[l.index(True)]
+            pix.pixelformat = pixfmt_rgba[l.index(True)]
         elif any(l := [fmt in self._available_pixfmt for fmt in pixfmt_rgb]):
             self._data_fmt = "RGB"
-            vfmt.fmt.pix.pixelformat = pixfmt_rgb[l.index(True)]
+            pix.pixelformat = pixfmt_rgb[l.index(True)]
+        elif any(l := [fmt in self._available_pixfmt for fmt in pixfmt_raw]):
+            self._data_fmt = "RAW"
+            pix.pixelformat = pixfmt_raw[l.index(True)]
         else:
             raise WebCamException(
-                f"{self._device} does not support RGB, RGBA or MJPEG format"
+                f"{self._device} does not support RGB, RGBA, YUV or MJPEG format"
             )
+        start = perf_counter()
         VIDIOC_S_FMT(self._fd, vfmt)
-        self._size = (vfmt.fmt.pix.width, vfmt.fmt.pix.height)
+        self._observe("init.s_fmt", start)
+        self._size = (pix.width, pix.height)
+        self._pixelformat = pix.pixelformat
+        if self._mplane:
+            planes = pix.plane_fmt[: pix.num_planes]
+            self._num_planes = pix.num_planes
+            self._bytesperline = planes[0].bytesperline
+            self._sizeimage = sum(plane.sizeimage for plane in planes)
+        else:
+            self._num_planes = 1
+            self._bytesperline = pix.bytesperline
+            self._sizeimage = pix.sizeimage
+        self._converter = None
+        if self._decoder is not None:
+            if self._data_fmt != "MJPEG":
+                self._decoder = None
+            elif self._decoder.size != self._size:
+                # A decoder that cannot be remade for the new size is dropped,
+                # and frames are decoded by the default decoder again.
+                try:
+                    self._decoder = self._decoder.with_size(*self._size)
+                except NotImplementedError:
+                    self._decoder = None
+
+        start = perf_counter()
+        self._request_buffers()
+        self._observe("init.buffers", start)
+
+    def _check_buffer_count(self, count: int) -> None:
+        if not 1 <= count <= VIDEO_MAX_FRAME:
+            raise WebCamException(
+                f"buffer count must be between 1 and {VIDEO_MAX_FRAME}"
+            )
 
+    def _request_buffers(self) -> None:
+        if self._mplane and self._memory != v4l2_memory.V4L2_MEMORY_MMAP:
+            raise WebCamException(
+                f"{self._device} is multi-planar, which is only supported "
+                f"with MMAP streaming"
+            )
         reqbuf = v4l2_requestbuffers(
-            count=4,
-            type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE,
-            memory=v4l2_memory.V4L2_MEMORY_MMAP,
+            count=self._buffer_count, type=self._buf_type, memory=self._memory
         )
         try:
             VIDIOC_REQBUFS(self._fd, reqbuf)
         except OSError:
-            raise WebCamException(f"{self._device} does not support mmap-streaming")
+            raise WebCamException(
+                f"{self._device} does not support {self._memory.name} streaming"
+            )
+        if reqbuf.count == 0:
+            raise WebCamException(f"{self._device} did not grant any buffer")
+
+        if self._memory == v4l2_memory.V4L2_MEMORY_MMAP:
+            for i in range(reqbuf.count):
+                buffer = v4l2_buffer(index=i, type=reqbuf.type, memory=self._memory)
+                if self._mplane:
+                    planes = (v4l2_plane * VIDEO_MAX_PLANES)()
+                    buffer.m.planes, buffer.length = planes, VIDEO_MAX_PLANES
+                VIDIOC_QUERYBUF(self._fd, buffer)
+                if self._mplane:
+                    # Every plane has an offset of its own to be mapped at.
+                    views = []
+                    for plane in planes[: buffer.length]:
+                        m = self._mmap(plane.length, plane.m.memoffset)
+                        self._mmaps.append(m)
+                        views.append(memoryview(m))
+                    self._planes.append(views)
+                    self._buffers.append(views[0])
+                    self._slots.append((planes[0].m.memoffset, planes[0].length))
+                    continue
+                m = self._mmap(buffer.length, buffer.m.offset)
+                self._mmaps.append(m)
+                self._buffers.append(memoryview(m))
+                self._slots.append((buffer.m.offset, buffer.length))
+        elif self._memory == v4l2_memory.V4L2_MEMORY_USERPTR:
+            buffers = self._user_buffers
+            if buffers is None:
+                # Anonymous mappings are always page-aligned.
+                buffers = [mmap(-1, self._sizeimage) for _ in range(reqbuf.count)]
+                self._mmaps.extend(buffers)
+            if len(buffers) < reqbuf.count:
+                raise WebCamException(f"{self._device} needs {reqbuf.count} buffers")
+            for obj in buffers[: reqbuf.count]:
+                view = memoryview(obj).cast("B")
+                self._buffers.append(view)
+                if view.readonly or view.nbytes < self._sizeimage:
+                    raise WebCamException(
+                        f"userptr buffers must be writable and hold "
+                        f"{self._sizeimage} bytes"
+                    )
+                address = addressof(c_char.from_buffer(view))
+                if address % PAGESIZE:
+                    raise WebCamException("userptr buffers must be page-aligned")
+                self._slots.append((address, view.nbytes))
+        elif self._memory == v4l2_memory.V4L2_MEMORY_DMABUF:
+            fds = self._user_buffers
+            if fds is None or len(fds) < reqbuf.count:
+                raise WebCamException(f"{self._device} needs {reqbuf.count} dmabufs")
+            for fd in fds[: reqbuf.count]:
+                length = os.lseek(fd, 0, os.SEEK_END)
+                m = mmap(fd, length)
+                self._mmaps.append(m)
+                self._buffers.append(memoryview(m))
+                self._slots.append((fd, length))
+        else:
+            raise WebCamException(f"{self._memory.name} is not supported")
+        self._bind_buffers()
+
+    def _bind_buffers(self) -> None:
+        # Every slot gets its own v4l2_buffer bound to QBUF, and DQBUF writes into
+        # one shared struct, so a frame round trip constructs no ctypes objects.
+        # Multi-planar slots get their own plane array too.
+        buf_type = self._buf_type
+        for index, (slot, length) in enumerate(self._slots):
+            buffer = v4l2_buffer(index=index, type=buf_type, memory=self._memory)
+            if self._mplane:
+                planes = (v4l2_plane * self._num_planes)()
+                buffer.m.planes, buffer.length = planes, self._num_planes
+                self._vplanes.append(planes)
+            elif self._memory == v4l2_memory.V4L2_MEMORY_USERPTR:
+                buffer.m.userptr, buffer.length = slot, length
+            elif self._memory == v4l2_memory.V4L2_MEMORY_DMABUF:
+                buffer.m.fd, buffer.length = slot, length
+            self._vbuffers.append(buffer)
+            self._qbuf_calls.append(VIDIOC_QBUF.bind(self._fd, buffer))
+        self._dqbuf = v4l2_buffer(type=buf_type, memory=self._memory)
+        if self._mplane:
+            self._dqplanes = (v4l2_plane * self._num_planes)()
+            self._dqbuf.m.planes = self._dqplanes
+            self._dqbuf.length = self._num_planes
+        self._dqbuf_call = VIDIOC_DQBUF.bind(self._fd, self._dqbuf)
+
+    def _free_buffers(self) -> None:
+        for fds in self._dmabufs:
+            for fd in fds:
+                os.close(fd)
+        self._dmabufs = []
+        for view in self._buffers:
+            view.release()
+        for views in self._planes:
+            for view in views:
+                view.release()
+        for m in self._mmaps:
+            m.close()
+        self._buffers, self._mmaps, self._slots = [], [], []
+        self._planes, self._vplanes = [], []
+        self._vbuffers, self._qbuf_calls, self._dqbuf_call = [], [], None
+        reqbuf = v4l2_requestbuffers(count=0, type=self._buf_type, memory=self._memory)
+        try:
+            VIDIOC_REQBUFS(self._fd, reqbuf)
+        except OSError:
+            pass
+
+    def export_buffers(self) -> list[tuple[int, ...]]:
+        # One dmabuf per plane of every buffer, exported once per allocation
+        # and closed with the buffers. The descriptors stay owned by the camera.
+        if self._memory != v4l2_memory.V4L2_MEMORY_MMAP:
+            raise WebCamException("only MMAP buffers can be exported")
+        if not self._dmabufs:
+            dmabufs = []
+            try:
+                for index in range(len(self._buffers)):
+                    fds = []
+                    for plane in range(self._num_planes if self._mplane else 1):
+                        expbuf = v4l2_exportbuffer(
+                            type=self._buf_type,
+                            index=index,
+                            plane=plane,
+                            flags=os.O_CLOEXEC | os.O_RDONLY,
+                        )
+                        VIDIOC_EXPBUF(self._fd, expbuf)
+                        fds.append(expbuf.fd)
+                    dmabufs.append(tuple(fds))
+            except OSError as exc:
+                dmabufs.append(tuple(fds))
+                for fds in dmabufs:
+                    for fd in fds:
+                        os.close(fd)
+                raise WebCamException(
+                    f"{self._device} can not export buffers: {exc.strerror}"
+                )
+            self._dmabufs = dmabufs
+        return list(self._dmabufs)
+
+    def _queue(self, index: int) -> None:
+        self._qbuf_calls[index]()
+
+    def reallocate(
+        self,
+        buffer_count: int | None = None,
+        memory: v4l2_memory | None = None,
+        buffers: Sequence | None = None,
+    ) -> None:
+        if self._dequeued:
+            raise WebCamException("all frames must be released before reallocating")
+        if buffer_count is not None:
+            self._check_buffer_count(buffer_count)
+        self.stop_reader()
+        with self._lock:
+            is_open = self._is_open
+            self.close()
+            self._free_buffers()
+            if buffer_count is not None:
+                self._buffer_count = buffer_count
+            if memory is not None:
+                self._memory = v4l2_memory(memory)
+                self._user_buffers = None
+            if buffers is not None:
+                self._user_buffers = buffers
+            self._request_buffers()
+            if is_open:
+                self.open()
+
+    def _frame_sizes(self, pixelformat: int) -> list[tuple[int, int]]:
+        frmsize = v4l2_frmsizeenum(index=0, pixel_format=pixelformat)
+        sizes = []
+        while True:
+            try:
+                VIDIOC_ENUM_FRAMESIZES(self._fd, frmsize)
+            except OSError:
+                break
+            if frmsize.type == v4l2_frmsizetypes.V4L2_FRMSIZE_TYPE_DISCRETE:
+                sizes.append((frmsize.discrete.width, frmsize.discrete.height))
+            else:
+                # Continuous and stepwise ranges are reported by their bounds.
+                stepwise = frmsize.stepwise
+                sizes.append((stepwise.min_width, stepwise.min_height))
+                sizes.append((stepwise.max_width, stepwise.max_height))
+                break
+            frmsize.index += 1
+        return sizes
+
+    def _frame_rates(self, pixelformat: int, width: int, height: int) -> list[float]:
+        frmival = v4l2_frmivalenum(
+            index=0, pixel_format=pixelformat, width=width, height=height
+        )
+        rates = []
+        while True:
+            try:
+                VIDIOC_ENUM_FRAMEINTERVALS(self._fd, frmival)
+            except OSError:
+                break
+            if frmival.type == v4l2_frmivaltypes.V4L2_FRMIVAL_TYPE_DISCRETE:
+                rates.append(_fract2fps(frmival.discrete))
+            else:
+                rates.append(_fract2fps(frmival.stepwise.max))
+                rates.append(_fract2fps(frmival.stepwise.min))
+                break
+            frmival.index += 1
+        return rates or [0.0]
+
+    def modes(self) -> list[v4l2Mode]:
+        modes = []
+        for pixelformat in self._available_pixfmt:
+            for width, height in self._frame_sizes(pixelformat):
+                for fps in self._frame_rates(pixelformat, width, height):
+                    modes.append(v4l2Mode(pixelformat, width, height, fps))
+        return modes
+
+    def best_mode(
+        self,
+        objective: str = "throughput",
+        min_size: tuple[int, int] = (0, 0),
+        max_size: tuple[int, int] | None = None,
+        min_fps: float = 0.0,
+        formats: Sequence[int] | None = None,
+    ) -> v4l2Mode | None:
+        candidates = []
+        for mode in self.modes():
+            if formats is not None and mode.pixelformat not in formats:
+                continue
+            if mode.width < min_size[0] or mode.height < min_size[1]:
+                continue
+            if max_size is not None and (
+                mode.width > max_size[0] or mode.height > max_size[1]
+            ):
+                continue
+            if mode.fps < min_fps:
+                continue
+            candidates.append(mode)
+
+        if objective == "throughput":
+            return max(
+                candidates,
+                key=lambda m: (m.width * m.height * m.fps, m.fps),
+                default=None,
+            )
+        elif objective == "decode_cost":
+            candidates = [
+                m for m in candidates if _data_format(m.pixelformat) in _decode_cost
+            ]
+            return min(
+                candidates,
+                key=lambda m: (
+                    _decode_cost[_data_format(m.pixelformat)]
+                    * m.width
+                    * m.height
+                    * m.fps,
+                    -m.width * m.height * m.fps,
+                ),
+                default=None,
+            )
+        raise WebCamException(f"unknown objective {objective!r}")
+
+    def configure(
+        self,
+        pixelformat: int | None = None,
+        size: tuple[int, int] | None = None,
+        fps: float | None = None,
+    ) -> None:
+        if self._dequeued:
+            raise WebCamException("all frames must be released before configuring")
+        # The reader is joined before taking the lock it may be waiting for.
+        self.stop_reader()
+        with self._lock:
+            is_open = self._is_open
+            self.close()
+            if pixelformat is not None or size is not None:
+                self._free_buffers()
+                if pixelformat is not None:
+                    self._pixelformat = pixelformat
+                if size is not None:
+                    self._size = tuple(size)
+                self._init()
+            if fps is not None:
+                parm = v4l2_streamparm(type=self._buf_type)
+                VIDIOC_G_PARM(self._fd, parm)
+                if not parm.parm.capture.capability & V4L2_CAP_TIMEPERFRAME:
+                    raise WebCamException(
+                        f"{self._device} does not support setting fps"
+                    )
+                interval = Fraction(fps).limit_denominator(1001)
+                parm.parm.capture.timeperframe.numerator = interval.denominator
+                parm.parm.capture.timeperframe.denominator = interval.numerator
+                VIDIOC_S_PARM(self._fd, parm)
+            if is_open:
+                self.open()
+
+    def cropcap(self) -> v4l2CropCap:
+        # The selection API takes the single-planar type for either kind of
+        # device.
+        cropcap = v4l2_cropcap(type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE)
+        try:
+            VIDIOC_CROPCAP(self._fd, cropcap)
+        except OSError:
+            raise WebCamException(f"{self._device} does not support cropping")
+        aspect = cropcap.pixelaspect
+        return v4l2CropCap(
+            _rect(cropcap.bounds),
+            _rect(cropcap.defrect),
+            Fraction(aspect.numerator or 1, aspect.denominator or 1),
+        )
 
-        for i in range(reqbuf.count):
-            buffer = v4l2_buffer(
-                index=i, type=reqbuf.type, memory=v4l2_memory.V4L2_MEMORY_MMAP
+    def selection(self, target: int = V4L2_SEL_TGT_CROP) -> v4l2Rect:
+        selection = v4l2_selection(
+            type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE, target=target
+        )
+        try:
+            VIDIOC_G_SELECTION(self._fd, selection)
+        except OSError:
+            raise WebCamException(
+                f"{self._device} does not support selection target {target:#x}"
             )
-            VIDIOC_QUERYBUF(self._fd, buffer)
-            VIDIOC_QBUF(self._fd, buffer)
-            self._mmaps.append(
-                mmap(self._fd, length=buffer.length, offset=buffer.m.offset)
+        return _rect(selection.r)
+
+    def _select(
+        self,
+        selections: list[tuple[int, tuple[int, int, int, int], int]],
+        size: tuple[int, int] | None = None,
+    ) -> list[v4l2Rect]:
+        # Drivers refuse to change the selection while buffers are allocated,
+        # and a new crop or compose rectangle changes the format, so buffers
+        # are renegotiated around it and shrink with the region.
+        if self._dequeued:
+            raise WebCamException("all frames must be released before selecting")
+        self.stop_reader()
+        with self._lock:
+            is_open = self._is_open
+            self.close()
+            self._free_buffers()
+            results = []
+            try:
+                for target, rect, flags in selections:
+                    selection = v4l2_selection(
+                        type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE,
+                        target=target,
+                        flags=flags,
+                        r=v4l2_rect(*rect),
+                    )
+                    try:
+                        VIDIOC_S_SELECTION(self._fd, selection)
+                    except OSError as exc:
+                        raise WebCamException(
+                            f"{self._device} can not select {tuple(rect)} "
+                            f"for target {target:#x}: {exc.strerror}"
+                        ) from exc
+                    results.append(_rect(selection.r))
+            except Exception as exc:
+                # Buffers are brought back for whatever format the driver is
+                # left with; the selection error stays the one reported.
+                try:
+                    self._renegotiate(None, is_open)
+                except Exception as restore:
+                    raise WebCamException(
+                        f"{self._device} could not be restored after a failed "
+                        f"selection: {restore}"
+                    ) from exc
+                raise
+            self._renegotiate(size, is_open)
+            return results
+
+    def _renegotiate(self, size: tuple[int, int] | None, is_open: bool) -> None:
+        vfmt = v4l2_format(type=self._buf_type)
+        VIDIOC_G_FMT(self._fd, vfmt)
+        pix = vfmt.fmt.pix_mp if self._mplane else vfmt.fmt.pix
+        self._size = (pix.width, pix.height) if size is None else tuple(size)
+        self._init()
+        if is_open:
+            self.open()
+
+    def set_selection(
+        self, target: int, rect: tuple[int, int, int, int], flags: int = 0
+    ) -> v4l2Rect:
+        return self._select([(target, rect, flags)])[0]
+
+    def set_roi(
+        self,
+        rect: tuple[int, int, int, int] | None = None,
+        size: tuple[int, int] | None = None,
+    ) -> v4l2Rect:
+        # Crops (left, top, width, height) on the device, or the default frame
+        # when `rect` is None, and has the device scale it down to `size`.
+        # Drivers without a compose target scale to the format's size instead.
+        if rect is None:
+            rect = self.selection(V4L2_SEL_TGT_CROP_DEFAULT)
+        selections = [(V4L2_SEL_TGT_CROP, rect, 0)]
+        if size is not None:
+            compose = (0, 0, *size)
+            selection = v4l2_selection(
+                type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE,
+                target=V4L2_SEL_TGT_COMPOSE_BOUNDS,
             )
+            try:
+                VIDIOC_G_SELECTION(self._fd, selection)
+                selections.append((V4L2_SEL_TGT_COMPOSE, compose, 0))
+                size = None
+            except OSError:
+                pass
+        return self._select(selections, size)[0]
+
+    @property
+    def roi(self) -> v4l2Rect:
+        return self.selection(V4L2_SEL_TGT_CROP)
 
     def open(self) -> None:
         if self._is_open:
             return
-        VIDIOC_STREAMON(self._fd, v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE)
+        for i in range(len(self._buffers)):
+            if i not in self._dequeued:
+                self._queue(i)
+        VIDIOC_STREAMON(self._fd, self._buf_type)
+        self._last_sequence = None
         self._is_open = True
 
     def close(self) -> None:
         if not self._is_open:
             return
-        VIDIOC_STREAMOFF(self._fd, v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE)
+        self.stop_reader()
+        VIDIOC_STREAMOFF(self._fd, self._buf_type)
         self._is_open = False
 
-    def capture(self) -> AbstractImage:
+    def _requeue(self, buffer: v4l2_buffer) -> None:
+        self._dequeued.discard(buffer.index)
         if not self._is_open:
-            self.open()
-        buffer = v4l2_buffer(
-            type=v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE,
-            memory=v4l2_memory.V4L2_MEMORY_MMAP,
+            return
+        if self._metrics is None:
+            self._qbuf_calls[buffer.index]()
+        else:
+            start = perf_counter()
+            self._qbuf_calls[buffer.index]()
+            self._metrics.observe("qbuf", perf_counter() - start)
+
+    def _dequeue(self) -> v4l2Frame:
+        metrics = self._metrics
+        if metrics is None:
+            self._dqbuf_call()
+        else:
+            start = perf_counter()
+            try:
+                self._dqbuf_call()
+            except BlockingIOError:
+                metrics.count("eagain")
+                raise
+            metrics.observe("dqbuf", perf_counter() - start)
+            metrics.count("frames")
+        # The slot's own struct takes over the result, which keeps the shared
+        # DQBUF struct free for the next frame while this one is held.
+        buffer = self._vbuffers[self._dqbuf.index]
+        memmove(addressof(buffer), addressof(self._dqbuf), sizeof(v4l2_buffer))
+        self._dequeued.add(buffer.index)
+        self._frames += 1
+        # The driver numbers every frame it captures, including those it had to
+        # drop because no buffer was queued, so gaps mean lost frames.
+        if self._last_sequence is not None:
+            gap = buffer.sequence - self._last_sequence - 1
+            if gap > 0:
+                self._lost_frames += gap
+                self._gaps += 1
+                if metrics is not None:
+                    metrics.count("lost", gap)
+        self._last_sequence = buffer.sequence
+        if self._mplane:
+            return self._plane_frame(buffer)
+        data = self._buffers[buffer.index][: buffer.bytesused]
+        return v4l2Frame(self, buffer, data)
+
+    def _plane_frame(self, buffer: v4l2_buffer) -> v4l2Frame:
+        # The copied struct points at the DQBUF plane array, so the slot's own
+        # array takes over the planes before the pointer is restored.
+        planes = self._vplanes[buffer.index]
+        memmove(addressof(planes), addressof(self._dqplanes), sizeof(planes))
+        buffer.m.planes = planes
+        # The driver reports sizes per plane, the buffer's own is left at 0.
+        views = tuple(
+            view[plane.data_offset : plane.bytesused]
+            for view, plane in zip(self._planes[buffer.index], planes)
         )
-        VIDIOC_DQBUF(self._fd, buffer)
-        result = self._mmaps[buffer.index].read(buffer.length)
-        self._mmaps[buffer.index].seek(0)
-        VIDIOC_QBUF(self._fd, buffer)
-        if self._data_fmt == "MJPEG":
-            image = load_image("image.jpg", BytesIO(result))
+        buffer.bytesused = sum(len(view) for view in views)
+        if len(views) == 1:
+            return v4l2Frame(self, buffer, views[0])
+        return v4l2Frame(self, buffer, views[0], views)
+
+    def _copy(self, frame: v4l2Frame) -> bytes:
+        # Planes are stored one after the other, e.g. NV12M becomes NV12.
+        if self._metrics is None:
+            if frame._planes is not None:
+                return b"".join(frame._planes)
+            return bytes(frame.data)
+        start = perf_counter()
+        if frame._planes is not None:
+            data = b"".join(frame._planes)
         else:
-            image = ImageData(*self._size, self._data_fmt, result)
+            data = bytes(frame.data)
+        self._metrics.observe("copy", perf_counter() - start)
+        return data
+
+    def _pooled_copy(self, frame: v4l2Frame) -> v4l2PoolBuffer:
+        key = (self._pixelformat, *self._size)
+        if self._metrics is None:
+            buffer = self._pool.acquire(key, self._sizeimage).fill(frame.planes)
+        else:
+            start = perf_counter()
+            buffer = self._pool.acquire(key, self._sizeimage).fill(frame.planes)
+            self._metrics.observe("copy", perf_counter() - start)
+        buffer.timestamp = frame.timestamp
+        buffer.sequence = frame.sequence
+        buffer.flags = frame.flags
+        return buffer
+
+    def _snapshot(self, frame: v4l2Frame) -> "bytes | v4l2PoolBuffer":
+        # What capture() keeps of a frame once its buffer is requeued. RGB frames
+        # become the image's own pixels, so pooling them would only add a copy.
+        if self._pool is None or self._data_fmt in ("RGB", "RGBA"):
+            return self._copy(frame)
+        return self._pooled_copy(frame)
+
+    def _decode(self, data: "bytes | v4l2PoolBuffer") -> "AbstractImage":
+        # Pooled data is released once decoded.
+        if isinstance(data, v4l2PoolBuffer):
+            with data:
+                return self._decode(data.data)
+        if self._metrics is None:
+            return self._to_image(data)
+        start = perf_counter()
+        try:
+            image = self._to_image(data)
+        except Exception:
+            self._metrics.count("decode_errors")
+            raise
+        self._metrics.observe("decode", perf_counter() - start)
         return image
 
+    def _to_image(self, data: bytes) -> "AbstractImage":
+        from webcam.v4l2 import image as _image
+
+        if self._data_fmt == "MJPEG" and self._decoder is None:
+            image = _image.from_jpeg(data)
+        elif self._data_fmt in ("MJPEG", "RAW") and self._pool is not None:
+            converter = self._get_converter()
+            height, width, channels = converter.shape
+            fmt = V4L2_PIX_FMT_GREY if channels == 1 else V4L2_PIX_FMT_RGB24
+            size = height * width * channels
+            with self._pool.acquire((fmt, width, height), size) as out:
+                image = _image.from_array(converter(data, out.array(converter.shape)))
+        elif self._data_fmt in ("MJPEG", "RAW"):
+            image = _image.from_array(self._get_converter()(data))
+        elif self._data_fmt in ("RGB", "RGBA"):
+            image = _image.from_bytes(*self._size, self._data_fmt, data)
+        else:
+            raise WebCamException(
+                f"{self._device} captures {self._data_fmt}, use capture_raw() instead"
+            )
+        return image
+
+    def _get_converter(self) -> "v4l2Converter | v4l2Decoder":
+        if self._decoder is not None:
+            return self._decoder
+        if self._converter is None:
+            # numpy is only needed by the array API, raw formats and decoders.
+            if self._data_fmt == "MJPEG":
+                from webcam.v4l2.decode import default_decoder
+
+                self._converter = default_decoder(*self._size)
+            else:
+                from webcam.v4l2.convert import v4l2Converter
+
+                self._converter = v4l2Converter(
+                    self._pixelformat, *self._size, self._bytesperline
+                )
+        return self._converter
+
+    def set_decoder(self, decoder: "v4l2Decoder | None") -> None:
+        if decoder is not None and self._data_fmt != "MJPEG":
+            raise WebCamException(f"{self._device} does not capture MJPEG")
+        if decoder is not None and decoder.size != self._size:
+            width, height = decoder.size
+            raise WebCamException(
+                f"decoder is for {width}x{height} frames, "
+                f"{self._device} captures {self._size[0]}x{self._size[1]}"
+            )
+        self._decoder = decoder
+
+    def _convert(self, data, out: "ndarray | None") -> "ndarray":
+        converter = self._get_converter()
+        if self._metrics is None:
+            return converter(data, out)
+        start = perf_counter()
+        try:
+            array = converter(data, out)
+        except Exception:
+            self._metrics.count("decode_errors")
+            raise
+        self._metrics.observe("decode", perf_counter() - start)
+        return array
+
+    def set_metrics(self, metrics: v4l2Metrics | None) -> None:
+        self._metrics = metrics
+        self._controls._metrics = metrics
+
+    def set_pool(self, pool: v4l2FramePool | None) -> None:
+        self._pool = pool
+
+    def to_array(self, frame: v4l2Frame, out: "ndarray | None" = None) -> "ndarray":
+        converter = self._get_converter()
+        if out is None and (view := converter.view(frame.data)) is not None:
+            return view
+        return self._convert(frame._planes or frame.data, out)
+
+    def capture_array(self, out: "ndarray | None" = None) -> "ndarray":
+        with self.capture_frame() as frame:
+            return self._convert(frame._planes or frame.data, out)
+
+    def start_reader(self, slots: int = 4) -> None:
+        if self._reader is not None:
+            return
+        if not self._is_open:
+            self.open()
+        self._reader = v4l2FrameReader(self, slots)
+        self._reader.start()
+
+    def stop_reader(self) -> None:
+        if self._reader is None:
+            return
+        self._reader.stop()
+        self._reader = None
+
+    def subscribe(self, event_type: int, id: int = 0) -> None:
+        subscription = v4l2_event_subscription(type=event_type, id=id)
+        VIDIOC_SUBSCRIBE_EVENT(self._fd, subscription)
+        self._events.add((event_type, id))
+
+    def unsubscribe(self, event_type: int, id: int = 0) -> None:
+        subscription = v4l2_event_subscription(type=event_type, id=id)
+        VIDIOC_UNSUBSCRIBE_EVENT(self._fd, subscription)
+        self._events.discard((event_type, id))
+
+    def set_event_handler(
+        self, handler: "Callable[[v4l2WebCam, v4l2Event], None] | None"
+    ) -> None:
+        self._event_handler = handler
+
+    def process_events(self) -> list[v4l2Event]:
+        # State is updated under the lock, the handler runs outside of it so it
+        # may block or use the camera without holding up other threads.
+        events = []
+        event = v4l2_event()
+        with self._lock:
+            while True:
+                try:
+                    VIDIOC_DQEVENT(self._fd, event)
+                except OSError as exc:
+                    if exc.errno == errno.ENOENT:
+                        break
+                    raise
+                events.append(self._handle_event(event))
+                if not event.pending:
+                    break
+        if self._event_handler is not None:
+            for result in events:
+                self._event_handler(self, result)
+        return events
+
+    def _handle_event(self, event: v4l2_event) -> v4l2Event:
+        changes, value = 0, None
+        if event.type == V4L2_EVENT_CTRL:
+            self._controls._apply_event(event)
+            changes, value = event.u.ctrl.changes, event.u.ctrl.value
+        elif event.type == V4L2_EVENT_SOURCE_CHANGE:
+            changes = event.u.src_change.changes
+            if changes & V4L2_EVENT_SRC_CH_RESOLUTION:
+                self._source_changed = True
+        elif event.type == V4L2_EVENT_EOS:
+            self._eos = True
+        timestamp = event.timestamp.tv_sec + event.timestamp.tv_nsec / 1000000000
+        return v4l2Event(
+            event.type, event.id, event.sequence, timestamp, changes, value
+        )
+
+    def _poll_events(self) -> None:
+        # Pending events raise POLLPRI on the same descriptor frames use. The
+        # simulated device has no POLLPRI, but never blocks in DQEVENT.
+        with self._lock:
+            if not isinstance(self._fd, int):
+                ready = True
+            else:
+                if self._event_poll is None:
+                    self._event_poll = select.poll()
+                    self._event_poll.register(self._fd, select.POLLPRI)
+                ready = self._event_poll.poll(0)
+        if ready:
+            self.process_events()
+
+    def _apply_source_change(self) -> None:
+        # The new resolution is adopted as soon as no frame holds a buffer, by
+        # renegotiating the format and buffers without closing the device.
+        if not self._source_changed or self._dequeued:
+            return
+        reader = self._reader is not None
+        self.stop_reader()
+        with self._lock:
+            self._source_changed = False
+            vfmt = v4l2_format(type=self._buf_type)
+            VIDIOC_G_FMT(self._fd, vfmt)
+            pix = vfmt.fmt.pix_mp if self._mplane else vfmt.fmt.pix
+            self.configure(size=(pix.width, pix.height))
+        if reader:
+            self.start_reader()
+
+    def capture_frame(self) -> v4l2Frame:
+        if self._reader is not None:
+            raise WebCamException(f"{self._device} is being read by a reader thread")
+        if self._events or self._controls.subscribed:
+            self._poll_events()
+            self._apply_source_change()
+        if not self._is_open:
+            self.open()
+        return self._dequeue()
+
+    def latest(self, timeout: float | None = None) -> tuple[int, "AbstractImage"]:
+        if self._source_changed:
+            self.stop_reader()
+            self._apply_source_change()
+        if self._reader is None:
+            self.start_reader()
+        result = self._reader.latest(timeout)
+        if result is None:
+            raise WebCamException(f"{self._device} did not produce a frame in time")
+        sequence, data = result
+        return sequence, self._decode(data)
+
+    def capture_raw(self) -> v4l2RawFrame:
+        # With a pool, the copy is lent from it and goes back once released.
+        with self.capture_frame() as frame:
+            if self._pool is not None:
+                return v4l2PooledRawFrame(self._pooled_copy(frame))
+            return v4l2RawFrame(
+                self._copy(frame), frame.timestamp, frame.sequence, frame.flags
+            )
+
+    def iter_raw(self) -> Iterator[v4l2RawFrame]:
+        while True:
+            yield self.capture_raw()
+
+    def capture(self) -> "AbstractImage":
+        if self._reader is not None:
+            return self.latest()[1]
+        with self.capture_frame() as frame:
+            result = self._snapshot(frame)
+        return self._decode(result)
+
+    @property
+    def fps(self) -> float:
+        parm = v4l2_streamparm(type=self._buf_type)
+        VIDIOC_G_PARM(self._fd, parm)
+        return _fract2fps(parm.parm.capture.timeperframe)
+
+    @property
+    def pixelformat(self) -> int:
+        return self._pixelformat
+
+    @property
+    def available_formats(self) -> list[int]:
+        return list(self._available_pixfmt)
+
+    @property
+    def buffer_count(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def memory(self) -> v4l2_memory:
+        return self._memory
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    @property
+    def lost_frames(self) -> int:
+        return self._lost_frames
+
+    @property
+    def sequence_gaps(self) -> int:
+        return self._gaps
+
+    @property
+    def dropped_frames(self) -> int:
+        return 0 if self._reader is None else self._reader.drops
+
+    @property
+    def eos(self) -> bool:
+        return self._eos
+
+    @property
+    def metrics(self) -> v4l2Metrics | None:
+        return self._metrics
+
+    @property
+    def pool(self) -> v4l2FramePool | None:
+        return self._pool
+
     @property
     def controls(self) -> v4l2WebCamControlsManager:
         return self._controls
 
 
-__all__ = ("v4l2WebCamControlsManager", "v4l2WebCam")
+__all__ = (
+    "v4l2Mode",
+    "v4l2Event",
+    "v4l2Rect",
+    "v4l2CropCap",
+    "v4l2WebCamControlsManager",
+    "v4l2WebCam",
+    "v4l2Frame",
+    "v4l2RawFrame",
+    "v4l2Metrics",
+    "v4l2FramePool",
+)
@@ -0,0 +1,73 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING
+
+from webcam.v4l2 import v4l2Frame, v4l2WebCam
+
+if TYPE_CHECKING:
+    from pyglet.image import AbstractImage
+
+
+class v4l2AsyncWebCam(v4l2WebCam):
+    _open_flags = os.O_RDWR | os.O_NONBLOCK
+    _pending = None
+    _waiters = None
+
+    def __aiter__(self) -> "v4l2AsyncWebCam":
+        return self
+
+    async def __anext__(self) -> v4l2Frame:
+        # The previous frame is handed back to the driver before the next one is
+        # dequeued, so a slow consumer holds at most one buffer and the driver
+        # drops frames instead of queueing up latency.
+        if self._pending is not None:
+            self._pending.release()
+            self._pending = None
+        self._pending = await self.capture_frame_async()
+        return self._pending
+
+    def _on_readable(self) -> None:
+        waiters, self._waiters = self._waiters, []
+        asyncio.get_running_loop().remove_reader(self.fileno())
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+    async def _wait_readable(self) -> None:
+        # add_reader() replaces the callback registered for a descriptor, so
+        # concurrent awaiters share one reader that wakes all of them. Those
+        # that find no frame left wait again.
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._waiters:
+            self._waiters = []
+            loop.add_reader(self.fileno(), self._on_readable)
+        self._waiters.append(future)
+        try:
+            await future
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+                if not self._waiters:
+                    loop.remove_reader(self.fileno())
+
+    async def capture_frame_async(self) -> v4l2Frame:
+        while True:
+            try:
+                return self.capture_frame()
+            except BlockingIOError:
+                await self._wait_readable()
+
+    async def capture_async(self) -> "AbstractImage":
+        with await self.capture_frame_async() as frame:
+            result = self._snapshot(frame)
+        return self._decode(result)
+
+    def close(self) -> None:
+        if self._pending is not None:
+            self._pending.release()
+            self._pending = None
+        super().close()
+
+
+__all__ = ("v4l2AsyncWebCam",)
@@ -0,0 +1,383 @@
+import os
+import re
+import select
+import sys
+import time
+from collections import namedtuple
+from ctypes import Structure, c_double
+from ctypes import c_uint32 as _u32
+from ctypes import c_uint64 as _u64
+from ctypes import sizeof
+from mmap import PAGESIZE, mmap
+from multiprocessing.shared_memory import SharedMemory
+from threading import Event, Thread
+from typing import TYPE_CHECKING
+
+from webcam import WebCamException
+
+if TYPE_CHECKING:
+    from webcam.v4l2 import v4l2Frame, v4l2WebCam
+
+_magic = 0x53554257  # "WBUS"
+
+v4l2BusStats = namedtuple("v4l2BusStats", "frames drops lag")
+
+
+# The shared memory block starts with a header, followed by one descriptor per
+# slot and the slots' data, each slot starting on a page boundary.
+class _bus_header(Structure):
+    _fields_ = [
+        ("magic", _u32),
+        ("slots", _u32),
+        ("slot_size", _u64),
+        ("data_offset", _u64),
+        ("published", _u64),
+        ("closed", _u32),
+        ("reserved", _u32),
+    ]
+
+
+# `lock` is a seqlock: odd while the producer writes the slot, and bumped again
+# once it is complete, so a reader that sees the same even value before and
+# after reading knows the slot was not touched in between.
+class _bus_slot(Structure):
+    _fields_ = [
+        ("lock", _u64),
+        ("frame", _u64),
+        ("timestamp", c_double),
+        ("sequence", _u32),
+        ("flags", _u32),
+        ("bytesused", _u32),
+        ("pixelformat", _u32),
+        ("width", _u32),
+        ("height", _u32),
+    ]
+
+
+def _shm_name(name: str) -> str:
+    return "webcam-" + re.sub(r"\W", "_", name)
+
+
+def _attach(name: str) -> "SharedMemory | mmap":
+    # Attaching through SharedMemory before Python 3.13 registers the block with
+    # this process' resource tracker, which unlinks it under the producer when
+    # the consumer exits, so older versions map it directly.
+    try:
+        if sys.version_info >= (3, 13):
+            return SharedMemory(_shm_name(name), track=False)
+        fd = os.open(f"/dev/shm/{_shm_name(name)}", os.O_RDWR)
+    except FileNotFoundError:
+        raise WebCamException(f"no frame bus named {name!r}")
+    try:
+        return mmap(fd, 0)
+    finally:
+        os.close(fd)
+
+
+class _v4l2BusMapping:
+    def __init__(self, owner: "SharedMemory | mmap") -> None:
+        self._owner = owner
+        self._buf = memoryview(owner.buf if isinstance(owner, SharedMemory) else owner)
+        self.header = _bus_header.from_buffer(self._buf)
+        if self.header.magic != _magic:
+            raise WebCamException("shared memory block is not a frame bus")
+        self.slots = [
+            _bus_slot.from_buffer(
+                self._buf, sizeof(_bus_header) + i * sizeof(_bus_slot)
+            )
+            for i in range(self.header.slots)
+        ]
+        offset, size = self.header.data_offset, self.header.slot_size
+        self.views = [
+            self._buf[offset + i * size : offset + (i + 1) * size]
+            for i in range(self.header.slots)
+        ]
+
+    def close(self) -> None:
+        # ctypes objects and views pin the mapping, so they go first. Frames
+        # still held by the caller do too.
+        for view in self.views:
+            view.release()
+        self.header = None
+        self.slots = []
+        self.views = []
+        self._buf.release()
+        self._owner.close()
+
+
+class v4l2FrameBus(Thread):
+    # Publishes the frames of one camera into a shared memory ring that any
+    # number of v4l2BusClient in other processes read from. Each frame is copied
+    # once, out of the driver's buffer, whatever the number of readers.
+    def __init__(
+        self,
+        camera: "v4l2WebCam",
+        name: str | None = None,
+        slots: int = 8,
+        slot_size: int | None = None,
+    ) -> None:
+        if name is None:
+            name = camera._device.rsplit("/", 1)[-1]
+        super().__init__(name=f"{camera!r} bus", daemon=True)
+        if slots < 2:
+            raise WebCamException("a frame bus needs at least 2 slots")
+        self._camera = camera
+        self._bus_name = name
+        if slot_size is None:
+            slot_size = camera._sizeimage
+        # Page-aligned slots keep each frame on its own pages.
+        slot_size = -(-slot_size // PAGESIZE) * PAGESIZE
+        data_offset = sizeof(_bus_header) + slots * sizeof(_bus_slot)
+        data_offset = -(-data_offset // PAGESIZE) * PAGESIZE
+        shm = SharedMemory(_shm_name(name), True, data_offset + slots * slot_size)
+        header = _bus_header.from_buffer(shm.buf)
+        header.slots, header.slot_size = slots, slot_size
+        header.data_offset = data_offset
+        header.magic = _magic
+        del header
+        self._mapping = _v4l2BusMapping(shm)
+        self._stopped = Event()
+        self._error: BaseException | None = None
+
+    def __enter__(self) -> "v4l2FrameBus":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def publish(self, frame: "v4l2Frame") -> int:
+        mapping = self._mapping
+        header = mapping.header
+        n = header.published
+        index = n % header.slots
+        bytesused = frame.bytesused
+        if bytesused > header.slot_size:
+            raise WebCamException(
+                f"frame of {bytesused} bytes does not fit the "
+                f"{header.slot_size} byte slots of bus {self._bus_name!r}"
+            )
+        slot = mapping.slots[index]
+        slot.lock += 1
+        view, offset = mapping.views[index], 0
+        for plane in frame.planes:
+            view[offset : offset + len(plane)] = plane
+            offset += len(plane)
+        slot.frame = n
+        slot.timestamp = frame.timestamp
+        slot.sequence = frame.sequence
+        slot.flags = frame.flags
+        slot.bytesused = bytesused
+        slot.pixelformat = self._camera.pixelformat
+        slot.width, slot.height = self._camera.size
+        slot.lock += 1
+        header.published = n + 1
+        return n
+
+    def run(self) -> None:
+        camera = self._camera
+        if not camera.is_open:
+            camera.open()
+        while not self._stopped.is_set():
+            fd = camera.fileno()
+            readable, _, exceptional = select.select([fd], [], [fd], 0.1)
+            if exceptional:
+                camera.process_events()
+                camera._apply_source_change()
+            if not readable:
+                continue
+            try:
+                with camera._dequeue() as frame:
+                    self.publish(frame)
+            except Exception as exc:
+                # The ring cannot grow under attached clients, so a frame that
+                # outgrew its slots, like any other failure, ends publishing.
+                # Clients see the bus closed, and close() reports the error.
+                # The traceback would pin the shared memory through the
+                # slots in publish()'s frame.
+                self._error = exc.with_traceback(None)
+                self._mapping.header.closed = 1
+                return
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def close(self) -> None:
+        self.stop()
+        if self._mapping.header is None:
+            return
+        # Attached clients keep their mapping, they only learn that no frame
+        # will follow.
+        self._mapping.header.closed = 1
+        shm = self._mapping._owner
+        self._mapping.close()
+        shm.unlink()
+        if self._error is not None:
+            raise WebCamException(
+                f"publishing on bus {self._bus_name!r} failed: {self._error}"
+            )
+
+    @property
+    def error(self) -> BaseException | None:
+        return self._error
+
+    @property
+    def published(self) -> int:
+        return self._mapping.header.published
+
+    @property
+    def bus_name(self) -> str:
+        return self._bus_name
+
+
+class v4l2BusFrame:
+    # A view of a slot in the shared ring, nothing is copied. The producer may
+    # reuse the slot once the ring wraps around, so check `valid` after using
+    # the data, or copy it first when the consumer can fall that far behind.
+    def __init__(
+        self, client: "v4l2BusClient", index: int, lock: int, slot: _bus_slot
+    ) -> None:
+        self._slot = slot
+        self._lock = lock
+        self.index = index
+        self.timestamp = slot.timestamp
+        self.sequence = slot.sequence
+        self.flags = slot.flags
+        self.pixelformat = slot.pixelformat
+        self.size = (slot.width, slot.height)
+        self._data = client._mapping.views[index % len(client._mapping.views)][
+            : slot.bytesused
+        ]
+
+    def __enter__(self) -> "v4l2BusFrame":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def __len__(self) -> int:
+        return len(self._data) if self._data is not None else 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(index={self.index}, "
+            f"sequence={self.sequence}, valid={self.valid})"
+        )
+
+    def release(self) -> None:
+        if self._data is None:
+            return
+        self._data.release()
+        self._data = None
+        self._slot = None
+
+    @property
+    def data(self) -> memoryview:
+        if self._data is None:
+            raise WebCamException("frame has already been released")
+        return self._data
+
+    @property
+    def valid(self) -> bool:
+        return self._data is not None and self._slot.lock == self._lock
+
+    @property
+    def latency(self) -> float:
+        # Only meaningful for drivers stamping with CLOCK_MONOTONIC.
+        return time.monotonic() - self.timestamp
+
+
+class v4l2BusClient:
+    def __init__(self, name: str, poll_interval: float = 0.001) -> None:
+        self._bus_name = name
+        self._mapping = _v4l2BusMapping(_attach(name))
+        self._poll_interval = poll_interval
+        # A new client starts at the most recent frame.
+        self._next = max(0, self._mapping.header.published - 1)
+        self._frames = 0
+        self._drops = 0
+
+    def __enter__(self) -> "v4l2BusClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self._bus_name!r})"
+
+    def _read(self, n: int) -> v4l2BusFrame | None:
+        slot = self._mapping.slots[n % len(self._mapping.slots)]
+        lock = slot.lock
+        if lock & 1 or slot.frame != n:
+            return None
+        frame = v4l2BusFrame(self, n, lock, slot)
+        if slot.lock != lock:
+            frame.release()
+            return None
+        return frame
+
+    def read(
+        self, timeout: float | None = None, latest: bool = False
+    ) -> v4l2BusFrame | None:
+        # Frames come in order unless `latest` is set. Either way, frames the
+        # producer overwrote before this client got to them count as drops.
+        header = self._mapping.header
+        if header is None:
+            raise WebCamException(f"{self!r} is closed")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        slots = header.slots
+        while True:
+            published = header.published
+            if published > self._next:
+                if latest:
+                    n = published - 1
+                else:
+                    # The slot after the newest one is the next to be written.
+                    n = max(self._next, published - slots + 1)
+                frame = self._read(n)
+                if frame is not None:
+                    self._drops += n - self._next
+                    self._next = n + 1
+                    self._frames += 1
+                    return frame
+                continue
+            if header.closed:
+                raise WebCamException(f"frame bus {self._bus_name!r} was closed")
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self._poll_interval)
+
+    def __iter__(self):
+        while True:
+            try:
+                yield self.read()
+            except WebCamException:
+                if self._mapping.header is None or self._mapping.header.closed:
+                    return
+                raise
+
+    def close(self) -> None:
+        if self._mapping.header is not None:
+            self._mapping.close()
+
+    def stats(self) -> v4l2BusStats:
+        return v4l2BusStats(self._frames, self._drops, self.lag)
+
+    @property
+    def lag(self) -> int:
+        # Frames published but not read yet.
+        header = self._mapping.header
+        return 0 if header is None else max(0, header.published - self._next)
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+    @property
+    def drops(self) -> int:
+        return self._drops
+
+
+__all__ = ("v4l2BusStats", "v4l2FrameBus", "v4l2BusFrame", "v4l2BusClient")
@@ -0,0 +1,218 @@
+import numpy as np
+
+from webcam import WebCamException
+from webcam.v4l2.fourcc import *
+
+# Byte offsets of Y, U and V inside one 4-byte macropixel of packed 4:2:2.
+_packed_yuv = {
+    V4L2_PIX_FMT_YUYV: (0, 1, 3),
+    V4L2_PIX_FMT_UYVY: (1, 0, 2),
+    V4L2_PIX_FMT_YVYU: (0, 3, 1),
+    V4L2_PIX_FMT_VYUY: (1, 2, 0),
+}
+# Whether the interleaved (semi-planar) or separate (planar) chroma starts with U.
+# The multi-planar variants (NV12M...) lay each plane out the same way, only in
+# a buffer of its own.
+_semiplanar_yuv = {
+    V4L2_PIX_FMT_NV12: True,
+    V4L2_PIX_FMT_NV21: False,
+    V4L2_PIX_FMT_NV12M: True,
+    V4L2_PIX_FMT_NV21M: False,
+}
+_planar_yuv = {
+    V4L2_PIX_FMT_YUV420: True,
+    V4L2_PIX_FMT_YVU420: False,
+    V4L2_PIX_FMT_YUV420M: True,
+    V4L2_PIX_FMT_YVU420M: False,
+}
+# Byte offsets of R, G and B inside one pixel.
+_packed_rgb = {
+    V4L2_PIX_FMT_RGB24: (3, (0, 1, 2)),
+    V4L2_PIX_FMT_BGR24: (3, (2, 1, 0)),
+    V4L2_PIX_FMT_BGR32: (4, (2, 1, 0)),
+    V4L2_PIX_FMT_ABGR32: (4, (2, 1, 0)),
+    V4L2_PIX_FMT_XBGR32: (4, (2, 1, 0)),
+    V4L2_PIX_FMT_BGRA32: (4, (3, 2, 1)),
+    V4L2_PIX_FMT_BGRX32: (4, (3, 2, 1)),
+    V4L2_PIX_FMT_RGB32: (4, (1, 2, 3)),
+    V4L2_PIX_FMT_ARGB32: (4, (1, 2, 3)),
+    V4L2_PIX_FMT_XRGB32: (4, (1, 2, 3)),
+    V4L2_PIX_FMT_RGBA32: (4, (0, 1, 2)),
+    V4L2_PIX_FMT_RGBX32: (4, (0, 1, 2)),
+}
+# Shift and width of R, G and B inside a little-endian 16-bit pixel.
+_packed_rgb16 = {
+    V4L2_PIX_FMT_RGB565: ((11, 5), (5, 6), (0, 5)),
+    V4L2_PIX_FMT_RGB555: ((10, 5), (5, 5), (0, 5)),
+    V4L2_PIX_FMT_XRGB555: ((10, 5), (5, 5), (0, 5)),
+    V4L2_PIX_FMT_ARGB555: ((10, 5), (5, 5), (0, 5)),
+}
+_convertible = {
+    *_packed_yuv,
+    *_semiplanar_yuv,
+    *_planar_yuv,
+    *_packed_rgb,
+    *_packed_rgb16,
+    V4L2_PIX_FMT_GREY,
+}
+
+
+class v4l2Converter:
+    def __init__(
+        self, pixelformat: int, width: int, height: int, bytesperline: int = 0
+    ) -> None:
+        if pixelformat not in _convertible:
+            raise WebCamException(f"pixel format {pixelformat:#x} is not convertible")
+        self._pixelformat = pixelformat
+        self._width = width
+        self._height = height
+        self._bytesperline = bytesperline
+        self._channels = 1 if pixelformat == V4L2_PIX_FMT_GREY else 3
+        self._scratch = {}
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        return (self._height, self._width, self._channels)
+
+    def _buffer(self, name: str, shape: tuple, dtype: type) -> np.ndarray:
+        # Temporaries are allocated once per converter and reused, so the steady
+        # state of a capture loop does not allocate.
+        array = self._scratch.get(name)
+        if array is None or array.shape != shape:
+            array = self._scratch[name] = np.empty(shape, dtype)
+        return array
+
+    def _rows(self, data: np.ndarray, offset: int, rows: int, pitch: int, width: int):
+        return data[offset : offset + rows * pitch].reshape(rows, pitch)[:, :width]
+
+    def _plane(self, planes: list | None, raw, index: int, offset: int) -> tuple:
+        # Where plane `index` starts: in a buffer of its own for multi-planar
+        # frames, `offset` bytes into the only buffer otherwise.
+        if planes is None:
+            return raw, offset
+        return planes[index], 0
+
+    def view(self, data) -> np.ndarray | None:
+        # Returns the frame as an (H, W, C) array without copying if its memory
+        # layout already is RGB or grey, otherwise None.
+        fmt, w, h = self._pixelformat, self._width, self._height
+        if isinstance(data, (tuple, list)):
+            data = data[0]
+        raw = np.frombuffer(data, np.uint8)
+        if fmt == V4L2_PIX_FMT_GREY:
+            pitch = self._bytesperline or w
+            return self._rows(raw, 0, h, pitch, w)[:, :, None]
+        if fmt == V4L2_PIX_FMT_RGB24:
+            pitch = self._bytesperline or w * 3
+            return self._rows(raw, 0, h, pitch, w * 3).reshape(h, w, 3)
+        return None
+
+    def yuv(self, data) -> tuple | None:
+        # The Y, U and V planes of a YUV frame as views of its buffer, followed
+        # by how many rows and columns share one chroma sample. None for
+        # formats that are not YUV.
+        fmt, w, h = self._pixelformat, self._width, self._height
+        if fmt not in _packed_yuv and fmt not in _semiplanar_yuv:
+            if fmt not in _planar_yuv:
+                return None
+        # `data` is one buffer, or a sequence with one buffer per plane.
+        planes = None
+        if isinstance(data, (tuple, list)):
+            planes = [np.frombuffer(plane, np.uint8) for plane in data]
+            if len(planes) == 1:
+                planes = None
+            data = data[0]
+        raw = np.frombuffer(data, np.uint8)
+        if fmt in _packed_yuv:
+            yi, ui, vi = _packed_yuv[fmt]
+            rows = self._rows(raw, 0, h, self._bytesperline or w * 2, w * 2)
+            return rows[:, yi::2], rows[:, ui::4], rows[:, vi::4], 1, 2
+        pitch = self._bytesperline or w
+        y = self._rows(raw, 0, h, pitch, w)
+        if fmt in _semiplanar_yuv:
+            uv = self._rows(*self._plane(planes, raw, 1, h * pitch), h // 2, pitch, w)
+            u, v = uv[:, 0::2], uv[:, 1::2]
+            if not _semiplanar_yuv[fmt]:
+                u, v = v, u
+            return y, u, v, 2, 2
+        size = h // 2 * (pitch // 2)
+        cb = self._plane(planes, raw, 1, h * pitch)
+        cr = self._plane(planes, raw, 2, h * pitch + size)
+        cb = self._rows(*cb, h // 2, pitch // 2, w // 2)
+        cr = self._rows(*cr, h // 2, pitch // 2, w // 2)
+        u, v = (cb, cr) if _planar_yuv[fmt] else (cr, cb)
+        return y, u, v, 2, 2
+
+    def __call__(self, data, out: np.ndarray | None = None) -> np.ndarray:
+        if out is None:
+            out = np.empty(self.shape, np.uint8)
+        elif out.shape != self.shape or out.dtype != np.uint8:
+            raise WebCamException(f"output must be a uint8 array of shape {self.shape}")
+        yuv = self.yuv(data)
+        if yuv is not None:
+            self.convert_yuv(*yuv, out)
+            return out
+        fmt, w, h = self._pixelformat, self._width, self._height
+        if isinstance(data, (tuple, list)):
+            data = data[0]
+        raw = np.frombuffer(data, np.uint8)
+        if fmt in _packed_rgb:
+            bpp, (ri, gi, bi) = _packed_rgb[fmt]
+            rows = self._rows(raw, 0, h, self._bytesperline or w * bpp, w * bpp)
+            pixels = rows.reshape(h, w, bpp)
+            out[..., 0] = pixels[..., ri]
+            out[..., 1] = pixels[..., gi]
+            out[..., 2] = pixels[..., bi]
+        elif fmt in _packed_rgb16:
+            rows = self._rows(raw, 0, h, self._bytesperline or w * 2, w * 2)
+            pixels = rows.view("<u2")
+            s = self._buffer("s16", (h, w), np.uint16)
+            t = self._buffer("t16", (h, w), np.uint16)
+            for channel, (shift, bits) in enumerate(_packed_rgb16[fmt]):
+                # Extend each field to 8 bits by replicating its high bits.
+                np.right_shift(pixels, shift, out=s)
+                np.bitwise_and(s, (1 << bits) - 1, out=s)
+                np.left_shift(s, 8 - bits, out=t)
+                np.right_shift(s, 2 * bits - 8, out=s)
+                np.bitwise_or(s, t, out=s)
+                out[..., channel] = s
+        else:
+            out[...] = self.view(raw)
+        return out
+
+    def convert_yuv(self, y, u, v, sy: int, sx: int, out: np.ndarray) -> None:
+        # ITU-R BT.601 limited range, in 8.8 fixed point. `sy` rows and `sx`
+        # columns of Y share one U and V sample; the planes may be any strided
+        # views, e.g. a crop or every nth pixel of a frame.
+        h, w = y.shape
+        ch, cw = u.shape
+        c = self._buffer("c", (h, w), np.int32)
+        t = self._buffer("t32", (h, w), np.int32)
+        d = self._buffer("d", (ch, cw), np.int32)
+        e = self._buffer("e", (ch, cw), np.int32)
+        k = self._buffer("k", (ch, cw), np.int32)
+        m = self._buffer("m", (ch, cw), np.int32)
+        # Ufuncs allocate an iteration buffer per call when an operand is not
+        # contiguous, casts or broadcasts, so only copyto() touches the strided
+        # planes and the arithmetic runs on contiguous scratch arrays.
+        np.copyto(c, y)
+        np.subtract(c, 16, out=c)
+        np.multiply(c, 298, out=c)
+        np.add(c, 128, out=c)
+        np.copyto(d, u)
+        np.subtract(d, 128, out=d)
+        np.copyto(e, v)
+        np.subtract(e, 128, out=e)
+        t4 = t.reshape(ch, sy, cw, sx)
+        for channel, (du, ev) in enumerate(((0, 409), (-100, -208), (516, 0))):
+            np.multiply(d, du, out=k)
+            np.multiply(e, ev, out=m)
+            np.add(k, m, out=k)
+            np.copyto(t4, k[:, None, :, None])
+            np.add(t, c, out=t)
+            np.right_shift(t, 8, out=t)
+            np.clip(t, 0, 255, out=t)
+            np.copyto(out[..., channel], t, casting="unsafe")
+
+
+__all__ = ("v4l2Converter",)
@@ -0,0 +1,181 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from io import BytesIO
+
+import numpy as np
+
+from webcam import WebCamException
+
+
+class v4l2Decoder:
+    def __init__(self, width: int, height: int, scale: int = 1) -> None:
+        if scale not in (1, 2, 4, 8):
+            raise WebCamException("scale must be 1, 2, 4 or 8")
+        self._width = width
+        self._height = height
+        self._scale = scale
+
+    def __call__(self, data, out: np.ndarray | None = None) -> np.ndarray:
+        raise NotImplementedError("this method is not implemented yet")
+
+    def view(self, data) -> None:
+        return None
+
+    def with_scale(self, scale: int) -> "v4l2Decoder":
+        # The same decoder for the same frames, decoding at another scale.
+        raise NotImplementedError("this method is not implemented yet")
+
+    def with_size(self, width: int, height: int) -> "v4l2Decoder":
+        # The same decoder at the same scale, for frames of another size.
+        raise NotImplementedError("this method is not implemented yet")
+
+    @property
+    def size(self) -> tuple[int, int]:
+        # The size of the frames it decodes, before scaling.
+        return (self._width, self._height)
+
+    @property
+    def scale(self) -> int:
+        return self._scale
+
+    @property
+    def shape(self) -> tuple[int, int, int]:
+        # JPEG DCT scaling rounds partial blocks up.
+        scale = self._scale
+        return (-(-self._height // scale), -(-self._width // scale), 3)
+
+    def _check(self, out: np.ndarray | None) -> np.ndarray:
+        if out is None:
+            return np.empty(self.shape, np.uint8)
+        if out.shape != self.shape or out.dtype != np.uint8:
+            raise WebCamException(f"output must be a uint8 array of shape {self.shape}")
+        return out
+
+
+class v4l2PILDecoder(v4l2Decoder):
+    def __init__(self, width: int, height: int, scale: int = 1) -> None:
+        super().__init__(width, height, scale)
+        from PIL import Image
+
+        self._open = Image.open
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_open"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["_width"], state["_height"], state["_scale"])
+
+    def with_scale(self, scale: int) -> "v4l2PILDecoder":
+        return v4l2PILDecoder(self._width, self._height, scale)
+
+    def with_size(self, width: int, height: int) -> "v4l2PILDecoder":
+        return v4l2PILDecoder(width, height, self._scale)
+
+    def __call__(self, data, out: np.ndarray | None = None) -> np.ndarray:
+        out = self._check(out)
+        image = self._open(BytesIO(data))
+        # draft() selects libjpeg's DCT scaling, so reduced sizes are cheaper.
+        image.draft("RGB", (out.shape[1], out.shape[0]))
+        image = image.convert("RGB")
+        if image.size != (out.shape[1], out.shape[0]):
+            image = image.resize((out.shape[1], out.shape[0]))
+        out[...] = np.asarray(image)
+        return out
+
+
+class v4l2SimpleJPEGDecoder(v4l2Decoder):
+    def __init__(self, width: int, height: int, scale: int = 1) -> None:
+        super().__init__(width, height, scale)
+        from simplejpeg import decode_jpeg
+
+        self._decode_jpeg = decode_jpeg
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_decode_jpeg"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["_width"], state["_height"], state["_scale"])
+
+    def with_scale(self, scale: int) -> "v4l2SimpleJPEGDecoder":
+        return v4l2SimpleJPEGDecoder(self._width, self._height, scale)
+
+    def with_size(self, width: int, height: int) -> "v4l2SimpleJPEGDecoder":
+        return v4l2SimpleJPEGDecoder(width, height, self._scale)
+
+    def __call__(self, data, out: np.ndarray | None = None) -> np.ndarray:
+        out = self._check(out)
+        # libjpeg-turbo scales in the DCT domain and writes straight into `out`.
+        self._decode_jpeg(
+            data,
+            colorspace="RGB",
+            min_height=out.shape[0],
+            min_width=out.shape[1],
+            min_factor=self._scale,
+            buffer=out,
+        )
+        return out
+
+
+def default_decoder(width: int, height: int, scale: int = 1) -> v4l2Decoder:
+    try:
+        return v4l2SimpleJPEGDecoder(width, height, scale)
+    except ImportError:
+        return v4l2PILDecoder(width, height, scale)
+
+
+def _decode(decoder: v4l2Decoder, data: bytes) -> np.ndarray:
+    return decoder(data)
+
+
+class v4l2DecoderPool:
+    # Not a decoder itself: frames are submitted and collected later, so it
+    # cannot be given to `set_decoder()`. Pass it the decoder to run instead.
+    def __init__(self, decoder: v4l2Decoder, workers: int | None = None) -> None:
+        self._decoder = decoder
+        self._executor = ProcessPoolExecutor(workers)
+        self._pending: deque[Future] = deque()
+
+    def __enter__(self) -> "v4l2DecoderPool":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, data) -> None:
+        self._pending.append(self._executor.submit(_decode, self._decoder, bytes(data)))
+
+    def get(self, timeout: float | None = None) -> np.ndarray:
+        # Results come back in submission order, whichever worker finishes first.
+        if not self._pending:
+            raise WebCamException("no frame has been submitted")
+        result = self._pending[0].result(timeout)
+        self._pending.popleft()
+        return result
+
+    def ready(self) -> list[np.ndarray]:
+        results = []
+        while self._pending and self._pending[0].done():
+            results.append(self._pending.popleft().result())
+        return results
+
+    def close(self) -> None:
+        for future in self._pending:
+            future.cancel()
+        self._pending.clear()
+        self._executor.shutdown()
+
+
+__all__ = (
+    "v4l2Decoder",
+    "v4l2PILDecoder",
+    "v4l2SimpleJPEGDecoder",
+    "default_decoder",
+    "v4l2DecoderPool",
+)
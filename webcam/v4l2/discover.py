@@ -0,0 +1,199 @@
+import glob
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import string_at
+from threading import Lock
+
+from webcam.v4l2.videodev2 import *
+
+# Probed devices by identity: the device a node belongs to in sysfs, its serial
+# number and which of the device's nodes it is. Reading these needs no open() of
+# the node, and a camera keeps them when it is replugged under another node, so
+# it is probed only once. Each entry carries the path it was last seen at.
+_cache: dict[tuple, "v4l2DeviceInfo | None"] = {}
+_cache_lock = Lock()
+
+
+class v4l2DeviceInfo(
+    namedtuple(
+        "v4l2DeviceInfo",
+        "index path name driver bus_info serial capabilities formats identity",
+    )
+):
+    # `identity` is what the camera is cached by, see _identity().
+    __slots__ = ()
+
+    @property
+    def can_capture(self) -> bool:
+        capture = V4L2_CAP_VIDEO_CAPTURE | V4L2_CAP_VIDEO_CAPTURE_MPLANE
+        return bool(self.capabilities & capture) and bool(
+            self.capabilities & V4L2_CAP_STREAMING
+        )
+
+
+def _sysfs(path: str) -> str:
+    return f"/sys/class/video4linux/{os.path.basename(os.path.realpath(path))}"
+
+
+def _serial(device: str) -> str:
+    # /sys/class/video4linux/videoN/device is the USB interface, the serial
+    # number belongs to the USB device above it.
+    for directory in (device, os.path.dirname(device)):
+        try:
+            with open(os.path.join(directory, "serial")) as f:
+                return f.read().strip()
+        except OSError:
+            continue
+    return ""
+
+
+def _identity(path: str) -> tuple:
+    # The sysfs device stands for the bus info QUERYCAP would report, and the
+    # node index tells a device's capture and metadata nodes apart. Raises
+    # OSError when the node is gone.
+    sysfs = _sysfs(path)
+    try:
+        with open(f"{sysfs}/index") as f:
+            index = int(f.read())
+    except (OSError, ValueError):
+        # Without sysfs, the node's device number and change time stand in.
+        st = os.stat(path)
+        return (path, st.st_rdev, st.st_ctime_ns)
+    device = os.path.realpath(f"{sysfs}/device")
+    return (device, _serial(device), index)
+
+
+def _index(path: str) -> int:
+    match = re.search(r"(\d+)$", path)
+    return int(match[1]) if match else -1
+
+
+def _probe(path: str, identity: tuple) -> v4l2DeviceInfo | None:
+    # Only QUERYCAP and ENUM_FMT, which neither touch the format nor allocate
+    # buffers, so probing a device another process streams from is harmless.
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return None
+    try:
+        cap = VIDIOC_QUERYCAP(fd)
+        if cap.capabilities & V4L2_CAP_DEVICE_CAPS:
+            capabilities = cap.device_caps
+        else:
+            capabilities = cap.capabilities
+        formats = []
+        for buf_type, flag in (
+            (v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE, V4L2_CAP_VIDEO_CAPTURE),
+            (
+                v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE_MPLANE,
+                V4L2_CAP_VIDEO_CAPTURE_MPLANE,
+            ),
+        ):
+            if not capabilities & flag:
+                continue
+            fmtdesc = v4l2_fmtdesc(index=0, type=buf_type)
+            while True:
+                try:
+                    VIDIOC_ENUM_FMT(fd, fmtdesc)
+                except OSError:
+                    break
+                formats.append(fmtdesc.pixelformat)
+                fmtdesc.index += 1
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    return v4l2DeviceInfo(
+        index=_index(path),
+        path=path,
+        name=string_at(cap.card).decode(errors="replace"),
+        driver=string_at(cap.driver).decode(errors="replace"),
+        bus_info=string_at(cap.bus_info).decode(errors="replace"),
+        serial=_serial(os.path.realpath(f"{_sysfs(path)}/device")),
+        capabilities=capabilities,
+        formats=tuple(formats),
+        identity=identity,
+    )
+
+
+def discover(
+    capture_only: bool = True,
+    refresh: bool = False,
+    pattern: str = "/dev/video*",
+    workers: int = 8,
+) -> list[v4l2DeviceInfo]:
+    paths = sorted(glob.glob(pattern), key=lambda p: (len(p), p))
+    nodes = []
+    for path in paths:
+        try:
+            nodes.append((path, _identity(path)))
+        except OSError:
+            continue
+    with _cache_lock:
+        stale = [(path, key) for path, key in nodes if refresh or key not in _cache]
+    if stale:
+        # Opening a node can block for a while on some drivers, so nodes are
+        # probed side by side.
+        with ThreadPoolExecutor(min(workers, len(stale))) as executor:
+            results = list(executor.map(_probe, *zip(*stale)))
+        with _cache_lock:
+            for (path, key), info in zip(stale, results):
+                _cache[key] = info
+    devices = []
+    with _cache_lock:
+        for path, key in nodes:
+            info = _cache.get(key)
+            if info is None:
+                continue
+            if info.path != path:
+                # The same camera, renumbered.
+                info = _cache[key] = info._replace(path=path, index=_index(path))
+            devices.append(info)
+    if capture_only:
+        devices = [info for info in devices if info.can_capture]
+    return devices
+
+
+def find_device(
+    name: str | None = None,
+    serial: str | None = None,
+    bus_info: str | None = None,
+    capabilities: int = 0,
+    pixelformat: int | None = None,
+    capture_only: bool = True,
+) -> v4l2DeviceInfo | None:
+    def matches(info: v4l2DeviceInfo) -> bool:
+        if capture_only and not info.can_capture:
+            return False
+        if name is not None and name.lower() not in info.name.lower():
+            return False
+        if serial is not None and info.serial != serial:
+            return False
+        if bus_info is not None and info.bus_info != bus_info:
+            return False
+        if info.capabilities & capabilities != capabilities:
+            return False
+        return pixelformat is None or pixelformat in info.formats
+
+    if serial is not None or bus_info is not None:
+        # A known camera is looked up in the cache and only its own node is
+        # checked to still be it, without scanning the others.
+        with _cache_lock:
+            known = [info for info in _cache.values() if info is not None]
+        for info in known:
+            if not matches(info):
+                continue
+            try:
+                if _identity(info.path) == info.identity:
+                    return info
+            except OSError:
+                pass
+    for info in discover(capture_only):
+        if matches(info):
+            return info
+    return None
+
+
+__all__ = ("v4l2DeviceInfo", "discover", "find_device")
@@ -0,0 +1,720 @@
+import ctypes
+import errno
+import itertools
+import os
+import random
+import time
+from collections import deque
+from io import BytesIO
+from mmap import PAGESIZE, mmap
+from threading import Condition, Thread
+
+from webcam.v4l2.videodev2 import *
+
+# Bytes per pixel of the packed formats, and bytes per pixel of the luma plane
+# followed by the chroma size relative to it for the planar ones.
+_packed_bpp = {
+    V4L2_PIX_FMT_YUYV: 2,
+    V4L2_PIX_FMT_UYVY: 2,
+    V4L2_PIX_FMT_YVYU: 2,
+    V4L2_PIX_FMT_VYUY: 2,
+    V4L2_PIX_FMT_RGB565: 2,
+    V4L2_PIX_FMT_RGB555: 2,
+    V4L2_PIX_FMT_RGB24: 3,
+    V4L2_PIX_FMT_BGR24: 3,
+    V4L2_PIX_FMT_RGB32: 4,
+    V4L2_PIX_FMT_BGR32: 4,
+    V4L2_PIX_FMT_RGBA32: 4,
+    V4L2_PIX_FMT_ABGR32: 4,
+    V4L2_PIX_FMT_XBGR32: 4,
+    V4L2_PIX_FMT_GREY: 1,
+}
+_planar = {
+    V4L2_PIX_FMT_NV12,
+    V4L2_PIX_FMT_NV21,
+    V4L2_PIX_FMT_YUV420,
+    V4L2_PIX_FMT_NV12M,
+    V4L2_PIX_FMT_NV21M,
+    V4L2_PIX_FMT_YUV420M,
+    V4L2_PIX_FMT_YVU420M,
+}
+# Formats with a buffer per plane, and each plane's bytes per line and size as
+# divisors of the width and of width * height.
+_multiplanar = {
+    V4L2_PIX_FMT_NV12M: ((1, 1), (1, 2)),
+    V4L2_PIX_FMT_NV21M: ((1, 1), (1, 2)),
+    V4L2_PIX_FMT_YUV420M: ((1, 1), (2, 4), (2, 4)),
+    V4L2_PIX_FMT_YVU420M: ((1, 1), (2, 4), (2, 4)),
+}
+_compressed = {V4L2_PIX_FMT_MJPEG, V4L2_PIX_FMT_JPEG, V4L2_PIX_FMT_H264}
+
+# name: (cid, type, minimum, maximum, default)
+_controls = {
+    "Brightness": (V4L2_CID_BRIGHTNESS, 1, 0, 255, 128),
+    "Contrast": (V4L2_CID_CONTRAST, 1, 0, 255, 32),
+    "Gamma": (V4L2_CID_GAMMA, 1, 72, 500, 100),
+    "Sharpness": (V4L2_CID_SHARPNESS, 1, 0, 7, 3),
+    "Horizontal Flip": (V4L2_CID_HFLIP, 2, 0, 1, 0),
+    "Vertical Flip": (V4L2_CID_VFLIP, 2, 0, 1, 0),
+    "Power Line Frequency": (V4L2_CID_POWER_LINE_FREQUENCY, 3, 0, 2, 1),
+}
+_menus = {V4L2_CID_POWER_LINE_FREQUENCY: ("Disabled", "50 Hz", "60 Hz")}
+
+_fake_index = itertools.count()
+
+
+def _error(code: int) -> OSError:
+    return OSError(code, os.strerror(code))
+
+
+class v4l2FakeDevice:
+    def __init__(
+        self,
+        formats: tuple[int, ...] = (V4L2_PIX_FMT_YUYV,),
+        sizes: tuple[tuple[int, int], ...] = ((640, 480),),
+        fps: float = 30.0,
+        drop_rate: float = 0.0,
+        jitter: float = 0.0,
+        seed: int | None = None,
+        mplane: bool = False,
+    ) -> None:
+        for fmt in formats:
+            if fmt not in _packed_bpp and fmt not in _planar | _compressed:
+                raise ValueError(f"{v4l2_fourcc_str(fmt)} can not be simulated")
+            if fmt in _multiplanar and not mplane:
+                raise ValueError(f"{v4l2_fourcc_str(fmt)} needs the mplane API")
+        self.path = f"fake:{next(_fake_index)}"
+        # Like many SoC ISPs, the multi-planar device offers no other API.
+        self._mplane = mplane
+        if mplane:
+            self._buf_type = v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE_MPLANE
+        else:
+            self._buf_type = v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE
+        self._formats = list(formats)
+        self._sizes = list(sizes)
+        self._fps = fps
+        self._drop_rate = drop_rate
+        self._jitter = jitter
+        self._random = random.Random(seed)
+        self._handlers = {
+            VIDIOC_QUERYCAP.request: self._querycap,
+            VIDIOC_ENUM_FMT.request: self._enum_fmt,
+            VIDIOC_G_FMT.request: self._g_fmt,
+            VIDIOC_S_FMT.request: self._s_fmt,
+            VIDIOC_TRY_FMT.request: self._try_fmt,
+            VIDIOC_CROPCAP.request: self._cropcap,
+            VIDIOC_G_SELECTION.request: self._g_selection,
+            VIDIOC_S_SELECTION.request: self._s_selection,
+            VIDIOC_REQBUFS.request: self._reqbufs,
+            VIDIOC_QUERYBUF.request: self._querybuf,
+            VIDIOC_EXPBUF.request: self._expbuf,
+            VIDIOC_QBUF.request: self._qbuf,
+            VIDIOC_DQBUF.request: self._dqbuf,
+            VIDIOC_STREAMON.request: self._streamon,
+            VIDIOC_STREAMOFF.request: self._streamoff,
+            VIDIOC_G_PARM.request: self._g_parm,
+            VIDIOC_S_PARM.request: self._s_parm,
+            VIDIOC_G_CTRL.request: self._g_ctrl,
+            VIDIOC_S_CTRL.request: self._s_ctrl,
+            VIDIOC_QUERYCTRL.request: self._queryctrl,
+            VIDIOC_QUERY_EXT_CTRL.request: self._query_ext_ctrl,
+            VIDIOC_QUERYMENU.request: self._querymenu,
+            VIDIOC_G_EXT_CTRLS.request: self._g_ext_ctrls,
+            VIDIOC_S_EXT_CTRLS.request: self._s_ext_ctrls,
+            VIDIOC_SUBSCRIBE_EVENT.request: self._subscribe_event,
+            VIDIOC_UNSUBSCRIBE_EVENT.request: self._unsubscribe_event,
+            VIDIOC_DQEVENT.request: self._dqevent,
+            VIDIOC_ENUM_FRAMESIZES.request: self._enum_framesizes,
+            VIDIOC_ENUM_FRAMEINTERVALS.request: self._enum_frameintervals,
+        }
+        self._ctrl_values = {cid: default for cid, *_, default in _controls.values()}
+        self._subscriptions = {}
+        self._events = deque()
+        self._event_sequence = 0
+
+        self._lock = Condition()
+        self._nonblocking = False
+        self._rfd = self._wfd = -1
+        # Every plane of every buffer is a memfd of its own, keyed by the offset
+        # it is mapped at, so it can be exported alone like a dmabuf.
+        self._memfds = {}
+        self._maps = []
+        self._patterns = []
+        self._buffer_size = 0
+        self._buffer_count = 0
+        self._plane_layout = []
+        self._incoming = deque()
+        self._done = deque()
+        self._producer = None
+        self._streaming = False
+        self._sequence = 0
+        self._pixelformat = self._formats[0]
+        self._width, self._height = self._sizes[0]
+        # The frame size the sensor delivers, the part of it that is cropped,
+        # and the size the crop is scaled down to is the format's. A compose
+        # rectangle scales the frame down even when it is not cropped.
+        self._source = self._sizes[0]
+        self._crop = (0, 0, *self._source)
+        self._composed = False
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self.path!r})"
+
+    def open(self, flags: int = os.O_RDWR) -> None:
+        # One byte sits in the pipe for every frame waiting to be dequeued, so
+        # select/epoll/asyncio see the device readable exactly like a real one.
+        self._nonblocking = bool(flags & os.O_NONBLOCK)
+        self._rfd, self._wfd = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+
+    def close(self) -> None:
+        self._streamoff(None)
+        self._free()
+        for fd in (self._rfd, self._wfd):
+            if fd >= 0:
+                os.close(fd)
+        self._rfd = self._wfd = -1
+
+    def fileno(self) -> int:
+        return self._rfd
+
+    def mmap(self, length: int, offset: int) -> mmap:
+        fd = self._memfds.get(offset)
+        if fd is None:
+            raise _error(errno.EINVAL)
+        return mmap(fd, length)
+
+    def ioctl(self, request: int, arg) -> int:
+        handler = self._handlers.get(request)
+        if handler is None:
+            raise _error(errno.ENOTTY)
+        handler(arg)
+        return 0
+
+    def _querycap(self, cap: v4l2_capability) -> None:
+        for field, value in (
+            ("driver", b"webcam-fake"),
+            ("card", b"Simulated Camera"),
+            ("bus_info", self.path.encode()),
+        ):
+            ctypes.memmove(getattr(cap, field), value, len(value))
+        if self._mplane:
+            cap.capabilities = V4L2_CAP_VIDEO_CAPTURE_MPLANE | V4L2_CAP_STREAMING
+        else:
+            cap.capabilities = V4L2_CAP_VIDEO_CAPTURE | V4L2_CAP_STREAMING
+        cap.device_caps = cap.capabilities
+
+    def _check_type(self, buf_type: int) -> None:
+        if buf_type != self._buf_type:
+            raise _error(errno.EINVAL)
+
+    def _enum_fmt(self, fmtdesc: v4l2_fmtdesc) -> None:
+        self._check_type(fmtdesc.type)
+        if fmtdesc.index >= len(self._formats):
+            raise _error(errno.EINVAL)
+        fmtdesc.pixelformat = self._formats[fmtdesc.index]
+        name = v4l2_fourcc_str(fmtdesc.pixelformat).encode()
+        ctypes.memmove(fmtdesc.description, name, len(name))
+
+    def _layout(self, pixelformat: int, width: int, height: int) -> tuple[int, int]:
+        if pixelformat in _packed_bpp:
+            bytesperline = width * _packed_bpp[pixelformat]
+            return bytesperline, bytesperline * height
+        if pixelformat in _planar:
+            return width, width * height * 3 // 2
+        return 0, width * height * 2
+
+    def _planes(self, pixelformat: int, width: int, height: int) -> list:
+        # Bytes per line and size of every plane.
+        if pixelformat not in _multiplanar:
+            return [self._layout(pixelformat, width, height)]
+        return [
+            (width // line, width * height // size)
+            for line, size in _multiplanar[pixelformat]
+        ]
+
+    def _fill_fmt(self, vfmt: v4l2_format, pixelformat: int, size) -> None:
+        if self._mplane:
+            pix = vfmt.fmt.pix_mp
+            planes = self._planes(pixelformat, *size)
+            pix.num_planes = len(planes)
+            for plane_fmt, (bytesperline, sizeimage) in zip(pix.plane_fmt, planes):
+                plane_fmt.bytesperline, plane_fmt.sizeimage = bytesperline, sizeimage
+        else:
+            pix = vfmt.fmt.pix
+            pix.bytesperline, pix.sizeimage = self._layout(pixelformat, *size)
+        pix.pixelformat = pixelformat
+        pix.width, pix.height = size
+        pix.field = v4l2_field.V4L2_FIELD_NONE
+        pix.colorspace = v4l2_colorspace.V4L2_COLORSPACE_SRGB
+
+    def _negotiate(self, vfmt: v4l2_format) -> tuple[int, tuple[int, int]]:
+        self._check_type(vfmt.type)
+        pix = vfmt.fmt.pix_mp if self._mplane else vfmt.fmt.pix
+        pixelformat = pix.pixelformat
+        if pixelformat not in self._formats:
+            pixelformat = self._formats[0]
+        if self._scaled:
+            # With a crop or compose rectangle set, the size only chooses how
+            # far the crop is scaled down.
+            return pixelformat, self._scale(pix.width, pix.height)
+        size = min(
+            self._sizes,
+            key=lambda s: abs(s[0] - pix.width) + abs(s[1] - pix.height),
+        )
+        return pixelformat, size
+
+    @property
+    def _scaled(self) -> bool:
+        return self._composed or self._crop != (0, 0, *self._source)
+
+    def _scale(self, width: int, height: int) -> tuple[int, int]:
+        # Like many ISPs, down to a quarter of the crop in either direction.
+        _, _, crop_width, crop_height = self._crop
+        width = min(crop_width, max(crop_width // 4, width, 2))
+        height = min(crop_height, max(crop_height // 4, height, 2))
+        return width & ~1, height & ~1
+
+    def _g_fmt(self, vfmt: v4l2_format) -> None:
+        self._check_type(vfmt.type)
+        self._fill_fmt(vfmt, self._pixelformat, (self._width, self._height))
+
+    def _try_fmt(self, vfmt: v4l2_format) -> None:
+        self._fill_fmt(vfmt, *self._negotiate(vfmt))
+
+    def _s_fmt(self, vfmt: v4l2_format) -> None:
+        if self._buffer_count:
+            raise _error(errno.EBUSY)
+        pixelformat, size = self._negotiate(vfmt)
+        if not self._scaled:
+            self._source = size
+            self._crop = (0, 0, *size)
+        self._pixelformat = pixelformat
+        self._width, self._height = size
+        self._fill_fmt(vfmt, pixelformat, size)
+
+    def _check_selection_type(self, buf_type: int) -> None:
+        # Like the kernel, the selection API takes the single-planar type for
+        # multi-planar devices too.
+        if buf_type not in (v4l2_buf_type.V4L2_BUF_TYPE_VIDEO_CAPTURE, self._buf_type):
+            raise _error(errno.EINVAL)
+
+    def _cropcap(self, cropcap: v4l2_cropcap) -> None:
+        self._check_selection_type(cropcap.type)
+        for rect in (cropcap.bounds, cropcap.defrect):
+            rect.left, rect.top = 0, 0
+            rect.width, rect.height = self._source
+        cropcap.pixelaspect.numerator = cropcap.pixelaspect.denominator = 1
+
+    def _g_selection(self, selection: v4l2_selection) -> None:
+        self._check_selection_type(selection.type)
+        target = selection.target
+        if target == V4L2_SEL_TGT_CROP:
+            rect = self._crop
+        elif target in (
+            V4L2_SEL_TGT_CROP_DEFAULT,
+            V4L2_SEL_TGT_CROP_BOUNDS,
+            V4L2_SEL_TGT_NATIVE_SIZE,
+        ):
+            rect = (0, 0, *self._source)
+        elif target in (V4L2_SEL_TGT_COMPOSE, V4L2_SEL_TGT_COMPOSE_PADDED):
+            rect = (0, 0, self._width, self._height)
+        elif target in (V4L2_SEL_TGT_COMPOSE_DEFAULT, V4L2_SEL_TGT_COMPOSE_BOUNDS):
+            rect = (0, 0, *self._crop[2:])
+        else:
+            raise _error(errno.EINVAL)
+        r = selection.r
+        r.left, r.top, r.width, r.height = rect
+
+    def _s_selection(self, selection: v4l2_selection) -> None:
+        self._check_selection_type(selection.type)
+        if self._buffer_count:
+            raise _error(errno.EBUSY)
+        r = selection.r
+        if selection.target == V4L2_SEL_TGT_CROP:
+            # Clamped to the frame and aligned to 2 pixels, as chroma is shared
+            # by pairs of pixels.
+            source_width, source_height = self._source
+            width = min(max(r.width, 16), source_width) & ~1
+            height = min(max(r.height, 16), source_height) & ~1
+            left = min(max(r.left, 0), source_width - width) & ~1
+            top = min(max(r.top, 0), source_height - height) & ~1
+            self._crop = (left, top, width, height)
+            self._width, self._height = width, height
+            # Like in drivers, a new crop resets the compose rectangle.
+            self._composed = False
+        elif selection.target == V4L2_SEL_TGT_COMPOSE:
+            self._width, self._height = self._scale(r.width, r.height)
+            self._composed = (self._width, self._height) != self._crop[2:]
+        else:
+            raise _error(errno.EINVAL)
+        self._g_selection(selection)
+
+    def _render(self) -> list[bytes]:
+        # A handful of frames are rendered once and then cycled, which keeps
+        # the producer's cost down to a memcpy per frame.
+        width, height = self._width, self._height
+        bytesperline, sizeimage = self._layout(self._pixelformat, width, height)
+        patterns = []
+        for i in range(8):
+            if self._pixelformat in (V4L2_PIX_FMT_MJPEG, V4L2_PIX_FMT_JPEG):
+                from PIL import Image
+
+                image = Image.new("RGB", (width, height), (i * 32, 128, 255 - i * 32))
+                output = BytesIO()
+                image.save(output, "JPEG")
+                patterns.append(output.getvalue())
+            elif self._pixelformat in _compressed:
+                patterns.append(bytes([0, 0, 0, 1, 0x65, i]) * 64)
+            else:
+                row = bytes((x + i * 16) & 0xFF for x in range(bytesperline))
+                rows = sizeimage // bytesperline
+                patterns.append((row * rows)[:sizeimage])
+        return patterns
+
+    def _free(self) -> None:
+        for maps in self._maps:
+            for m in maps:
+                m.close()
+        for fd in self._memfds.values():
+            os.close(fd)
+        self._maps, self._memfds = [], {}
+        self._buffer_count = 0
+
+    def _reqbufs(self, reqbuf: v4l2_requestbuffers) -> None:
+        self._check_type(reqbuf.type)
+        if reqbuf.memory != v4l2_memory.V4L2_MEMORY_MMAP:
+            raise _error(errno.EINVAL)
+        if self._streaming:
+            raise _error(errno.EBUSY)
+        self._free()
+        self._incoming.clear()
+        self._done.clear()
+        reqbuf.capabilities = V4L2_BUF_CAP_SUPPORTS_MMAP
+        if reqbuf.count == 0:
+            return
+        reqbuf.count = max(2, min(reqbuf.count, VIDEO_MAX_FRAME))
+        # Every plane starts on a page of its own, so each can be mapped alone.
+        self._plane_layout = []
+        self._buffer_size = 0
+        for _, sizeimage in self._planes(self._pixelformat, self._width, self._height):
+            length = -(-sizeimage // PAGESIZE) * PAGESIZE
+            self._plane_layout.append((self._buffer_size, length, sizeimage))
+            self._buffer_size += length
+        self._buffer_count = reqbuf.count
+        for index in range(reqbuf.count):
+            maps = []
+            for start, length, _ in self._plane_layout:
+                fd = os.memfd_create(self.path, os.MFD_CLOEXEC)
+                os.ftruncate(fd, length)
+                self._memfds[index * self._buffer_size + start] = fd
+                maps.append(mmap(fd, length))
+            self._maps.append(maps)
+        self._patterns = self._render()
+
+    def _check_index(self, buffer: v4l2_buffer) -> None:
+        self._check_type(buffer.type)
+        if self._mplane and buffer.length < len(self._plane_layout):
+            raise _error(errno.EINVAL)
+        if buffer.index >= self._buffer_count:
+            raise _error(errno.EINVAL)
+        if buffer.memory != v4l2_memory.V4L2_MEMORY_MMAP:
+            raise _error(errno.EINVAL)
+
+    def _querybuf(self, buffer: v4l2_buffer) -> None:
+        self._check_index(buffer)
+        buffer.flags = V4L2_BUF_FLAG_MAPPED
+        self._fill_planes(buffer, None)
+
+    def _expbuf(self, expbuf: v4l2_exportbuffer) -> None:
+        # A duplicate of the plane's memfd stands in for a dmabuf.
+        self._check_type(expbuf.type)
+        if expbuf.index >= self._buffer_count:
+            raise _error(errno.EINVAL)
+        if expbuf.plane >= len(self._plane_layout):
+            raise _error(errno.EINVAL)
+        start = self._plane_layout[expbuf.plane][0]
+        expbuf.fd = os.dup(self._memfds[expbuf.index * self._buffer_size + start])
+
+    def _fill_planes(self, buffer: v4l2_buffer, bytesused: int | None) -> None:
+        offset = buffer.index * self._buffer_size
+        if not self._mplane:
+            buffer.length = self._buffer_size
+            buffer.m.offset = offset
+            if bytesused is not None:
+                buffer.bytesused = bytesused
+            return
+        buffer.length = len(self._plane_layout)
+        for plane, (start, length, sizeimage) in zip(
+            buffer.m.planes, self._plane_layout
+        ):
+            plane.length = length
+            plane.m.memoffset = offset + start
+            plane.data_offset = 0
+            if bytesused is not None:
+                # Compressed frames are never split over planes.
+                plane.bytesused = (
+                    sizeimage if len(self._plane_layout) > 1 else bytesused
+                )
+
+    def _qbuf(self, buffer: v4l2_buffer) -> None:
+        self._check_index(buffer)
+        with self._lock:
+            if buffer.index in self._incoming:
+                raise _error(errno.EINVAL)
+            self._incoming.append(buffer.index)
+
+    def _dqbuf(self, buffer: v4l2_buffer) -> None:
+        with self._lock:
+            while not self._done:
+                if not self._streaming:
+                    raise _error(errno.EINVAL)
+                if self._nonblocking:
+                    raise BlockingIOError(errno.EAGAIN, os.strerror(errno.EAGAIN))
+                self._lock.wait()
+            index, bytesused, sequence, timestamp, flags = self._done.popleft()
+            os.read(self._rfd, 1)
+        buffer.index = index
+        self._fill_planes(buffer, bytesused)
+        buffer.sequence = sequence
+        buffer.timestamp.tv_sec = int(timestamp)
+        buffer.timestamp.tv_usec = int(timestamp % 1 * 1000000)
+        buffer.flags = flags
+        buffer.field = v4l2_field.V4L2_FIELD_NONE
+
+    def _produce(self) -> None:
+        deadline = time.monotonic()
+        frame = 0
+        while True:
+            interval = 1 / self._fps
+            if self._jitter:
+                interval += self._random.uniform(-self._jitter, self._jitter)
+            deadline += max(0.0, interval)
+            delay = deadline - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._lock:
+                if not self._streaming:
+                    return
+                sequence = self._sequence
+                self._sequence += 1
+                # A frame is lost when it is dropped on purpose or, as with
+                # real hardware, when userspace left no buffer queued.
+                if self._random.random() < self._drop_rate or not self._incoming:
+                    continue
+                index = self._incoming.popleft()
+            pattern = self._patterns[frame % len(self._patterns)]
+            frame += 1
+            maps = self._maps[index]
+            if len(maps) == 1:
+                maps[0][: len(pattern)] = pattern
+            else:
+                done = 0
+                for m, (_, _, sizeimage) in zip(maps, self._plane_layout):
+                    m[:sizeimage] = pattern[done : done + sizeimage]
+                    done += sizeimage
+            flags = V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC | V4L2_BUF_FLAG_TSTAMP_SRC_EOF
+            if self._pixelformat in _compressed:
+                flags |= V4L2_BUF_FLAG_KEYFRAME
+            with self._lock:
+                if not self._streaming:
+                    return
+                self._done.append(
+                    (index, len(pattern), sequence, time.monotonic(), flags)
+                )
+                os.write(self._wfd, b"\0")
+                self._lock.notify_all()
+
+    def _streamon(self, buf_type) -> None:
+        self._check_type(buf_type.value)
+        with self._lock:
+            if self._streaming:
+                return
+            if not self._buffer_count:
+                raise _error(errno.EINVAL)
+            self._streaming = True
+            self._sequence = 0
+        self._producer = Thread(target=self._produce, name=f"{self!r}", daemon=True)
+        self._producer.start()
+
+    def _streamoff(self, buf_type) -> None:
+        with self._lock:
+            self._streaming = False
+            self._incoming.clear()
+            self._done.clear()
+            self._lock.notify_all()
+        if self._producer is not None:
+            self._producer.join()
+            self._producer = None
+        if self._rfd >= 0:
+            try:
+                while os.read(self._rfd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def _g_parm(self, parm: v4l2_streamparm) -> None:
+        capture = parm.parm.capture
+        capture.capability = V4L2_CAP_TIMEPERFRAME
+        capture.timeperframe.numerator = 1000
+        capture.timeperframe.denominator = round(self._fps * 1000)
+
+    def _s_parm(self, parm: v4l2_streamparm) -> None:
+        timeperframe = parm.parm.capture.timeperframe
+        if timeperframe.numerator and timeperframe.denominator:
+            self._fps = timeperframe.denominator / timeperframe.numerator
+        self._g_parm(parm)
+
+    def _enum_framesizes(self, frmsize: v4l2_frmsizeenum) -> None:
+        if frmsize.pixel_format not in self._formats:
+            raise _error(errno.EINVAL)
+        if frmsize.index >= len(self._sizes):
+            raise _error(errno.EINVAL)
+        frmsize.type = v4l2_frmsizetypes.V4L2_FRMSIZE_TYPE_DISCRETE
+        frmsize.discrete.width, frmsize.discrete.height = self._sizes[frmsize.index]
+
+    def _enum_frameintervals(self, frmival: v4l2_frmivalenum) -> None:
+        size = (frmival.width, frmival.height)
+        if frmival.pixel_format not in self._formats or size not in self._sizes:
+            raise _error(errno.EINVAL)
+        if frmival.index > 0:
+            raise _error(errno.EINVAL)
+        frmival.type = v4l2_frmivaltypes.V4L2_FRMIVAL_TYPE_DISCRETE
+        frmival.discrete.numerator = 1000
+        frmival.discrete.denominator = round(self._fps * 1000)
+
+    def _find_ctrl(self, cid: int) -> tuple:
+        if cid & V4L2_CTRL_FLAG_NEXT_CTRL:
+            # The control with the lowest ID above the given one.
+            cid &= ~(V4L2_CTRL_FLAG_NEXT_CTRL | V4L2_CTRL_FLAG_NEXT_COMPOUND)
+            following = [info for info in _controls.items() if info[1][0] > cid]
+            if not following:
+                raise _error(errno.EINVAL)
+            name, info = min(following, key=lambda item: item[1][0])
+            return (name, *info)
+        for name, info in _controls.items():
+            if info[0] == cid:
+                return (name, *info)
+        raise _error(errno.EINVAL)
+
+    def _queryctrl(self, ctrl: "v4l2_queryctrl | v4l2_query_ext_ctrl") -> None:
+        name, cid, ctrl_type, minimum, maximum, default = self._find_ctrl(ctrl.id)
+        ctrl.id = cid
+        ctypes.memmove(ctrl.name, name.encode(), len(name))
+        ctrl.type = ctrl_type
+        ctrl.minimum = minimum
+        ctrl.maximum = maximum
+        ctrl.step = 1
+        ctrl.default_value = default
+
+    def _query_ext_ctrl(self, ctrl: v4l2_query_ext_ctrl) -> None:
+        self._queryctrl(ctrl)
+        ctrl.elem_size = 4
+        ctrl.elems = 1
+
+    def _querymenu(self, item: v4l2_querymenu) -> None:
+        labels = _menus.get(item.id)
+        if labels is None or not 0 <= item.index < len(labels):
+            raise _error(errno.EINVAL)
+        label = labels[item.index].encode()
+        ctypes.memmove(item.name, label, len(label))
+
+    def _g_ctrl(self, ctrl: v4l2_control) -> None:
+        self._find_ctrl(ctrl.id)
+        ctrl.value = self._ctrl_values[ctrl.id]
+
+    def _s_ctrl(self, ctrl: v4l2_control) -> None:
+        _, _, _, minimum, maximum, _ = self._find_ctrl(ctrl.id)
+        if not minimum <= ctrl.value <= maximum:
+            raise _error(errno.ERANGE)
+        self._change_ctrl(ctrl.id, ctrl.value, feedback=True)
+
+    def _change_ctrl(self, cid: int, value: int, feedback: bool = False) -> None:
+        changed = self._ctrl_values[cid] != value
+        self._ctrl_values[cid] = value
+        flags = self._subscriptions.get((V4L2_EVENT_CTRL, cid))
+        if flags is None or not changed:
+            return
+        if feedback and not flags & V4L2_EVENT_SUB_FL_ALLOW_FEEDBACK:
+            return
+        self._queue_ctrl_event(cid, V4L2_EVENT_CTRL_CH_VALUE)
+
+    def _queue_ctrl_event(self, cid: int, changes: int) -> None:
+        name, _, ctrl_type, minimum, maximum, default = self._find_ctrl(cid)
+        event = v4l2_event(type=V4L2_EVENT_CTRL, id=cid)
+        ctrl = event.u.ctrl
+        ctrl.changes = changes
+        ctrl.type = ctrl_type
+        ctrl.value = self._ctrl_values[cid]
+        ctrl.minimum, ctrl.maximum, ctrl.default_value = minimum, maximum, default
+        ctrl.step = 1
+        self._queue_event(event)
+
+    def _queue_event(self, event: v4l2_event) -> None:
+        now = time.monotonic()
+        event.sequence = self._event_sequence
+        event.timestamp.tv_sec = int(now)
+        event.timestamp.tv_nsec = int(now % 1 * 1000000000)
+        self._event_sequence += 1
+        self._events.append(event)
+
+    def _subscribe_event(self, subscription: v4l2_event_subscription) -> None:
+        if subscription.type not in (
+            V4L2_EVENT_CTRL,
+            V4L2_EVENT_SOURCE_CHANGE,
+            V4L2_EVENT_EOS,
+        ):
+            raise _error(errno.EINVAL)
+        if subscription.type == V4L2_EVENT_CTRL:
+            self._find_ctrl(subscription.id)
+        key = (subscription.type, subscription.id)
+        self._subscriptions[key] = subscription.flags
+        if subscription.type == V4L2_EVENT_CTRL:
+            if subscription.flags & V4L2_EVENT_SUB_FL_SEND_INITIAL:
+                changes = V4L2_EVENT_CTRL_CH_VALUE | V4L2_EVENT_CTRL_CH_FLAGS
+                self._queue_ctrl_event(subscription.id, changes)
+
+    def _unsubscribe_event(self, subscription: v4l2_event_subscription) -> None:
+        self._subscriptions.pop((subscription.type, subscription.id), None)
+
+    def _dqevent(self, event: v4l2_event) -> None:
+        if not self._events:
+            raise _error(errno.ENOENT)
+        ctypes.pointer(event)[0] = self._events.popleft()
+        event.pending = len(self._events)
+
+    # Changes a control as the device itself would, e.g. under auto exposure.
+    def set_control(self, cid: int, value: int) -> None:
+        self._change_ctrl(cid, value)
+
+    # Switches resolution the way an HDMI or decoder source does on its own.
+    def change_source(self, size: tuple[int, int]) -> None:
+        if tuple(size) not in self._sizes:
+            raise ValueError(f"{size} is not one of the sizes of this device")
+        self._width, self._height = size
+        self._source = tuple(size)
+        self._crop = (0, 0, *self._source)
+        self._composed = False
+        if (V4L2_EVENT_SOURCE_CHANGE, 0) in self._subscriptions:
+            event = v4l2_event(type=V4L2_EVENT_SOURCE_CHANGE)
+            event.u.src_change.changes = V4L2_EVENT_SRC_CH_RESOLUTION
+            self._queue_event(event)
+
+    def _g_ext_ctrls(self, ext: v4l2_ext_controls) -> None:
+        for i in range(ext.count):
+            ext.error_idx = i
+            self._g_ctrl(ext.controls[i])
+
+    def _s_ext_ctrls(self, ext: v4l2_ext_controls) -> None:
+        # Like the kernel, validate every control before changing any.
+        for i in range(ext.count):
+            ctrl = ext.controls[i]
+            _, _, _, minimum, maximum, _ = self._find_ctrl(ctrl.id)
+            if not minimum <= ctrl.value <= maximum:
+                ext.error_idx = i
+                raise _error(errno.ERANGE)
+        for i in range(ext.count):
+            ctrl = ext.controls[i]
+            self._change_ctrl(ctrl.id, ctrl.value, feedback=True)
+
+
+__all__ = ("v4l2FakeDevice",)
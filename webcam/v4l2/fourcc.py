@@ -17,212 +17,218 @@ def v4l2_fourcc_be(a: str, b: str, c: str, d: str) -> int:
     return v4l2_fourcc(a, b, c, d) | (1 << 31)
 
 
+def v4l2_fourcc_str(fourcc: int) -> str:
+    code = fourcc & ~(1 << 31)
+    name = "".join(chr((code >> shift) & 0xFF) for shift in (0, 8, 16, 24))
+    return name.rstrip() + ("-BE" if fourcc & (1 << 31) else "")
+
+
 # /usr/include/linux/videodev2.h:513
-V4L2_PIX_FMT_RGB332 = v4l2_fourcc("R", "G", "B", "1")
-V4L2_PIX_FMT_RGB444 = v4l2_fourcc("R", "4", "4", "4")
-V4L2_PIX_FMT_ARGB444 = v4l2_fourcc("A", "R", "1", "2")
-V4L2_PIX_FMT_XRGB444 = v4l2_fourcc("X", "R", "1", "2")
-V4L2_PIX_FMT_RGBA444 = v4l2_fourcc("R", "A", "1", "2")
-V4L2_PIX_FMT_RGBX444 = v4l2_fourcc("R", "X", "1", "2")
-V4L2_PIX_FMT_ABGR444 = v4l2_fourcc("A", "B", "1", "2")
-V4L2_PIX_FMT_XBGR444 = v4l2_fourcc("X", "B", "1", "2")
-V4L2_PIX_FMT_BGRA444 = v4l2_fourcc("G", "A", "1", "2")
-V4L2_PIX_FMT_BGRX444 = v4l2_fourcc("B", "X", "1", "2")
-V4L2_PIX_FMT_RGB555 = v4l2_fourcc("R", "G", "B", "O")
-V4L2_PIX_FMT_ARGB555 = v4l2_fourcc("A", "R", "1", "5")
-V4L2_PIX_FMT_XRGB555 = v4l2_fourcc("X", "R", "1", "5")
-V4L2_PIX_FMT_RGBA555 = v4l2_fourcc("R", "A", "1", "5")
-V4L2_PIX_FMT_RGBX555 = v4l2_fourcc("R", "X", "1", "5")
-V4L2_PIX_FMT_ABGR555 = v4l2_fourcc("A", "B", "1", "5")
-V4L2_PIX_FMT_XBGR555 = v4l2_fourcc("X", "B", "1", "5")
-V4L2_PIX_FMT_BGRA555 = v4l2_fourcc("B", "A", "1", "5")
-V4L2_PIX_FMT_BGRX555 = v4l2_fourcc("B", "X", "1", "5")
-V4L2_PIX_FMT_RGB565 = v4l2_fourcc("R", "G", "B", "P")
-V4L2_PIX_FMT_RGB555X = v4l2_fourcc("R", "G", "B", "Q")
-V4L2_PIX_FMT_ARGB555X = v4l2_fourcc_be("A", "R", "1", "5")
-V4L2_PIX_FMT_XRGB555X = v4l2_fourcc_be("X", "R", "1", "5")
-V4L2_PIX_FMT_RGB565X = v4l2_fourcc("R", "G", "B", "R")
-V4L2_PIX_FMT_BGR666 = v4l2_fourcc("B", "G", "R", "H")
-V4L2_PIX_FMT_BGR24 = v4l2_fourcc("B", "G", "R", "3")
-V4L2_PIX_FMT_RGB24 = v4l2_fourcc("R", "G", "B", "3")
-V4L2_PIX_FMT_BGR32 = v4l2_fourcc("B", "G", "R", "4")
-V4L2_PIX_FMT_ABGR32 = v4l2_fourcc("A", "R", "2", "4")
-V4L2_PIX_FMT_XBGR32 = v4l2_fourcc("X", "R", "2", "4")
-V4L2_PIX_FMT_BGRA32 = v4l2_fourcc("R", "A", "2", "4")
-V4L2_PIX_FMT_BGRX32 = v4l2_fourcc("R", "X", "2", "4")
-V4L2_PIX_FMT_RGB32 = v4l2_fourcc("R", "G", "B", "4")
-V4L2_PIX_FMT_RGBA32 = v4l2_fourcc("A", "B", "2", "4")
-V4L2_PIX_FMT_RGBX32 = v4l2_fourcc("X", "B", "2", "4")
-V4L2_PIX_FMT_ARGB32 = v4l2_fourcc("B", "A", "2", "4")
-V4L2_PIX_FMT_XRGB32 = v4l2_fourcc("B", "X", "2", "4")
-V4L2_PIX_FMT_GREY = v4l2_fourcc("G", "R", "E", "Y")
-V4L2_PIX_FMT_Y4 = v4l2_fourcc("Y", "0", "4", " ")
-V4L2_PIX_FMT_Y6 = v4l2_fourcc("Y", "0", "6", " ")
-V4L2_PIX_FMT_Y10 = v4l2_fourcc("Y", "1", "0", " ")
-V4L2_PIX_FMT_Y12 = v4l2_fourcc("Y", "1", "2", " ")
-V4L2_PIX_FMT_Y14 = v4l2_fourcc("Y", "1", "4", " ")
-V4L2_PIX_FMT_Y16 = v4l2_fourcc("Y", "1", "6", " ")
-V4L2_PIX_FMT_Y16_BE = v4l2_fourcc_be("Y", "1", "6", " ")
-V4L2_PIX_FMT_Y10BPACK = v4l2_fourcc("Y", "1", "0", "B")
-V4L2_PIX_FMT_Y10P = v4l2_fourcc("Y", "1", "0", "P")
-V4L2_PIX_FMT_IPU3_Y10 = v4l2_fourcc("i", "p", "3", "y")
-V4L2_PIX_FMT_PAL8 = v4l2_fourcc("P", "A", "L", "8")
-V4L2_PIX_FMT_UV8 = v4l2_fourcc("U", "V", "8", " ")
-V4L2_PIX_FMT_YUYV = v4l2_fourcc("Y", "U", "Y", "V")
-V4L2_PIX_FMT_YYUV = v4l2_fourcc("Y", "Y", "U", "V")
-V4L2_PIX_FMT_YVYU = v4l2_fourcc("Y", "V", "Y", "U")
-V4L2_PIX_FMT_UYVY = v4l2_fourcc("U", "Y", "V", "Y")
-V4L2_PIX_FMT_VYUY = v4l2_fourcc("V", "Y", "U", "Y")
-V4L2_PIX_FMT_Y41P = v4l2_fourcc("Y", "4", "1", "P")
-V4L2_PIX_FMT_YUV444 = v4l2_fourcc("Y", "4", "4", "4")
-V4L2_PIX_FMT_YUV555 = v4l2_fourcc("Y", "U", "V", "O")
-V4L2_PIX_FMT_YUV565 = v4l2_fourcc("Y", "U", "V", "P")
-V4L2_PIX_FMT_YUV24 = v4l2_fourcc("Y", "U", "V", "3")
-V4L2_PIX_FMT_YUV32 = v4l2_fourcc("Y", "U", "V", "4")
-V4L2_PIX_FMT_AYUV32 = v4l2_fourcc("A", "Y", "U", "V")
-V4L2_PIX_FMT_XYUV32 = v4l2_fourcc("X", "Y", "U", "V")
-V4L2_PIX_FMT_VUYA32 = v4l2_fourcc("V", "U", "Y", "A")
-V4L2_PIX_FMT_VUYX32 = v4l2_fourcc("V", "U", "Y", "X")
-V4L2_PIX_FMT_YUVA32 = v4l2_fourcc("Y", "U", "V", "A")
-V4L2_PIX_FMT_YUVX32 = v4l2_fourcc("Y", "U", "V", "X")
-V4L2_PIX_FMT_M420 = v4l2_fourcc("M", "4", "2", "0")
-V4L2_PIX_FMT_NV12 = v4l2_fourcc("N", "V", "1", "2")
-V4L2_PIX_FMT_NV21 = v4l2_fourcc("N", "V", "2", "1")
-V4L2_PIX_FMT_NV16 = v4l2_fourcc("N", "V", "1", "6")
-V4L2_PIX_FMT_NV61 = v4l2_fourcc("N", "V", "6", "1")
-V4L2_PIX_FMT_NV24 = v4l2_fourcc("N", "V", "2", "4")
-V4L2_PIX_FMT_NV42 = v4l2_fourcc("N", "V", "4", "2")
-V4L2_PIX_FMT_P010 = v4l2_fourcc("P", "0", "1", "0")
-V4L2_PIX_FMT_NV12M = v4l2_fourcc("N", "M", "1", "2")
-V4L2_PIX_FMT_NV21M = v4l2_fourcc("N", "M", "2", "1")
-V4L2_PIX_FMT_NV16M = v4l2_fourcc("N", "M", "1", "6")
-V4L2_PIX_FMT_NV61M = v4l2_fourcc("N", "M", "6", "1")
-V4L2_PIX_FMT_YUV410 = v4l2_fourcc("Y", "U", "V", "9")
-V4L2_PIX_FMT_YVU410 = v4l2_fourcc("Y", "V", "U", "9")
-V4L2_PIX_FMT_YUV411P = v4l2_fourcc("4", "1", "1", "P")
-V4L2_PIX_FMT_YUV420 = v4l2_fourcc("Y", "U", "1", "2")
-V4L2_PIX_FMT_YVU420 = v4l2_fourcc("Y", "V", "1", "2")
-V4L2_PIX_FMT_YUV422P = v4l2_fourcc("4", "2", "2", "P")
-V4L2_PIX_FMT_YUV420M = v4l2_fourcc("Y", "M", "1", "2")
-V4L2_PIX_FMT_YVU420M = v4l2_fourcc("Y", "M", "2", "1")
-V4L2_PIX_FMT_YUV422M = v4l2_fourcc("Y", "M", "1", "6")
-V4L2_PIX_FMT_YVU422M = v4l2_fourcc("Y", "M", "6", "1")
-V4L2_PIX_FMT_YUV444M = v4l2_fourcc("Y", "M", "2", "4")
-V4L2_PIX_FMT_YVU444M = v4l2_fourcc("Y", "M", "4", "2")
-V4L2_PIX_FMT_NV12_4L4 = v4l2_fourcc("V", "T", "1", "2")
-V4L2_PIX_FMT_NV12_16L16 = v4l2_fourcc("H", "M", "1", "2")
-V4L2_PIX_FMT_NV12_32L32 = v4l2_fourcc("S", "T", "1", "2")
-V4L2_PIX_FMT_P010_4L4 = v4l2_fourcc("T", "0", "1", "0")
-V4L2_PIX_FMT_NV12MT = v4l2_fourcc("T", "M", "1", "2")
-V4L2_PIX_FMT_NV12MT_16X16 = v4l2_fourcc("V", "M", "1", "2")
-V4L2_PIX_FMT_NV12M_8L128 = v4l2_fourcc("N", "A", "1", "2")
-V4L2_PIX_FMT_NV12M_10BE_8L128 = v4l2_fourcc_be("N", "T", "1", "2")
-V4L2_PIX_FMT_SBGGR8 = v4l2_fourcc("B", "A", "8", "1")
-V4L2_PIX_FMT_SGBRG8 = v4l2_fourcc("G", "B", "R", "G")
-V4L2_PIX_FMT_SGRBG8 = v4l2_fourcc("G", "R", "B", "G")
-V4L2_PIX_FMT_SRGGB8 = v4l2_fourcc("R", "G", "G", "B")
-V4L2_PIX_FMT_SBGGR10 = v4l2_fourcc("B", "G", "1", "0")
-V4L2_PIX_FMT_SGBRG10 = v4l2_fourcc("G", "B", "1", "0")
-V4L2_PIX_FMT_SGRBG10 = v4l2_fourcc("B", "A", "1", "0")
-V4L2_PIX_FMT_SRGGB10 = v4l2_fourcc("R", "G", "1", "0")
-V4L2_PIX_FMT_SBGGR10P = v4l2_fourcc("p", "B", "A", "A")
-V4L2_PIX_FMT_SGBRG10P = v4l2_fourcc("p", "G", "A", "A")
-V4L2_PIX_FMT_SGRBG10P = v4l2_fourcc("p", "g", "A", "A")
-V4L2_PIX_FMT_SRGGB10P = v4l2_fourcc("p", "R", "A", "A")
-V4L2_PIX_FMT_SBGGR10ALAW8 = v4l2_fourcc("a", "B", "A", "8")
-V4L2_PIX_FMT_SGBRG10ALAW8 = v4l2_fourcc("a", "G", "A", "8")
-V4L2_PIX_FMT_SGRBG10ALAW8 = v4l2_fourcc("a", "g", "A", "8")
-V4L2_PIX_FMT_SRGGB10ALAW8 = v4l2_fourcc("a", "R", "A", "8")
-V4L2_PIX_FMT_SBGGR10DPCM8 = v4l2_fourcc("b", "B", "A", "8")
-V4L2_PIX_FMT_SGBRG10DPCM8 = v4l2_fourcc("b", "G", "A", "8")
-V4L2_PIX_FMT_SGRBG10DPCM8 = v4l2_fourcc("B", "D", "1", "0")
-V4L2_PIX_FMT_SRGGB10DPCM8 = v4l2_fourcc("b", "R", "A", "8")
-V4L2_PIX_FMT_SBGGR12 = v4l2_fourcc("B", "G", "1", "2")
-V4L2_PIX_FMT_SGBRG12 = v4l2_fourcc("G", "B", "1", "2")
-V4L2_PIX_FMT_SGRBG12 = v4l2_fourcc("B", "A", "1", "2")
-V4L2_PIX_FMT_SRGGB12 = v4l2_fourcc("R", "G", "1", "2")
-V4L2_PIX_FMT_SBGGR12P = v4l2_fourcc("p", "B", "C", "C")
-V4L2_PIX_FMT_SGBRG12P = v4l2_fourcc("p", "G", "C", "C")
-V4L2_PIX_FMT_SGRBG12P = v4l2_fourcc("p", "g", "C", "C")
-V4L2_PIX_FMT_SRGGB12P = v4l2_fourcc("p", "R", "C", "C")
-V4L2_PIX_FMT_SBGGR14 = v4l2_fourcc("B", "G", "1", "4")
-V4L2_PIX_FMT_SGBRG14 = v4l2_fourcc("G", "B", "1", "4")
-V4L2_PIX_FMT_SGRBG14 = v4l2_fourcc("G", "R", "1", "4")
-V4L2_PIX_FMT_SRGGB14 = v4l2_fourcc("R", "G", "1", "4")
-V4L2_PIX_FMT_SBGGR14P = v4l2_fourcc("p", "B", "E", "E")
-V4L2_PIX_FMT_SGBRG14P = v4l2_fourcc("p", "G", "E", "E")
-V4L2_PIX_FMT_SGRBG14P = v4l2_fourcc("p", "g", "E", "E")
-V4L2_PIX_FMT_SRGGB14P = v4l2_fourcc("p", "R", "E", "E")
-V4L2_PIX_FMT_SBGGR16 = v4l2_fourcc("B", "Y", "R", "2")
-V4L2_PIX_FMT_SGBRG16 = v4l2_fourcc("G", "B", "1", "6")
-V4L2_PIX_FMT_SGRBG16 = v4l2_fourcc("G", "R", "1", "6")
-V4L2_PIX_FMT_SRGGB16 = v4l2_fourcc("R", "G", "1", "6")
-V4L2_PIX_FMT_HSV24 = v4l2_fourcc("H", "S", "V", "3")
-V4L2_PIX_FMT_HSV32 = v4l2_fourcc("H", "S", "V", "4")
-V4L2_PIX_FMT_MJPEG = v4l2_fourcc("M", "J", "P", "G")
-V4L2_PIX_FMT_JPEG = v4l2_fourcc("J", "P", "E", "G")
-V4L2_PIX_FMT_DV = v4l2_fourcc("d", "v", "s", "d")
-V4L2_PIX_FMT_MPEG = v4l2_fourcc("M", "P", "E", "G")
-V4L2_PIX_FMT_H264 = v4l2_fourcc("H", "2", "6", "4")
-V4L2_PIX_FMT_H264_NO_SC = v4l2_fourcc("A", "V", "C", "1")
-V4L2_PIX_FMT_H264_MVC = v4l2_fourcc("M", "2", "6", "4")
-V4L2_PIX_FMT_H263 = v4l2_fourcc("H", "2", "6", "3")
-V4L2_PIX_FMT_MPEG1 = v4l2_fourcc("M", "P", "G", "1")
-V4L2_PIX_FMT_MPEG2 = v4l2_fourcc("M", "P", "G", "2")
-V4L2_PIX_FMT_MPEG2_SLICE = v4l2_fourcc("M", "G", "2", "S")
-V4L2_PIX_FMT_MPEG4 = v4l2_fourcc("M", "P", "G", "4")
-V4L2_PIX_FMT_XVID = v4l2_fourcc("X", "V", "I", "D")
-V4L2_PIX_FMT_VC1_ANNEX_G = v4l2_fourcc("V", "C", "1", "G")
-V4L2_PIX_FMT_VC1_ANNEX_L = v4l2_fourcc("V", "C", "1", "L")
-V4L2_PIX_FMT_VP8 = v4l2_fourcc("V", "P", "8", "0")
-V4L2_PIX_FMT_VP8_FRAME = v4l2_fourcc("V", "P", "8", "F")
-V4L2_PIX_FMT_VP9 = v4l2_fourcc("V", "P", "9", "0")
-V4L2_PIX_FMT_VP9_FRAME = v4l2_fourcc("V", "P", "9", "F")
-V4L2_PIX_FMT_HEVC = v4l2_fourcc("H", "E", "V", "C")
-V4L2_PIX_FMT_FWHT = v4l2_fourcc("F", "W", "H", "T")
-V4L2_PIX_FMT_FWHT_STATELESS = v4l2_fourcc("S", "F", "W", "H")
-V4L2_PIX_FMT_H264_SLICE = v4l2_fourcc("S", "2", "6", "4")
-V4L2_PIX_FMT_HEVC_SLICE = v4l2_fourcc("S", "2", "6", "5")
-V4L2_PIX_FMT_CPIA1 = v4l2_fourcc("C", "P", "I", "A")
-V4L2_PIX_FMT_WNVA = v4l2_fourcc("W", "N", "V", "A")
-V4L2_PIX_FMT_SN9C10X = v4l2_fourcc("S", "9", "1", "0")
-V4L2_PIX_FMT_SN9C20X_I420 = v4l2_fourcc("S", "9", "2", "0")
-V4L2_PIX_FMT_PWC1 = v4l2_fourcc("P", "W", "C", "1")
-V4L2_PIX_FMT_PWC2 = v4l2_fourcc("P", "W", "C", "2")
-V4L2_PIX_FMT_ET61X251 = v4l2_fourcc("E", "6", "2", "5")
-V4L2_PIX_FMT_SPCA501 = v4l2_fourcc("S", "5", "0", "1")
-V4L2_PIX_FMT_SPCA505 = v4l2_fourcc("S", "5", "0", "5")
-V4L2_PIX_FMT_SPCA508 = v4l2_fourcc("S", "5", "0", "8")
-V4L2_PIX_FMT_SPCA561 = v4l2_fourcc("S", "5", "6", "1")
-V4L2_PIX_FMT_PAC207 = v4l2_fourcc("P", "2", "0", "7")
-V4L2_PIX_FMT_MR97310A = v4l2_fourcc("M", "3", "1", "0")
-V4L2_PIX_FMT_JL2005BCD = v4l2_fourcc("J", "L", "2", "0")
-V4L2_PIX_FMT_SN9C2028 = v4l2_fourcc("S", "O", "N", "X")
-V4L2_PIX_FMT_SQ905C = v4l2_fourcc("9", "0", "5", "C")
-V4L2_PIX_FMT_PJPG = v4l2_fourcc("P", "J", "P", "G")
-V4L2_PIX_FMT_OV511 = v4l2_fourcc("O", "5", "1", "1")
-V4L2_PIX_FMT_OV518 = v4l2_fourcc("O", "5", "1", "8")
-V4L2_PIX_FMT_STV0680 = v4l2_fourcc("S", "6", "8", "0")
-V4L2_PIX_FMT_TM6000 = v4l2_fourcc("T", "M", "6", "0")
-V4L2_PIX_FMT_CIT_YYVYUY = v4l2_fourcc("C", "I", "T", "V")
-V4L2_PIX_FMT_KONICA420 = v4l2_fourcc("K", "O", "N", "I")
-V4L2_PIX_FMT_JPGL = v4l2_fourcc("J", "P", "G", "L")
-V4L2_PIX_FMT_SE401 = v4l2_fourcc("S", "4", "0", "1")
-V4L2_PIX_FMT_S5C_UYVY_JPG = v4l2_fourcc("S", "5", "C", "I")
-V4L2_PIX_FMT_Y8I = v4l2_fourcc("Y", "8", "I", " ")
-V4L2_PIX_FMT_Y12I = v4l2_fourcc("Y", "1", "2", "I")
-V4L2_PIX_FMT_Z16 = v4l2_fourcc("Z", "1", "6", " ")
-V4L2_PIX_FMT_MT21C = v4l2_fourcc("M", "T", "2", "1")
-V4L2_PIX_FMT_MM21 = v4l2_fourcc("M", "M", "2", "1")
-V4L2_PIX_FMT_INZI = v4l2_fourcc("I", "N", "Z", "I")
-V4L2_PIX_FMT_CNF4 = v4l2_fourcc("C", "N", "F", "4")
-V4L2_PIX_FMT_HI240 = v4l2_fourcc("H", "I", "2", "4")
-V4L2_PIX_FMT_QC08C = v4l2_fourcc("Q", "0", "8", "C")
-V4L2_PIX_FMT_QC10C = v4l2_fourcc("Q", "1", "0", "C")
-V4L2_PIX_FMT_IPU3_SBGGR10 = v4l2_fourcc("i", "p", "3", "b")
-V4L2_PIX_FMT_IPU3_SGBRG10 = v4l2_fourcc("i", "p", "3", "g")
-V4L2_PIX_FMT_IPU3_SGRBG10 = v4l2_fourcc("i", "p", "3", "G")
-V4L2_PIX_FMT_IPU3_SRGGB10 = v4l2_fourcc("i", "p", "3", "r")
+V4L2_PIX_FMT_RGB332 = 0x31424752  # v4l2_fourcc("R", "G", "B", "1")
+V4L2_PIX_FMT_RGB444 = 0x34343452  # v4l2_fourcc("R", "4", "4", "4")
+V4L2_PIX_FMT_ARGB444 = 0x32315241  # v4l2_fourcc("A", "R", "1", "2")
+V4L2_PIX_FMT_XRGB444 = 0x32315258  # v4l2_fourcc("X", "R", "1", "2")
+V4L2_PIX_FMT_RGBA444 = 0x32314152  # v4l2_fourcc("R", "A", "1", "2")
+V4L2_PIX_FMT_RGBX444 = 0x32315852  # v4l2_fourcc("R", "X", "1", "2")
+V4L2_PIX_FMT_ABGR444 = 0x32314241  # v4l2_fourcc("A", "B", "1", "2")
+V4L2_PIX_FMT_XBGR444 = 0x32314258  # v4l2_fourcc("X", "B", "1", "2")
+V4L2_PIX_FMT_BGRA444 = 0x32314147  # v4l2_fourcc("G", "A", "1", "2")
+V4L2_PIX_FMT_BGRX444 = 0x32315842  # v4l2_fourcc("B", "X", "1", "2")
+V4L2_PIX_FMT_RGB555 = 0x4F424752  # v4l2_fourcc("R", "G", "B", "O")
+V4L2_PIX_FMT_ARGB555 = 0x35315241  # v4l2_fourcc("A", "R", "1", "5")
+V4L2_PIX_FMT_XRGB555 = 0x35315258  # v4l2_fourcc("X", "R", "1", "5")
+V4L2_PIX_FMT_RGBA555 = 0x35314152  # v4l2_fourcc("R", "A", "1", "5")
+V4L2_PIX_FMT_RGBX555 = 0x35315852  # v4l2_fourcc("R", "X", "1", "5")
+V4L2_PIX_FMT_ABGR555 = 0x35314241  # v4l2_fourcc("A", "B", "1", "5")
+V4L2_PIX_FMT_XBGR555 = 0x35314258  # v4l2_fourcc("X", "B", "1", "5")
+V4L2_PIX_FMT_BGRA555 = 0x35314142  # v4l2_fourcc("B", "A", "1", "5")
+V4L2_PIX_FMT_BGRX555 = 0x35315842  # v4l2_fourcc("B", "X", "1", "5")
+V4L2_PIX_FMT_RGB565 = 0x50424752  # v4l2_fourcc("R", "G", "B", "P")
+V4L2_PIX_FMT_RGB555X = 0x51424752  # v4l2_fourcc("R", "G", "B", "Q")
+V4L2_PIX_FMT_ARGB555X = 0xB5315241  # v4l2_fourcc_be("A", "R", "1", "5")
+V4L2_PIX_FMT_XRGB555X = 0xB5315258  # v4l2_fourcc_be("X", "R", "1", "5")
+V4L2_PIX_FMT_RGB565X = 0x52424752  # v4l2_fourcc("R", "G", "B", "R")
+V4L2_PIX_FMT_BGR666 = 0x48524742  # v4l2_fourcc("B", "G", "R", "H")
+V4L2_PIX_FMT_BGR24 = 0x33524742  # v4l2_fourcc("B", "G", "R", "3")
+V4L2_PIX_FMT_RGB24 = 0x33424752  # v4l2_fourcc("R", "G", "B", "3")
+V4L2_PIX_FMT_BGR32 = 0x34524742  # v4l2_fourcc("B", "G", "R", "4")
+V4L2_PIX_FMT_ABGR32 = 0x34325241  # v4l2_fourcc("A", "R", "2", "4")
+V4L2_PIX_FMT_XBGR32 = 0x34325258  # v4l2_fourcc("X", "R", "2", "4")
+V4L2_PIX_FMT_BGRA32 = 0x34324152  # v4l2_fourcc("R", "A", "2", "4")
+V4L2_PIX_FMT_BGRX32 = 0x34325852  # v4l2_fourcc("R", "X", "2", "4")
+V4L2_PIX_FMT_RGB32 = 0x34424752  # v4l2_fourcc("R", "G", "B", "4")
+V4L2_PIX_FMT_RGBA32 = 0x34324241  # v4l2_fourcc("A", "B", "2", "4")
+V4L2_PIX_FMT_RGBX32 = 0x34324258  # v4l2_fourcc("X", "B", "2", "4")
+V4L2_PIX_FMT_ARGB32 = 0x34324142  # v4l2_fourcc("B", "A", "2", "4")
+V4L2_PIX_FMT_XRGB32 = 0x34325842  # v4l2_fourcc("B", "X", "2", "4")
+V4L2_PIX_FMT_GREY = 0x59455247  # v4l2_fourcc("G", "R", "E", "Y")
+V4L2_PIX_FMT_Y4 = 0x20343059  # v4l2_fourcc("Y", "0", "4", " ")
+V4L2_PIX_FMT_Y6 = 0x20363059  # v4l2_fourcc("Y", "0", "6", " ")
+V4L2_PIX_FMT_Y10 = 0x20303159  # v4l2_fourcc("Y", "1", "0", " ")
+V4L2_PIX_FMT_Y12 = 0x20323159  # v4l2_fourcc("Y", "1", "2", " ")
+V4L2_PIX_FMT_Y14 = 0x20343159  # v4l2_fourcc("Y", "1", "4", " ")
+V4L2_PIX_FMT_Y16 = 0x20363159  # v4l2_fourcc("Y", "1", "6", " ")
+V4L2_PIX_FMT_Y16_BE = 0xA0363159  # v4l2_fourcc_be("Y", "1", "6", " ")
+V4L2_PIX_FMT_Y10BPACK = 0x42303159  # v4l2_fourcc("Y", "1", "0", "B")
+V4L2_PIX_FMT_Y10P = 0x50303159  # v4l2_fourcc("Y", "1", "0", "P")
+V4L2_PIX_FMT_IPU3_Y10 = 0x79337069  # v4l2_fourcc("i", "p", "3", "y")
+V4L2_PIX_FMT_PAL8 = 0x384C4150  # v4l2_fourcc("P", "A", "L", "8")
+V4L2_PIX_FMT_UV8 = 0x20385655  # v4l2_fourcc("U", "V", "8", " ")
+V4L2_PIX_FMT_YUYV = 0x56595559  # v4l2_fourcc("Y", "U", "Y", "V")
+V4L2_PIX_FMT_YYUV = 0x56555959  # v4l2_fourcc("Y", "Y", "U", "V")
+V4L2_PIX_FMT_YVYU = 0x55595659  # v4l2_fourcc("Y", "V", "Y", "U")
+V4L2_PIX_FMT_UYVY = 0x59565955  # v4l2_fourcc("U", "Y", "V", "Y")
+V4L2_PIX_FMT_VYUY = 0x59555956  # v4l2_fourcc("V", "Y", "U", "Y")
+V4L2_PIX_FMT_Y41P = 0x50313459  # v4l2_fourcc("Y", "4", "1", "P")
+V4L2_PIX_FMT_YUV444 = 0x34343459  # v4l2_fourcc("Y", "4", "4", "4")
+V4L2_PIX_FMT_YUV555 = 0x4F565559  # v4l2_fourcc("Y", "U", "V", "O")
+V4L2_PIX_FMT_YUV565 = 0x50565559  # v4l2_fourcc("Y", "U", "V", "P")
+V4L2_PIX_FMT_YUV24 = 0x33565559  # v4l2_fourcc("Y", "U", "V", "3")
+V4L2_PIX_FMT_YUV32 = 0x34565559  # v4l2_fourcc("Y", "U", "V", "4")
+V4L2_PIX_FMT_AYUV32 = 0x56555941  # v4l2_fourcc("A", "Y", "U", "V")
+V4L2_PIX_FMT_XYUV32 = 0x56555958  # v4l2_fourcc("X", "Y", "U", "V")
+V4L2_PIX_FMT_VUYA32 = 0x41595556  # v4l2_fourcc("V", "U", "Y", "A")
+V4L2_PIX_FMT_VUYX32 = 0x58595556  # v4l2_fourcc("V", "U", "Y", "X")
+V4L2_PIX_FMT_YUVA32 = 0x41565559  # v4l2_fourcc("Y", "U", "V", "A")
+V4L2_PIX_FMT_YUVX32 = 0x58565559  # v4l2_fourcc("Y", "U", "V", "X")
+V4L2_PIX_FMT_M420 = 0x3032344D  # v4l2_fourcc("M", "4", "2", "0")
+V4L2_PIX_FMT_NV12 = 0x3231564E  # v4l2_fourcc("N", "V", "1", "2")
+V4L2_PIX_FMT_NV21 = 0x3132564E  # v4l2_fourcc("N", "V", "2", "1")
+V4L2_PIX_FMT_NV16 = 0x3631564E  # v4l2_fourcc("N", "V", "1", "6")
+V4L2_PIX_FMT_NV61 = 0x3136564E  # v4l2_fourcc("N", "V", "6", "1")
+V4L2_PIX_FMT_NV24 = 0x3432564E  # v4l2_fourcc("N", "V", "2", "4")
+V4L2_PIX_FMT_NV42 = 0x3234564E  # v4l2_fourcc("N", "V", "4", "2")
+V4L2_PIX_FMT_P010 = 0x30313050  # v4l2_fourcc("P", "0", "1", "0")
+V4L2_PIX_FMT_NV12M = 0x32314D4E  # v4l2_fourcc("N", "M", "1", "2")
+V4L2_PIX_FMT_NV21M = 0x31324D4E  # v4l2_fourcc("N", "M", "2", "1")
+V4L2_PIX_FMT_NV16M = 0x36314D4E  # v4l2_fourcc("N", "M", "1", "6")
+V4L2_PIX_FMT_NV61M = 0x31364D4E  # v4l2_fourcc("N", "M", "6", "1")
+V4L2_PIX_FMT_YUV410 = 0x39565559  # v4l2_fourcc("Y", "U", "V", "9")
+V4L2_PIX_FMT_YVU410 = 0x39555659  # v4l2_fourcc("Y", "V", "U", "9")
+V4L2_PIX_FMT_YUV411P = 0x50313134  # v4l2_fourcc("4", "1", "1", "P")
+V4L2_PIX_FMT_YUV420 = 0x32315559  # v4l2_fourcc("Y", "U", "1", "2")
+V4L2_PIX_FMT_YVU420 = 0x32315659  # v4l2_fourcc("Y", "V", "1", "2")
+V4L2_PIX_FMT_YUV422P = 0x50323234  # v4l2_fourcc("4", "2", "2", "P")
+V4L2_PIX_FMT_YUV420M = 0x32314D59  # v4l2_fourcc("Y", "M", "1", "2")
+V4L2_PIX_FMT_YVU420M = 0x31324D59  # v4l2_fourcc("Y", "M", "2", "1")
+V4L2_PIX_FMT_YUV422M = 0x36314D59  # v4l2_fourcc("Y", "M", "1", "6")
+V4L2_PIX_FMT_YVU422M = 0x31364D59  # v4l2_fourcc("Y", "M", "6", "1")
+V4L2_PIX_FMT_YUV444M = 0x34324D59  # v4l2_fourcc("Y", "M", "2", "4")
+V4L2_PIX_FMT_YVU444M = 0x32344D59  # v4l2_fourcc("Y", "M", "4", "2")
+V4L2_PIX_FMT_NV12_4L4 = 0x32315456  # v4l2_fourcc("V", "T", "1", "2")
+V4L2_PIX_FMT_NV12_16L16 = 0x32314D48  # v4l2_fourcc("H", "M", "1", "2")
+V4L2_PIX_FMT_NV12_32L32 = 0x32315453  # v4l2_fourcc("S", "T", "1", "2")
+V4L2_PIX_FMT_P010_4L4 = 0x30313054  # v4l2_fourcc("T", "0", "1", "0")
+V4L2_PIX_FMT_NV12MT = 0x32314D54  # v4l2_fourcc("T", "M", "1", "2")
+V4L2_PIX_FMT_NV12MT_16X16 = 0x32314D56  # v4l2_fourcc("V", "M", "1", "2")
+V4L2_PIX_FMT_NV12M_8L128 = 0x3231414E  # v4l2_fourcc("N", "A", "1", "2")
+V4L2_PIX_FMT_NV12M_10BE_8L128 = 0xB231544E  # v4l2_fourcc_be("N", "T", "1", "2")
+V4L2_PIX_FMT_SBGGR8 = 0x31384142  # v4l2_fourcc("B", "A", "8", "1")
+V4L2_PIX_FMT_SGBRG8 = 0x47524247  # v4l2_fourcc("G", "B", "R", "G")
+V4L2_PIX_FMT_SGRBG8 = 0x47425247  # v4l2_fourcc("G", "R", "B", "G")
+V4L2_PIX_FMT_SRGGB8 = 0x42474752  # v4l2_fourcc("R", "G", "G", "B")
+V4L2_PIX_FMT_SBGGR10 = 0x30314742  # v4l2_fourcc("B", "G", "1", "0")
+V4L2_PIX_FMT_SGBRG10 = 0x30314247  # v4l2_fourcc("G", "B", "1", "0")
+V4L2_PIX_FMT_SGRBG10 = 0x30314142  # v4l2_fourcc("B", "A", "1", "0")
+V4L2_PIX_FMT_SRGGB10 = 0x30314752  # v4l2_fourcc("R", "G", "1", "0")
+V4L2_PIX_FMT_SBGGR10P = 0x41414270  # v4l2_fourcc("p", "B", "A", "A")
+V4L2_PIX_FMT_SGBRG10P = 0x41414770  # v4l2_fourcc("p", "G", "A", "A")
+V4L2_PIX_FMT_SGRBG10P = 0x41416770  # v4l2_fourcc("p", "g", "A", "A")
+V4L2_PIX_FMT_SRGGB10P = 0x41415270  # v4l2_fourcc("p", "R", "A", "A")
+V4L2_PIX_FMT_SBGGR10ALAW8 = 0x38414261  # v4l2_fourcc("a", "B", "A", "8")
+V4L2_PIX_FMT_SGBRG10ALAW8 = 0x38414761  # v4l2_fourcc("a", "G", "A", "8")
+V4L2_PIX_FMT_SGRBG10ALAW8 = 0x38416761  # v4l2_fourcc("a", "g", "A", "8")
+V4L2_PIX_FMT_SRGGB10ALAW8 = 0x38415261  # v4l2_fourcc("a", "R", "A", "8")
+V4L2_PIX_FMT_SBGGR10DPCM8 = 0x38414262  # v4l2_fourcc("b", "B", "A", "8")
+V4L2_PIX_FMT_SGBRG10DPCM8 = 0x38414762  # v4l2_fourcc("b", "G", "A", "8")
+V4L2_PIX_FMT_SGRBG10DPCM8 = 0x30314442  # v4l2_fourcc("B", "D", "1", "0")
+V4L2_PIX_FMT_SRGGB10DPCM8 = 0x38415262  # v4l2_fourcc("b", "R", "A", "8")
+V4L2_PIX_FMT_SBGGR12 = 0x32314742  # v4l2_fourcc("B", "G", "1", "2")
+V4L2_PIX_FMT_SGBRG12 = 0x32314247  # v4l2_fourcc("G", "B", "1", "2")
+V4L2_PIX_FMT_SGRBG12 = 0x32314142  # v4l2_fourcc("B", "A", "1", "2")
+V4L2_PIX_FMT_SRGGB12 = 0x32314752  # v4l2_fourcc("R", "G", "1", "2")
+V4L2_PIX_FMT_SBGGR12P = 0x43434270  # v4l2_fourcc("p", "B", "C", "C")
+V4L2_PIX_FMT_SGBRG12P = 0x43434770  # v4l2_fourcc("p", "G", "C", "C")
+V4L2_PIX_FMT_SGRBG12P = 0x43436770  # v4l2_fourcc("p", "g", "C", "C")
+V4L2_PIX_FMT_SRGGB12P = 0x43435270  # v4l2_fourcc("p", "R", "C", "C")
+V4L2_PIX_FMT_SBGGR14 = 0x34314742  # v4l2_fourcc("B", "G", "1", "4")
+V4L2_PIX_FMT_SGBRG14 = 0x34314247  # v4l2_fourcc("G", "B", "1", "4")
+V4L2_PIX_FMT_SGRBG14 = 0x34315247  # v4l2_fourcc("G", "R", "1", "4")
+V4L2_PIX_FMT_SRGGB14 = 0x34314752  # v4l2_fourcc("R", "G", "1", "4")
+V4L2_PIX_FMT_SBGGR14P = 0x45454270  # v4l2_fourcc("p", "B", "E", "E")
+V4L2_PIX_FMT_SGBRG14P = 0x45454770  # v4l2_fourcc("p", "G", "E", "E")
+V4L2_PIX_FMT_SGRBG14P = 0x45456770  # v4l2_fourcc("p", "g", "E", "E")
+V4L2_PIX_FMT_SRGGB14P = 0x45455270  # v4l2_fourcc("p", "R", "E", "E")
+V4L2_PIX_FMT_SBGGR16 = 0x32525942  # v4l2_fourcc("B", "Y", "R", "2")
+V4L2_PIX_FMT_SGBRG16 = 0x36314247  # v4l2_fourcc("G", "B", "1", "6")
+V4L2_PIX_FMT_SGRBG16 = 0x36315247  # v4l2_fourcc("G", "R", "1", "6")
+V4L2_PIX_FMT_SRGGB16 = 0x36314752  # v4l2_fourcc("R", "G", "1", "6")
+V4L2_PIX_FMT_HSV24 = 0x33565348  # v4l2_fourcc("H", "S", "V", "3")
+V4L2_PIX_FMT_HSV32 = 0x34565348  # v4l2_fourcc("H", "S", "V", "4")
+V4L2_PIX_FMT_MJPEG = 0x47504A4D  # v4l2_fourcc("M", "J", "P", "G")
+V4L2_PIX_FMT_JPEG = 0x4745504A  # v4l2_fourcc("J", "P", "E", "G")
+V4L2_PIX_FMT_DV = 0x64737664  # v4l2_fourcc("d", "v", "s", "d")
+V4L2_PIX_FMT_MPEG = 0x4745504D  # v4l2_fourcc("M", "P", "E", "G")
+V4L2_PIX_FMT_H264 = 0x34363248  # v4l2_fourcc("H", "2", "6", "4")
+V4L2_PIX_FMT_H264_NO_SC = 0x31435641  # v4l2_fourcc("A", "V", "C", "1")
+V4L2_PIX_FMT_H264_MVC = 0x3436324D  # v4l2_fourcc("M", "2", "6", "4")
+V4L2_PIX_FMT_H263 = 0x33363248  # v4l2_fourcc("H", "2", "6", "3")
+V4L2_PIX_FMT_MPEG1 = 0x3147504D  # v4l2_fourcc("M", "P", "G", "1")
+V4L2_PIX_FMT_MPEG2 = 0x3247504D  # v4l2_fourcc("M", "P", "G", "2")
+V4L2_PIX_FMT_MPEG2_SLICE = 0x5332474D  # v4l2_fourcc("M", "G", "2", "S")
+V4L2_PIX_FMT_MPEG4 = 0x3447504D  # v4l2_fourcc("M", "P", "G", "4")
+V4L2_PIX_FMT_XVID = 0x44495658  # v4l2_fourcc("X", "V", "I", "D")
+V4L2_PIX_FMT_VC1_ANNEX_G = 0x47314356  # v4l2_fourcc("V", "C", "1", "G")
+V4L2_PIX_FMT_VC1_ANNEX_L = 0x4C314356  # v4l2_fourcc("V", "C", "1", "L")
+V4L2_PIX_FMT_VP8 = 0x30385056  # v4l2_fourcc("V", "P", "8", "0")
+V4L2_PIX_FMT_VP8_FRAME = 0x46385056  # v4l2_fourcc("V", "P", "8", "F")
+V4L2_PIX_FMT_VP9 = 0x30395056  # v4l2_fourcc("V", "P", "9", "0")
+V4L2_PIX_FMT_VP9_FRAME = 0x46395056  # v4l2_fourcc("V", "P", "9", "F")
+V4L2_PIX_FMT_HEVC = 0x43564548  # v4l2_fourcc("H", "E", "V", "C")
+V4L2_PIX_FMT_FWHT = 0x54485746  # v4l2_fourcc("F", "W", "H", "T")
+V4L2_PIX_FMT_FWHT_STATELESS = 0x48574653  # v4l2_fourcc("S", "F", "W", "H")
+V4L2_PIX_FMT_H264_SLICE = 0x34363253  # v4l2_fourcc("S", "2", "6", "4")
+V4L2_PIX_FMT_HEVC_SLICE = 0x35363253  # v4l2_fourcc("S", "2", "6", "5")
+V4L2_PIX_FMT_CPIA1 = 0x41495043  # v4l2_fourcc("C", "P", "I", "A")
+V4L2_PIX_FMT_WNVA = 0x41564E57  # v4l2_fourcc("W", "N", "V", "A")
+V4L2_PIX_FMT_SN9C10X = 0x30313953  # v4l2_fourcc("S", "9", "1", "0")
+V4L2_PIX_FMT_SN9C20X_I420 = 0x30323953  # v4l2_fourcc("S", "9", "2", "0")
+V4L2_PIX_FMT_PWC1 = 0x31435750  # v4l2_fourcc("P", "W", "C", "1")
+V4L2_PIX_FMT_PWC2 = 0x32435750  # v4l2_fourcc("P", "W", "C", "2")
+V4L2_PIX_FMT_ET61X251 = 0x35323645  # v4l2_fourcc("E", "6", "2", "5")
+V4L2_PIX_FMT_SPCA501 = 0x31303553  # v4l2_fourcc("S", "5", "0", "1")
+V4L2_PIX_FMT_SPCA505 = 0x35303553  # v4l2_fourcc("S", "5", "0", "5")
+V4L2_PIX_FMT_SPCA508 = 0x38303553  # v4l2_fourcc("S", "5", "0", "8")
+V4L2_PIX_FMT_SPCA561 = 0x31363553  # v4l2_fourcc("S", "5", "6", "1")
+V4L2_PIX_FMT_PAC207 = 0x37303250  # v4l2_fourcc("P", "2", "0", "7")
+V4L2_PIX_FMT_MR97310A = 0x3031334D  # v4l2_fourcc("M", "3", "1", "0")
+V4L2_PIX_FMT_JL2005BCD = 0x30324C4A  # v4l2_fourcc("J", "L", "2", "0")
+V4L2_PIX_FMT_SN9C2028 = 0x584E4F53  # v4l2_fourcc("S", "O", "N", "X")
+V4L2_PIX_FMT_SQ905C = 0x43353039  # v4l2_fourcc("9", "0", "5", "C")
+V4L2_PIX_FMT_PJPG = 0x47504A50  # v4l2_fourcc("P", "J", "P", "G")
+V4L2_PIX_FMT_OV511 = 0x3131354F  # v4l2_fourcc("O", "5", "1", "1")
+V4L2_PIX_FMT_OV518 = 0x3831354F  # v4l2_fourcc("O", "5", "1", "8")
+V4L2_PIX_FMT_STV0680 = 0x30383653  # v4l2_fourcc("S", "6", "8", "0")
+V4L2_PIX_FMT_TM6000 = 0x30364D54  # v4l2_fourcc("T", "M", "6", "0")
+V4L2_PIX_FMT_CIT_YYVYUY = 0x56544943  # v4l2_fourcc("C", "I", "T", "V")
+V4L2_PIX_FMT_KONICA420 = 0x494E4F4B  # v4l2_fourcc("K", "O", "N", "I")
+V4L2_PIX_FMT_JPGL = 0x4C47504A  # v4l2_fourcc("J", "P", "G", "L")
+V4L2_PIX_FMT_SE401 = 0x31303453  # v4l2_fourcc("S", "4", "0", "1")
+V4L2_PIX_FMT_S5C_UYVY_JPG = 0x49433553  # v4l2_fourcc("S", "5", "C", "I")
+V4L2_PIX_FMT_Y8I = 0x20493859  # v4l2_fourcc("Y", "8", "I", " ")
+V4L2_PIX_FMT_Y12I = 0x49323159  # v4l2_fourcc("Y", "1", "2", "I")
+V4L2_PIX_FMT_Z16 = 0x2036315A  # v4l2_fourcc("Z", "1", "6", " ")
+V4L2_PIX_FMT_MT21C = 0x3132544D  # v4l2_fourcc("M", "T", "2", "1")
+V4L2_PIX_FMT_MM21 = 0x31324D4D  # v4l2_fourcc("M", "M", "2", "1")
+V4L2_PIX_FMT_INZI = 0x495A4E49  # v4l2_fourcc("I", "N", "Z", "I")
+V4L2_PIX_FMT_CNF4 = 0x34464E43  # v4l2_fourcc("C", "N", "F", "4")
+V4L2_PIX_FMT_HI240 = 0x34324948  # v4l2_fourcc("H", "I", "2", "4")
+V4L2_PIX_FMT_QC08C = 0x43383051  # v4l2_fourcc("Q", "0", "8", "C")
+V4L2_PIX_FMT_QC10C = 0x43303151  # v4l2_fourcc("Q", "1", "0", "C")
+V4L2_PIX_FMT_IPU3_SBGGR10 = 0x62337069  # v4l2_fourcc("i", "p", "3", "b")
+V4L2_PIX_FMT_IPU3_SGBRG10 = 0x67337069  # v4l2_fourcc("i", "p", "3", "g")
+V4L2_PIX_FMT_IPU3_SGRBG10 = 0x47337069  # v4l2_fourcc("i", "p", "3", "G")
+V4L2_PIX_FMT_IPU3_SRGGB10 = 0x72337069  # v4l2_fourcc("i", "p", "3", "r")
 
 
 pixfmt_rgb = [
@@ -241,3 +247,32 @@ pixfmt_rgba = [
     V4L2_PIX_FMT_RGBA555,
     V4L2_PIX_FMT_RGBA32,
 ]
+
+pixfmt_raw = [
+    V4L2_PIX_FMT_YUYV,
+    V4L2_PIX_FMT_UYVY,
+    V4L2_PIX_FMT_YVYU,
+    V4L2_PIX_FMT_VYUY,
+    V4L2_PIX_FMT_NV12,
+    V4L2_PIX_FMT_NV21,
+    V4L2_PIX_FMT_YUV420,
+    V4L2_PIX_FMT_YVU420,
+    V4L2_PIX_FMT_NV12M,
+    V4L2_PIX_FMT_NV21M,
+    V4L2_PIX_FMT_YUV420M,
+    V4L2_PIX_FMT_YVU420M,
+    V4L2_PIX_FMT_BGR24,
+    V4L2_PIX_FMT_BGR32,
+    V4L2_PIX_FMT_ABGR32,
+    V4L2_PIX_FMT_XBGR32,
+    V4L2_PIX_FMT_BGRA32,
+    V4L2_PIX_FMT_BGRX32,
+    V4L2_PIX_FMT_ARGB32,
+    V4L2_PIX_FMT_XRGB32,
+    V4L2_PIX_FMT_RGBX32,
+    V4L2_PIX_FMT_RGB565,
+    V4L2_PIX_FMT_RGB555,
+    V4L2_PIX_FMT_ARGB555,
+    V4L2_PIX_FMT_XRGB555,
+    V4L2_PIX_FMT_GREY,
+]
@@ -0,0 +1,125 @@
+import time
+from collections import namedtuple
+from typing import TYPE_CHECKING
+
+from webcam import WebCamException
+from webcam.v4l2.videodev2 import *
+
+if TYPE_CHECKING:
+    from webcam.v4l2 import v4l2WebCam
+
+
+class v4l2RawFrame(namedtuple("v4l2RawFrame", "data timestamp sequence flags")):
+    __slots__ = ()
+
+    @property
+    def error(self) -> bool:
+        return bool(self.flags & V4L2_BUF_FLAG_ERROR)
+
+    @property
+    def keyframe(self) -> bool:
+        return bool(self.flags & V4L2_BUF_FLAG_KEYFRAME)
+
+
+class v4l2Frame:
+    def __init__(
+        self,
+        camera: "v4l2WebCam",
+        buffer: v4l2_buffer,
+        data: memoryview,
+        planes: tuple[memoryview, ...] | None = None,
+    ) -> None:
+        self._camera = camera
+        self._buffer = buffer
+        self._data = data
+        # Only set for formats stored in more than one plane, `data` then being
+        # the first one.
+        self._planes = planes
+
+    def __del__(self) -> None:
+        self.release()
+
+    def __enter__(self) -> "v4l2Frame":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def __len__(self) -> int:
+        return self._buffer.bytesused
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(index={self.index}, "
+            f"sequence={self.sequence}, bytesused={self.bytesused}, "
+            f"released={self.released})"
+        )
+
+    def release(self) -> None:
+        if self._data is None:
+            return
+        self._data.release()
+        self._data = None
+        if self._planes is not None:
+            for plane in self._planes:
+                plane.release()
+            self._planes = None
+        self._camera._requeue(self._buffer)
+
+    @property
+    def data(self) -> memoryview:
+        if self._data is None:
+            raise WebCamException("frame has already been released")
+        return self._data
+
+    @property
+    def planes(self) -> tuple[memoryview, ...]:
+        if self._data is None:
+            raise WebCamException("frame has already been released")
+        return (self._data,) if self._planes is None else self._planes
+
+    @property
+    def index(self) -> int:
+        return self._buffer.index
+
+    @property
+    def bytesused(self) -> int:
+        return self._buffer.bytesused
+
+    @property
+    def timestamp(self) -> float:
+        timestamp = self._buffer.timestamp
+        return timestamp.tv_sec + timestamp.tv_usec / 1000000
+
+    @property
+    def sequence(self) -> int:
+        return self._buffer.sequence
+
+    @property
+    def flags(self) -> int:
+        return self._buffer.flags
+
+    @property
+    def latency(self) -> float:
+        # Only meaningful for drivers stamping with CLOCK_MONOTONIC.
+        return time.monotonic() - self.timestamp
+
+    @property
+    def monotonic(self) -> bool:
+        flags = self._buffer.flags & V4L2_BUF_FLAG_TIMESTAMP_MASK
+        return flags == V4L2_BUF_FLAG_TIMESTAMP_MONOTONIC
+
+    @property
+    def error(self) -> bool:
+        return bool(self._buffer.flags & V4L2_BUF_FLAG_ERROR)
+
+    @property
+    def keyframe(self) -> bool:
+        return bool(self._buffer.flags & V4L2_BUF_FLAG_KEYFRAME)
+
+    @property
+    def released(self) -> bool:
+        return self._data is None
+
+
+__all__ = ("v4l2RawFrame", "v4l2Frame")
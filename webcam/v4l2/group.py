@@ -0,0 +1,158 @@
+import select
+import time
+from collections import namedtuple
+from queue import Queue
+from typing import Callable, Iterable
+
+from webcam import WebCamException
+from webcam.v4l2 import v4l2Frame, v4l2WebCam
+
+v4l2CameraStats = namedtuple(
+    "v4l2CameraStats",
+    "frames fps latency max_latency lost",
+    defaults=[0, 0.0, 0.0, 0.0, 0],
+)
+
+
+class v4l2CameraGroup:
+    def __init__(
+        self,
+        cameras: Iterable[v4l2WebCam] = (),
+        queue: Queue | None = None,
+        sync_tolerance: float | None = None,
+        on_sync: Callable[[tuple[v4l2Frame, ...]], None] | None = None,
+    ) -> None:
+        if sync_tolerance is not None and on_sync is None:
+            raise WebCamException("on_sync is required for synchronized capture")
+        self._epoll = select.epoll()
+        self._cameras: dict[int, v4l2WebCam] = {}
+        self._callbacks: dict[int, Callable[[v4l2WebCam, v4l2Frame], None]] = {}
+        self._stats: dict[int, list] = {}
+        self._queue = queue
+        self._sync_tolerance = sync_tolerance
+        self._on_sync = on_sync
+        self._sync: dict[int, v4l2Frame] = {}
+        for camera in cameras:
+            self.add(camera)
+
+    def __enter__(self) -> "v4l2CameraGroup":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._cameras)
+
+    def add(
+        self,
+        camera: v4l2WebCam,
+        callback: Callable[[v4l2WebCam, v4l2Frame], None] | None = None,
+    ) -> None:
+        fd = camera.fileno()
+        if fd not in self._cameras:
+            self._epoll.register(fd, select.EPOLLIN | select.EPOLLPRI)
+        self._cameras[fd] = camera
+        self._stats[fd] = [0, 0.0, 0.0, 0.0, 0.0]
+        if callback is not None:
+            self._callbacks[fd] = callback
+
+    def remove(self, camera: v4l2WebCam) -> None:
+        fd = camera.fileno()
+        if fd not in self._cameras:
+            return
+        self._epoll.unregister(fd)
+        del self._cameras[fd]
+        del self._stats[fd]
+        self._callbacks.pop(fd, None)
+        if (frame := self._sync.pop(fd, None)) is not None:
+            frame.release()
+
+    def close(self) -> None:
+        for frame in self._sync.values():
+            frame.release()
+        self._sync.clear()
+        self._epoll.close()
+
+    def _account(self, fd: int, frame: v4l2Frame) -> None:
+        now = time.monotonic()
+        stats = self._stats[fd]
+        if stats[0] == 0:
+            stats[1] = now
+        stats[0] += 1
+        latency = max(0.0, now - frame.timestamp)
+        # Exponentially weighted, so the figures follow the current load.
+        stats[2] += (latency - stats[2]) * 0.1 if stats[0] > 1 else latency
+        stats[3] = max(stats[3], latency)
+        stats[4] = now
+
+    def _dispatch(self, fd: int, frame: v4l2Frame) -> None:
+        if self._sync_tolerance is not None:
+            self._match(fd, frame)
+        elif fd in self._callbacks:
+            with frame:
+                self._callbacks[fd](self._cameras[fd], frame)
+        elif self._queue is not None:
+            self._queue.put((self._cameras[fd], frame))
+        else:
+            frame.release()
+
+    def _match(self, fd: int, frame: v4l2Frame) -> None:
+        if (previous := self._sync.get(fd)) is not None:
+            previous.release()
+        self._sync[fd] = frame
+        if len(self._sync) < len(self._cameras):
+            return
+        timestamps = [f.timestamp for f in self._sync.values()]
+        if max(timestamps) - min(timestamps) > self._sync_tolerance:
+            return
+        frames = tuple(self._sync[fd] for fd in self._cameras)
+        self._sync.clear()
+        try:
+            self._on_sync(frames)
+        finally:
+            for f in frames:
+                f.release()
+
+    def open(self) -> None:
+        for camera in self._cameras.values():
+            camera.open()
+
+    def poll(self, timeout: float = -1) -> int:
+        count = 0
+        for fd, mask in self._epoll.poll(timeout):
+            camera = self._cameras.get(fd)
+            if camera is None:
+                continue
+            if mask & select.EPOLLPRI:
+                camera.process_events()
+            if not mask & select.EPOLLIN:
+                continue
+            try:
+                frame = camera.capture_frame()
+            except BlockingIOError:
+                continue
+            self._account(fd, frame)
+            self._dispatch(fd, frame)
+            count += 1
+        return count
+
+    def run(self, duration: float | None = None) -> None:
+        self.open()
+        deadline = None if duration is None else time.monotonic() + duration
+        while deadline is None or (remain := deadline - time.monotonic()) > 0:
+            self.poll(-1 if deadline is None else remain)
+
+    def stats(self) -> dict[v4l2WebCam, v4l2CameraStats]:
+        result = {}
+        for fd, (frames, first, latency, max_latency, last) in self._stats.items():
+            elapsed = last - first
+            fps = (frames - 1) / elapsed if frames > 1 and elapsed > 0 else 0.0
+            camera = self._cameras[fd]
+            result[camera] = v4l2CameraStats(
+                frames, fps, latency, max_latency, camera.lost_frames
+            )
+        return result
+
+
+__all__ = ("v4l2CameraStats", "v4l2CameraGroup")
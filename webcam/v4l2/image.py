@@ -0,0 +1,26 @@
+from io import BytesIO
+
+from pyglet.image import AbstractImage, ImageData
+from pyglet.image import load as load_image
+
+# pyglet is only needed to hand out images from capture() and latest(), so this
+# module is imported on first use and headless capture never loads pyglet or
+# the display stack behind it.
+
+
+def from_jpeg(data: bytes) -> AbstractImage:
+    return load_image("image.jpg", BytesIO(data))
+
+
+def from_array(array) -> AbstractImage:
+    height, width, channels = array.shape
+    fmt = "L" if channels == 1 else "RGB"
+    # Frames are stored top row first, hence the negative pitch.
+    return ImageData(width, height, fmt, array.tobytes(), pitch=-width * channels)
+
+
+def from_bytes(width: int, height: int, fmt: str, data: bytes) -> AbstractImage:
+    return ImageData(width, height, fmt, data)
+
+
+__all__ = ("from_jpeg", "from_array", "from_bytes")
@@ -0,0 +1,136 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable
+
+# Upper bounds, in seconds, of the histogram buckets. The last bucket is +Inf.
+_buckets = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+
+
+class v4l2Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum", "max")
+
+    def __init__(self, buckets: tuple[float, ...] = _buckets) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, fraction: float) -> float:
+        # Resolved to the upper bound of the bucket the percentile falls in.
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class v4l2Metrics:
+    def __init__(
+        self,
+        labels: dict[str, str] | None = None,
+        callback: Callable[[str, float], None] | None = None,
+        buckets: tuple[float, ...] = _buckets,
+    ) -> None:
+        self._labels = dict(labels or {})
+        self._callback = callback
+        self._buckets = buckets
+        self._timers: dict[str, v4l2Histogram] = {}
+        self._counters: dict[str, int] = {}
+        self._lock = Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            if (histogram := self._timers.get(stage)) is None:
+                histogram = self._timers[stage] = v4l2Histogram(self._buckets)
+            histogram.observe(seconds)
+        if self._callback is not None:
+            self._callback(stage, seconds)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+        if self._callback is not None:
+            self._callback(name, n)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+
+    def histogram(self, stage: str) -> v4l2Histogram | None:
+        return self._timers.get(stage)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "labels": dict(self._labels),
+                "counters": dict(self._counters),
+                "timers": {
+                    stage: {
+                        "count": h.count,
+                        "mean": h.mean,
+                        "p50": h.percentile(0.5),
+                        "p90": h.percentile(0.9),
+                        "p99": h.percentile(0.99),
+                        "max": h.max,
+                    }
+                    for stage, h in self._timers.items()
+                },
+            }
+
+    def prometheus(self, prefix: str = "webcam") -> str:
+        def labels(**extra: str) -> str:
+            pairs = {**self._labels, **extra}
+            return ",".join(f'{key}="{value}"' for key, value in pairs.items())
+
+        lines = []
+        with self._lock:
+            lines.append(f"# TYPE {prefix}_events_total counter")
+            for name, value in self._counters.items():
+                lines.append(f"{prefix}_events_total{{{labels(event=name)}}} {value}")
+            lines.append(f"# TYPE {prefix}_stage_seconds histogram")
+            for stage, h in self._timers.items():
+                cumulative = 0
+                for bound, count in zip((*h.buckets, "+Inf"), h.counts):
+                    cumulative += count
+                    le = labels(stage=stage, le=str(bound))
+                    lines.append(f"{prefix}_stage_seconds_bucket{{{le}}} {cumulative}")
+                lines.append(
+                    f"{prefix}_stage_seconds_sum{{{labels(stage=stage)}}} {h.sum}"
+                )
+                lines.append(
+                    f"{prefix}_stage_seconds_count{{{labels(stage=stage)}}} {h.count}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+__all__ = ("v4l2Histogram", "v4l2Metrics")
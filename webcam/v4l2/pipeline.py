@@ -0,0 +1,352 @@
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable
+
+import numpy as np
+
+from webcam import WebCamException
+from webcam.v4l2.convert import v4l2Converter
+from webcam.v4l2.fourcc import V4L2_PIX_FMT_GREY
+
+if TYPE_CHECKING:
+    from webcam.v4l2 import v4l2Frame, v4l2WebCam
+
+# Y in 16..235 stretched to 0..255, the same as the RGB conversion does.
+_luma = np.clip((np.arange(256) - 16) * 298 + 128 >> 8, 0, 255).astype(np.uint8)
+
+
+class v4l2PipelineOutput:
+    # One stream derived from the camera's frames: a region, every `decimate`th
+    # pixel of it, in colour or grey, at most `max_fps` times a second. The
+    # array is reused for every frame, so copy it to keep it.
+    def __init__(
+        self,
+        name: str,
+        crop: tuple[int, int, int, int] | None = None,
+        decimate: int = 1,
+        grayscale: bool = False,
+        max_fps: float | None = None,
+        callback: Callable[["v4l2PipelineOutput", np.ndarray], None] | None = None,
+    ) -> None:
+        if decimate < 1:
+            raise WebCamException("decimate must be at least 1")
+        if max_fps is not None and max_fps <= 0:
+            raise WebCamException("max_fps must be positive")
+        self.name = name
+        self.crop = None if crop is None else tuple(crop)
+        self.decimate = decimate
+        self.grayscale = grayscale
+        self.max_fps = max_fps
+        self.callback = callback
+        self.array: np.ndarray | None = None
+        self.timestamp = 0.0
+        self.sequence = 0
+        self.frames = 0
+        self.skipped = 0
+        self._interval = None if max_fps is None else 1 / max_fps
+        self._next: float | None = None
+        self._region = (0, 0, 0, 0)
+        self._converter: v4l2Converter | None = None
+        self._gray: tuple[np.ndarray, np.ndarray] | None = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(name={self.name!r}, crop={self.crop}, "
+            f"decimate={self.decimate}, grayscale={self.grayscale})"
+        )
+
+    def _due(self, timestamp: float) -> bool:
+        if self._interval is None:
+            return True
+        # A quarter of an interval of slack keeps jitter from skipping a frame
+        # that is only a little early, e.g. every other frame of a 60 fps
+        # stream for a 30 fps output.
+        if self._next is not None and timestamp < self._next - self._interval / 4:
+            self.skipped += 1
+            return False
+        if self._next is None or timestamp - self._next > self._interval:
+            self._next = timestamp
+        self._next += self._interval
+        return True
+
+    def _layout(self, width: int, height: int, channels: int) -> None:
+        left, top, w, h = self.crop or (0, 0, width, height)
+        if left < 0 or top < 0 or w <= 0 or h <= 0:
+            raise WebCamException(f"invalid crop {self.crop} for output {self.name!r}")
+        if left + w > width or top + h > height:
+            raise WebCamException(
+                f"crop {self.crop} of output {self.name!r} does not fit "
+                f"{width}x{height} frames"
+            )
+        self._region = (left, top, w, h)
+        n = self.decimate
+        channels = 1 if self.grayscale else channels
+        shape = (-(-h // n), -(-w // n), channels)
+        if self.array is None or self.array.shape != shape:
+            self.array = np.empty(shape, np.uint8)
+
+    def _slice(self, source: np.ndarray, scale: int = 1) -> np.ndarray:
+        # The output's pixels in an image decoded at 1/`scale` of the frame size.
+        left, top, w, h = (value // scale for value in self._region)
+        n = self.decimate // scale
+        return source[top : top + h : n, left : left + w : n]
+
+    @property
+    def full(self) -> bool:
+        # Whether the output is the whole frame in colour, at 1/`decimate` size.
+        return self.crop is None and not self.grayscale
+
+
+class v4l2Pipeline:
+    # Feeds one capture to several outputs: the full frame and any number of
+    # crops, decimated previews and grey versions of it. Raw frames are only
+    # read through strided views of the driver's buffer, converting just the
+    # pixels an output keeps, and MJPEG frames are decoded once per frame at the
+    # smallest DCT scale the due outputs allow.
+    def __init__(
+        self,
+        camera: "v4l2WebCam",
+        full: bool = True,
+        max_fps: float | None = None,
+        callback: Callable[[v4l2PipelineOutput, np.ndarray], None] | None = None,
+    ) -> None:
+        self._camera = camera
+        self._outputs: dict[str, v4l2PipelineOutput] = {}
+        self._geometry = None
+        self._converter: v4l2Converter | None = None
+        self._decoders = {}
+        self._scratch: dict[int, np.ndarray] = {}
+        if full:
+            self.add_output("full", max_fps=max_fps, callback=callback)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(outputs={list(self._outputs)})"
+
+    def add_output(
+        self,
+        name: str,
+        crop: tuple[int, int, int, int] | None = None,
+        decimate: int = 1,
+        grayscale: bool = False,
+        max_fps: float | None = None,
+        callback: Callable[[v4l2PipelineOutput, np.ndarray], None] | None = None,
+    ) -> v4l2PipelineOutput:
+        if name in self._outputs:
+            raise WebCamException(f"output {name!r} already exists")
+        output = v4l2PipelineOutput(name, crop, decimate, grayscale, max_fps, callback)
+        if self._geometry is not None:
+            self._setup(output, self._geometry)
+        self._outputs[name] = output
+        return output
+
+    def remove_output(self, name: str) -> None:
+        if self._outputs.pop(name, None) is None:
+            raise WebCamException(f"no output named {name!r}")
+
+    def _check_geometry(self) -> None:
+        # Rebuilt whenever the camera's format or size changed, e.g. after
+        # configure(), set_roi() or a source change.
+        camera = self._camera
+        geometry = (camera.pixelformat, camera.size, camera._bytesperline)
+        if geometry == self._geometry:
+            return
+        if camera._data_fmt == "MJPEG":
+            self._converter = None
+        else:
+            try:
+                self._converter = v4l2Converter(
+                    camera.pixelformat, *camera.size, camera._bytesperline
+                )
+            except WebCamException:
+                raise WebCamException(
+                    f"{camera._device} captures {camera._data_fmt}, "
+                    "which a pipeline cannot convert"
+                )
+        self._decoders.clear()
+        self._scratch.clear()
+        # Only once every output fits, so the next frame checks them again.
+        for output in self._outputs.values():
+            self._setup(output, geometry)
+        self._geometry = geometry
+
+    def _setup(self, output: v4l2PipelineOutput, geometry: tuple) -> None:
+        pixelformat, (width, height), bytesperline = geometry
+        channels = 1 if pixelformat == V4L2_PIX_FMT_GREY else 3
+        output._layout(width, height, channels)
+        if self._converter is not None:
+            # Its scratch buffers are sized for this output only.
+            output._converter = v4l2Converter(pixelformat, width, height, bytesperline)
+
+    def _to_gray(self, output: v4l2PipelineOutput, rgb: np.ndarray) -> None:
+        # BT.601 luma weights in 8.8 fixed point, summed in 16 bits.
+        out = output.array[..., 0]
+        if output._gray is None or output._gray[0].shape != out.shape:
+            output._gray = (
+                np.empty(out.shape, np.uint16),
+                np.empty(out.shape, np.uint16),
+            )
+        s, t = output._gray
+        np.multiply(rgb[..., 0], 77, out=s, dtype=np.uint16)
+        np.multiply(rgb[..., 1], 150, out=t, dtype=np.uint16)
+        np.add(s, t, out=s)
+        np.multiply(rgb[..., 2], 29, out=t, dtype=np.uint16)
+        np.add(s, t, out=s)
+        np.add(s, 128, out=s)
+        np.right_shift(s, 8, out=s)
+        out[...] = s
+
+    def _derive(self, output: v4l2PipelineOutput, source: np.ndarray, scale: int):
+        # From a converted or decoded image.
+        if source is output.array:
+            return
+        view = output._slice(source, scale)
+        if output.grayscale and view.shape[2] == 3:
+            self._to_gray(output, view)
+        else:
+            output.array[...] = view
+
+    def _full(self, data, due: list[v4l2PipelineOutput]) -> np.ndarray:
+        # The whole frame converted, into the full output's array if one is due.
+        view = self._converter.view(data)
+        if view is not None:
+            return view
+        for output in due:
+            if output.full and output.decimate == 1:
+                return self._converter(data, output.array)
+        shape = self._converter.shape
+        scratch = self._scratch.get(1)
+        if scratch is None:
+            scratch = self._scratch[1] = np.empty(shape, np.uint8)
+        return self._converter(data, scratch)
+
+    def _process_raw(self, data, due: list[v4l2PipelineOutput]) -> None:
+        yuv = self._converter.yuv(data)
+        if yuv is None:
+            full = self._full(data, due)
+            for output in due:
+                self._derive(output, full, 1)
+            return
+        y, u, v, sy, sx = yuv
+        pending = []
+        for output in due:
+            left, top, w, h = output._region
+            n = output.decimate
+            out = output.array
+            if output.grayscale:
+                np.take(_luma, output._slice(y), out=out[..., 0], mode="clip")
+            elif top % sy or left % sx:
+                pending.append(output)
+            elif n % sy == 0 and n % sx == 0:
+                # Every output pixel has a chroma sample of its own.
+                oh, ow = out.shape[:2]
+                cu = u[top // sy :: n // sy, left // sx :: n // sx][:oh, :ow]
+                cv = v[top // sy :: n // sy, left // sx :: n // sx][:oh, :ow]
+                output._converter.convert_yuv(output._slice(y), cu, cv, 1, 1, out)
+            elif n == 1 and h % sy == 0 and w % sx == 0:
+                cu = u[top // sy : (top + h) // sy, left // sx : (left + w) // sx]
+                cv = v[top // sy : (top + h) // sy, left // sx : (left + w) // sx]
+                output._converter.convert_yuv(output._slice(y), cu, cv, sy, sx, out)
+            else:
+                pending.append(output)
+        if pending:
+            # Regions that split a chroma sample are cut from the whole frame.
+            full = self._full(data, pending)
+            for output in pending:
+                self._derive(output, full, 1)
+
+    def _decoder(self, scale: int):
+        decoder = self._decoders.get(scale)
+        if decoder is None:
+            camera = self._camera
+            if camera._decoder is not None:
+                # The decoder the camera was given, only at another scale.
+                try:
+                    decoder = camera._decoder.with_scale(scale)
+                except NotImplementedError:
+                    pass
+            if decoder is None:
+                from webcam.v4l2.decode import default_decoder
+
+                decoder = default_decoder(*camera.size, scale)
+            self._decoders[scale] = decoder
+        return decoder
+
+    def _scale(self, output: v4l2PipelineOutput) -> int:
+        # The smallest DCT scale this output's pixels can all be taken from.
+        for scale in (8, 4, 2):
+            if all(value % scale == 0 for value in output._region):
+                if output.decimate % scale == 0:
+                    return scale
+        return 1
+
+    def _process_mjpeg(self, data, due: list[v4l2PipelineOutput]) -> None:
+        scale = min(self._scale(output) for output in due)
+        decoder = self._decoder(scale)
+        for output in due:
+            if output.full and output.decimate == scale:
+                decoded = decoder(data, output.array)
+                break
+        else:
+            decoded = self._scratch.get(scale)
+            if decoded is None:
+                decoded = self._scratch[scale] = np.empty(decoder.shape, np.uint8)
+            decoder(data, decoded)
+        for output in due:
+            self._derive(output, decoded, scale)
+
+    def process(self, frame: "v4l2Frame") -> dict[str, np.ndarray]:
+        # Returns the arrays of the outputs that were due for this frame.
+        self._check_geometry()
+        due = [
+            output for output in self._outputs.values() if output._due(frame.timestamp)
+        ]
+        if not due:
+            return {}
+        metrics = self._camera._metrics
+        start = perf_counter()
+        data = frame._planes or frame.data
+        try:
+            if self._converter is None:
+                self._process_mjpeg(data, due)
+            else:
+                self._process_raw(data, due)
+        except Exception:
+            if metrics is not None:
+                metrics.count("decode_errors")
+            raise
+        if metrics is not None:
+            metrics.observe("decode", perf_counter() - start)
+        result = {}
+        for output in due:
+            output.timestamp = frame.timestamp
+            output.sequence = frame.sequence
+            output.frames += 1
+            result[output.name] = output.array
+            if output.callback is not None:
+                output.callback(output, output.array)
+        return result
+
+    def capture(self) -> dict[str, np.ndarray]:
+        with self._camera.capture_frame() as frame:
+            return self.process(frame)
+
+    def run(self, duration: float | None = None, frames: int | None = None) -> None:
+        start = None
+        count = 0
+        while frames is None or count < frames:
+            with self._camera.capture_frame() as frame:
+                self.process(frame)
+                if start is None:
+                    start = frame.timestamp
+                elif duration is not None and frame.timestamp - start >= duration:
+                    break
+            count += 1
+
+    def __getitem__(self, name: str) -> v4l2PipelineOutput:
+        return self._outputs[name]
+
+    @property
+    def outputs(self) -> dict[str, v4l2PipelineOutput]:
+        return dict(self._outputs)
+
+
+__all__ = ("v4l2PipelineOutput", "v4l2Pipeline")
@@ -0,0 +1,241 @@
+from collections import namedtuple
+from ctypes import c_ubyte
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from webcam import WebCamException
+from webcam.v4l2.frame import v4l2RawFrame
+from webcam.v4l2.videodev2 import V4L2_BUF_FLAG_ERROR, V4L2_BUF_FLAG_KEYFRAME
+
+if TYPE_CHECKING:
+    from numpy import ndarray
+
+v4l2PoolStats = namedtuple(
+    "v4l2PoolStats", "size allocated in_use high_water hits misses"
+)
+
+
+class _v4l2PoolEntry:
+    __slots__ = ("size", "free", "allocated", "in_use", "high_water", "hits", "misses")
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.free: list[bytearray] = []
+        self.allocated = 0
+        self.in_use = 0
+        self.high_water = 0
+        self.hits = 0
+        self.misses = 0
+
+
+class v4l2PoolBuffer:
+    # A buffer lent by a v4l2FramePool. It goes back to the pool when the last
+    # reference is released, after which its memory is handed out again, so
+    # views of it must not be used after release(). A buffer that is dropped
+    # instead goes back once the views taken from it are gone too.
+    __slots__ = (
+        "_pool",
+        "_key",
+        "_storage",
+        "_refs",
+        "_length",
+        "timestamp",
+        "sequence",
+        "flags",
+    )
+
+    def __init__(self, pool: "v4l2FramePool", key: tuple, storage: bytearray) -> None:
+        self._pool = pool
+        self._key = key
+        self._storage = storage
+        self._refs = 1
+        self._length = len(storage)
+        self.timestamp = 0.0
+        self.sequence = 0
+        self.flags = 0
+
+    def __del__(self) -> None:
+        # Views keep the buffer alive, so this only runs once none is left.
+        if self._refs:
+            self._refs = 1
+            self.release()
+
+    def __enter__(self) -> "v4l2PoolBuffer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(key={self._key}, "
+            f"length={self._length}, refs={self._refs})"
+        )
+
+    def fill(self, planes) -> "v4l2PoolBuffer":
+        # Planes are stored one after the other. Assigning to the bytearray
+        # itself would copy each plane into a temporary first.
+        offset = 0
+        with memoryview(self._storage) as view:
+            for plane in planes:
+                view[offset : offset + len(plane)] = plane
+                offset += len(plane)
+        self._length = offset
+        return self
+
+    def retain(self) -> bool:
+        # Fails once the buffer went back to the pool, so a reference taken
+        # from a shared slot never revives recycled memory.
+        with self._pool._lock:
+            if not self._refs:
+                return False
+            self._refs += 1
+            return True
+
+    def release(self) -> None:
+        with self._pool._lock:
+            if not self._refs:
+                return
+            self._refs -= 1
+            if self._refs:
+                return
+        self._pool._recycle(self._key, self._storage)
+
+    def _view(self) -> memoryview:
+        # A view of the storage that holds a reference to this buffer, through
+        # the ctypes array it is taken from, so `cam.capture_raw().data` does
+        # not hand the storage back to the pool while the view is still used.
+        array = (c_ubyte * len(self._storage)).from_buffer(self._storage)
+        array._owner = self
+        return memoryview(array).cast("B")
+
+    def array(self, shape: tuple[int, ...]) -> "ndarray":
+        import numpy as np
+
+        count = 1
+        for n in shape:
+            count *= n
+        return np.frombuffer(self._view(), np.uint8, count).reshape(shape)
+
+    @property
+    def data(self) -> memoryview:
+        if not self._refs:
+            raise WebCamException("buffer has already been released")
+        return self._view()[: self._length]
+
+    @property
+    def key(self) -> tuple:
+        return self._key
+
+    @property
+    def error(self) -> bool:
+        return bool(self.flags & V4L2_BUF_FLAG_ERROR)
+
+    @property
+    def keyframe(self) -> bool:
+        return bool(self.flags & V4L2_BUF_FLAG_KEYFRAME)
+
+
+class v4l2PooledRawFrame(v4l2RawFrame):
+    # What capture_raw() returns with a pool: a v4l2RawFrame that unpacks and
+    # indexes like any other, whose data is lent from the pool. Releasing the
+    # frame, or leaving its with block, returns the buffer; a dropped frame
+    # returns it once its data is no longer referenced either.
+    def __new__(cls, buffer: v4l2PoolBuffer) -> "v4l2PooledRawFrame":
+        self = super().__new__(
+            cls, buffer.data, buffer.timestamp, buffer.sequence, buffer.flags
+        )
+        self._buffer = buffer
+        return self
+
+    def __enter__(self) -> "v4l2PooledRawFrame":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def release(self) -> None:
+        self._buffer.release()
+
+    @property
+    def buffer(self) -> v4l2PoolBuffer:
+        return self._buffer
+
+
+class v4l2FramePool:
+    # Preallocated buffers keyed by (pixel format, width, height), so a capture
+    # loop that releases what it takes stops allocating after the first frames.
+    # At most `max_free` buffers per key are kept; more are freed on release.
+    def __init__(self, max_free: int = 8) -> None:
+        self._max_free = max_free
+        self._entries: dict[tuple, _v4l2PoolEntry] = {}
+        self._lock = Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(keys={len(self._entries)})"
+
+    def acquire(self, key: tuple, size: int) -> v4l2PoolBuffer:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _v4l2PoolEntry(size)
+            elif entry.size < size:
+                # Buffers that are too small are dropped as they come back.
+                entry.size = size
+                entry.allocated -= len(entry.free)
+                entry.free.clear()
+            if entry.free:
+                storage = entry.free.pop()
+                entry.hits += 1
+            else:
+                storage = None
+                entry.misses += 1
+                entry.allocated += 1
+            entry.in_use += 1
+            if entry.in_use > entry.high_water:
+                entry.high_water = entry.in_use
+            size = entry.size
+        if storage is None:
+            storage = bytearray(size)
+        return v4l2PoolBuffer(self, key, storage)
+
+    def _recycle(self, key: tuple, storage: bytearray) -> None:
+        with self._lock:
+            entry = self._entries[key]
+            entry.in_use -= 1
+            if len(storage) == entry.size and len(entry.free) < self._max_free:
+                entry.free.append(storage)
+            else:
+                entry.allocated -= 1
+
+    def clear(self) -> None:
+        # Frees the idle buffers, buffers in use are freed when released.
+        with self._lock:
+            for entry in self._entries.values():
+                entry.allocated -= len(entry.free)
+                entry.free.clear()
+
+    def stats(self) -> dict[tuple, v4l2PoolStats]:
+        with self._lock:
+            return {
+                key: v4l2PoolStats(
+                    entry.size,
+                    entry.allocated,
+                    entry.in_use,
+                    entry.high_water,
+                    entry.hits,
+                    entry.misses,
+                )
+                for key, entry in self._entries.items()
+            }
+
+    @property
+    def misses(self) -> int:
+        with self._lock:
+            return sum(entry.misses for entry in self._entries.values())
+
+
+__all__ = ("v4l2PoolStats", "v4l2PoolBuffer", "v4l2PooledRawFrame", "v4l2FramePool")
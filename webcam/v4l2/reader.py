@@ -0,0 +1,82 @@
+import select
+from threading import Event, Thread
+from typing import TYPE_CHECKING
+
+from webcam.v4l2.pool import v4l2PoolBuffer
+
+if TYPE_CHECKING:
+    from webcam.v4l2 import v4l2WebCam
+
+
+class v4l2FrameReader(Thread):
+    # The reader is the only writer of `_ring` and `_latest`, and it publishes a
+    # slot by rebinding `_latest` after the slot is filled. Both are single
+    # reference stores, so consumers never need a lock to see a complete frame.
+    # Pooled frames are released by the reader when their slot is reused, and
+    # consumers retain one before using it.
+    def __init__(self, camera: "v4l2WebCam", slots: int = 4) -> None:
+        super().__init__(name=f"{camera!r} reader", daemon=True)
+        self._camera = camera
+        slots = max(1, slots)
+        self._ring: list[tuple[int, "bytes | v4l2PoolBuffer"] | None] = [None] * slots
+        self._latest = -1
+        self._fetched = -1
+        self._drops = 0
+        self._ready = Event()
+        self._stopped = Event()
+
+    def run(self) -> None:
+        fd = self._camera.fileno()
+        slots = len(self._ring)
+        sequence = 0
+        while not self._stopped.is_set():
+            # Events raise POLLPRI, which select() reports as exceptional.
+            readable, _, exceptional = select.select([fd], [], [fd], 0.1)
+            if exceptional:
+                self._camera.process_events()
+            if not readable:
+                continue
+            with self._camera._dequeue() as frame:
+                data = self._camera._snapshot(frame)
+            old = self._ring[sequence % slots]
+            self._ring[sequence % slots] = (sequence, data)
+            self._latest = sequence
+            sequence += 1
+            self._ready.set()
+            if old is not None and isinstance(old[1], v4l2PoolBuffer):
+                old[1].release()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+        for i, slot in enumerate(self._ring):
+            if slot is not None and isinstance(slot[1], v4l2PoolBuffer):
+                slot[1].release()
+            self._ring[i] = None
+
+    def latest(
+        self, timeout: float | None = None
+    ) -> tuple[int, "bytes | v4l2PoolBuffer"] | None:
+        # A pooled frame is retained for the caller, who releases it.
+        if not self._ready.wait(timeout):
+            return None
+        while True:
+            sequence, data = self._ring[self._latest % len(self._ring)]
+            if not isinstance(data, v4l2PoolBuffer) or data.retain():
+                break
+        if sequence > self._fetched:
+            self._drops += sequence - self._fetched - 1
+            self._fetched = sequence
+        return sequence, data
+
+    @property
+    def frames(self) -> int:
+        return self._latest + 1
+
+    @property
+    def drops(self) -> int:
+        return self._drops
+
+
+__all__ = ("v4l2FrameReader",)
@@ -0,0 +1,339 @@
+import os
+from bisect import bisect_left
+from ctypes import Structure, c_char, c_double
+from ctypes import c_uint32 as _u32
+from ctypes import c_uint64 as _u64
+from ctypes import sizeof
+from fcntl import F_GETFL, F_SETFL, fcntl
+from mmap import ACCESS_READ, PAGESIZE, mmap
+from queue import Queue
+from threading import Thread
+from typing import TYPE_CHECKING, Iterator
+
+from webcam import WebCamException
+from webcam.v4l2.frame import v4l2Frame, v4l2RawFrame
+
+if TYPE_CHECKING:
+    from webcam.v4l2 import v4l2WebCam
+
+_file_magic = b"WCAMREC1"
+_frame_magic = 0x4D415246  # "FRAM"
+_index_magic = 0x58444E49  # "INDX"
+
+
+# A recording is the file header, then each frame as a small header followed by
+# its payload exactly as the driver delivered it, then the index and a trailer
+# pointing at it. The index is only written on close; the frame headers let a
+# recording that was cut short be indexed by scanning it.
+class _rec_header(Structure):
+    _fields_ = [
+        ("magic", c_char * 8),
+        ("pixelformat", _u32),
+        ("width", _u32),
+        ("height", _u32),
+        ("reserved", _u32),
+    ]
+
+
+class _rec_frame(Structure):
+    _fields_ = [
+        ("magic", _u32),
+        ("length", _u32),
+        ("sequence", _u32),
+        ("flags", _u32),
+        ("timestamp", c_double),
+    ]
+
+
+class _rec_index(Structure):
+    _fields_ = [
+        ("timestamp", c_double),
+        ("offset", _u64),
+        ("length", _u32),
+        ("sequence", _u32),
+        ("flags", _u32),
+        ("reserved", _u32),
+    ]
+
+
+class _rec_trailer(Structure):
+    _fields_ = [
+        ("offset", _u64),
+        ("count", _u64),
+        ("magic", _u32),
+        ("reserved", _u32),
+    ]
+
+
+class v4l2Recorder:
+    # Frames are copied out of the driver's buffer into large page-aligned
+    # chunks, and a writer thread writes each chunk once it is full, so the
+    # capture thread never waits on the disk unless all chunks are pending.
+    def __init__(
+        self,
+        path: str,
+        camera: "v4l2WebCam",
+        chunk_size: int = 4 << 20,
+        chunks: int = 4,
+        direct: bool = False,
+    ) -> None:
+        if chunks < 2:
+            raise WebCamException("a recorder needs at least 2 chunks")
+        self._path = path
+        self._camera = camera
+        self._chunk_size = -(-chunk_size // PAGESIZE) * PAGESIZE
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+        self._direct = False
+        if direct:
+            # O_DIRECT bypasses the page cache, which hours of video would only
+            # evict everything else from. Not every file system supports it.
+            try:
+                self._fd = os.open(path, flags | os.O_DIRECT, 0o644)
+                self._direct = True
+            except OSError:
+                pass
+        if not self._direct:
+            self._fd = os.open(path, flags, 0o644)
+        self._chunks = [mmap(-1, self._chunk_size) for _ in range(chunks)]
+        self._free: Queue[mmap] = Queue()
+        for chunk in self._chunks[1:]:
+            self._free.put(chunk)
+        self._pending: Queue[tuple[mmap, int] | None] = Queue()
+        self._chunk = self._chunks[0]
+        self._pos = 0
+        self._offset = 0
+        self._index: list[tuple[float, int, int, int, int]] = []
+        self._frame = _rec_frame(magic=_frame_magic)
+        self._frame_view = memoryview(self._frame).cast("B")
+        self._stalls = 0
+        self._error: BaseException | None = None
+        self._closed = False
+        width, height = camera.size
+        header = _rec_header(_file_magic, camera.pixelformat, width, height)
+        self._put(memoryview(header).cast("B"))
+        self._writer = Thread(target=self._write, name=f"{path} writer", daemon=True)
+        self._writer.start()
+
+    def __enter__(self) -> "v4l2Recorder":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _write(self) -> None:
+        while (item := self._pending.get()) is not None:
+            chunk, length = item
+            try:
+                if self._error is None:
+                    if self._direct and length % PAGESIZE:
+                        # Only the last chunk is partial, and O_DIRECT wants
+                        # whole pages.
+                        fcntl(
+                            self._fd, F_SETFL, fcntl(self._fd, F_GETFL) & ~os.O_DIRECT
+                        )
+                        self._direct = False
+                    with memoryview(chunk) as view:
+                        written = 0
+                        while written < length:
+                            written += os.write(self._fd, view[written:length])
+            except OSError as exc:
+                self._error = exc
+            self._free.put(chunk)
+
+    def _submit(self) -> None:
+        self._pending.put((self._chunk, self._pos))
+        if self._free.empty():
+            self._stalls += 1
+        self._chunk = self._free.get()
+        self._pos = 0
+
+    def _put(self, data: memoryview) -> None:
+        # A frame may span chunks, so the chunk size does not bound it.
+        size, done = len(data), 0
+        while done < size:
+            take = min(self._chunk_size - self._pos, size - done)
+            self._chunk[self._pos : self._pos + take] = data[done : done + take]
+            self._pos += take
+            done += take
+            if self._pos == self._chunk_size:
+                self._submit()
+        self._offset += size
+
+    def record(self, frame: v4l2Frame | v4l2RawFrame) -> None:
+        if self._closed:
+            raise WebCamException(f"recording {self._path} is closed")
+        if self._error is not None:
+            raise WebCamException(f"writing {self._path} failed: {self._error}")
+        # The planes of a multi-planar frame are stored one after the other.
+        if isinstance(frame, v4l2Frame):
+            planes = [memoryview(plane).cast("B") for plane in frame.planes]
+        else:
+            planes = [memoryview(frame.data).cast("B")]
+        length = sum(len(plane) for plane in planes)
+        header = self._frame
+        header.length = length
+        header.sequence = frame.sequence
+        header.flags = frame.flags
+        header.timestamp = frame.timestamp
+        self._put(self._frame_view)
+        self._index.append(
+            (frame.timestamp, self._offset, length, frame.sequence, frame.flags)
+        )
+        for plane in planes:
+            self._put(plane)
+
+    def run(self, duration: float | None = None, frames: int | None = None) -> None:
+        start = None
+        count = 0
+        while frames is None or count < frames:
+            with self._camera.capture_frame() as frame:
+                self.record(frame)
+                if start is None:
+                    start = frame.timestamp
+                elif duration is not None and frame.timestamp - start >= duration:
+                    break
+            count += 1
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._pos:
+            self._submit()
+        self._pending.put(None)
+        self._writer.join()
+        for chunk in self._chunks:
+            chunk.close()
+        try:
+            if self._error is not None:
+                raise WebCamException(f"writing {self._path} failed: {self._error}")
+            if self._direct:
+                fcntl(self._fd, F_SETFL, fcntl(self._fd, F_GETFL) & ~os.O_DIRECT)
+            index = (_rec_index * len(self._index))()
+            for entry, (timestamp, offset, length, sequence, flags) in zip(
+                index, self._index
+            ):
+                entry.timestamp, entry.offset, entry.length = timestamp, offset, length
+                entry.sequence, entry.flags = sequence, flags
+            trailer = _rec_trailer(self._offset, len(self._index), _index_magic)
+            os.write(self._fd, bytes(index) + bytes(trailer))
+            os.fsync(self._fd)
+        finally:
+            os.close(self._fd)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def stalls(self) -> int:
+        # How often the capture thread had to wait for the writer.
+        return self._stalls
+
+
+class v4l2Recording:
+    # The whole file is mapped once; frames are views of the mapping, so reading
+    # one touches only its own pages.
+    def __init__(self, path: str) -> None:
+        self._path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap(f.fileno(), 0, access=ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        if len(self._mmap) < sizeof(_rec_header):
+            self.close()
+            raise WebCamException(f"{path} is not a recording")
+        header = _rec_header.from_buffer_copy(self._mmap)
+        if header.magic != _file_magic:
+            self.close()
+            raise WebCamException(f"{path} is not a recording")
+        self.pixelformat = header.pixelformat
+        self.size = (header.width, header.height)
+        self._index = self._load_index()
+        self._timestamps = [entry.timestamp for entry in self._index]
+
+    def __enter__(self) -> "v4l2Recording":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, index: int) -> v4l2RawFrame:
+        entry = self._index[index]
+        data = self._view[entry.offset : entry.offset + entry.length]
+        return v4l2RawFrame(data, entry.timestamp, entry.sequence, entry.flags)
+
+    def __iter__(self) -> Iterator[v4l2RawFrame]:
+        for i in range(len(self._index)):
+            yield self[i]
+
+    def _load_index(self) -> "list[_rec_index]":
+        size = len(self._mmap)
+        if size >= sizeof(_rec_header) + sizeof(_rec_trailer):
+            trailer = _rec_trailer.from_buffer_copy(
+                self._mmap, size - sizeof(_rec_trailer)
+            )
+            end = trailer.offset + trailer.count * sizeof(_rec_index)
+            if trailer.magic == _index_magic and end + sizeof(_rec_trailer) == size:
+                array = _rec_index * trailer.count
+                return list(array.from_buffer_copy(self._mmap, trailer.offset))
+        return self._scan()
+
+    def _scan(self) -> "list[_rec_index]":
+        # Without a trailer the recording was not closed; every complete frame
+        # up to where writing stopped is still found.
+        index = []
+        offset = sizeof(_rec_header)
+        size = len(self._mmap)
+        while offset + sizeof(_rec_frame) <= size:
+            frame = _rec_frame.from_buffer_copy(self._mmap, offset)
+            offset += sizeof(_rec_frame)
+            if frame.magic != _frame_magic or offset + frame.length > size:
+                break
+            index.append(
+                _rec_index(
+                    frame.timestamp,
+                    offset,
+                    frame.length,
+                    frame.sequence,
+                    frame.flags,
+                )
+            )
+            offset += frame.length
+        return index
+
+    def seek(self, timestamp: float) -> int:
+        # Position of the first frame taken at or after `timestamp`.
+        return bisect_left(self._timestamps, timestamp)
+
+    def between(self, start: float, end: float) -> Iterator[v4l2RawFrame]:
+        for i in range(self.seek(start), len(self._index)):
+            if self._index[i].timestamp >= end:
+                break
+            yield self[i]
+
+    def close(self) -> None:
+        # Frames handed out keep the mapping open and must be released first.
+        if self._mmap is None:
+            return
+        self._view.release()
+        self._mmap.close()
+        self._mmap = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def duration(self) -> float:
+        if not self._timestamps:
+            return 0.0
+        return self._timestamps[-1] - self._timestamps[0]
+
+
+__all__ = ("v4l2Recorder", "v4l2Recording")
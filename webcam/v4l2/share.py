@@ -0,0 +1,503 @@
+import errno
+import os
+import select
+import socket
+import time
+from collections import namedtuple
+from ctypes import Structure, c_double
+from ctypes import c_uint32 as _u32
+from ctypes import c_uint64 as _u64
+from ctypes import sizeof
+from mmap import PROT_READ, mmap
+from threading import Event, Thread
+from typing import TYPE_CHECKING, Iterator
+
+from webcam import WebCamException
+from webcam.ioctl import _IOW
+from webcam.v4l2.videodev2 import VIDEO_MAX_PLANES
+
+if TYPE_CHECKING:
+    from webcam.v4l2 import v4l2Frame, v4l2WebCam
+
+v4l2DmabufPlane = namedtuple("v4l2DmabufPlane", "fd length bytesused data_offset")
+
+
+# /usr/include/linux/dma-buf.h:54
+class _dma_buf_sync(Structure):
+    _fields_ = [("flags", _u64)]
+
+
+DMA_BUF_SYNC_READ = 1 << 0
+DMA_BUF_SYNC_START = 0 << 2
+DMA_BUF_SYNC_END = 1 << 2
+DMA_BUF_IOCTL_SYNC = _IOW("b", 0, _dma_buf_sync)
+
+
+class _share_plane(Structure):
+    _fields_ = [
+        ("length", _u32),
+        ("bytesused", _u32),
+        ("data_offset", _u32),
+        ("reserved", _u32),
+    ]
+
+
+# Sent for every frame handed to a peer, with the buffer's dmabufs attached the
+# first time that buffer goes to the peer only. `generation` changes whenever
+# the buffers are reallocated, which invalidates every dmabuf sent before.
+class _share_frame(Structure):
+    _fields_ = [
+        ("generation", _u32),
+        ("index", _u32),
+        ("sequence", _u32),
+        ("flags", _u32),
+        ("timestamp", c_double),
+        ("pixelformat", _u32),
+        ("width", _u32),
+        ("height", _u32),
+        ("bytesperline", _u32),
+        ("num_planes", _u32),
+        ("reserved", _u32),
+        ("planes", _share_plane * VIDEO_MAX_PLANES),
+    ]
+
+
+# Sent back by a peer once it is done with a buffer.
+class _share_release(Structure):
+    _fields_ = [
+        ("generation", _u32),
+        ("index", _u32),
+    ]
+
+
+def _sync(fd: int, flags: int) -> None:
+    # Brackets CPU access so the exporter can keep caches coherent. Anything
+    # that is not a dmabuf, like the simulated device's memfds, needs none.
+    try:
+        DMA_BUF_IOCTL_SYNC(fd, _dma_buf_sync(flags))
+    except OSError as exc:
+        if exc.errno != errno.ENOTTY:
+            raise
+
+
+class _v4l2DmabufPeer:
+    __slots__ = ("sock", "inflight", "exported")
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        # Buffers the peer holds, and those whose dmabufs it already has.
+        self.inflight: set[int] = set()
+        self.exported: set[int] = set()
+
+
+class v4l2DmabufServer(Thread):
+    # Hands the buffers of one camera to other processes over a Unix socket
+    # without copying them: each peer receives the dmabufs of a buffer once and
+    # a small message per frame. A buffer stays dequeued until every peer it
+    # was sent to has returned it, and one is always left with the driver.
+    def __init__(self, camera: "v4l2WebCam", path: str, max_inflight: int = 2) -> None:
+        super().__init__(name=f"{camera!r} dmabuf server", daemon=True)
+        if max_inflight < 1:
+            raise WebCamException("peers must be allowed to hold a buffer")
+        self._camera = camera
+        self._path = path
+        self._max_inflight = max_inflight
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._listener.bind(path)
+        except OSError as exc:
+            self._listener.close()
+            raise WebCamException(f"can not listen on {path!r}: {exc.strerror}")
+        self._listener.listen()
+        self._listener.setblocking(False)
+        self._peers: dict[int, _v4l2DmabufPeer] = {}
+        self._held: dict[int, list] = {}
+        self._dmabufs: list[tuple[int, ...]] = []
+        self._generation = 0
+        self._message = _share_frame()
+        self._message_view = memoryview(self._message).cast("B")
+        self._poller = select.poll()
+        self._frames = 0
+        self._drops = 0
+        self._stopped = Event()
+        self._closed = False
+
+    def __enter__(self) -> "v4l2DmabufServer":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _export(self) -> None:
+        self._dmabufs = self._camera.export_buffers()
+        self._generation += 1
+        for peer in self._peers.values():
+            peer.exported.clear()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            self._peers[sock.fileno()] = _v4l2DmabufPeer(sock)
+            self._poller.register(sock, select.POLLIN)
+
+    def _disconnect(self, peer: _v4l2DmabufPeer) -> None:
+        # Whatever the peer still held goes back to the driver.
+        self._poller.unregister(peer.sock)
+        del self._peers[peer.sock.fileno()]
+        for index in peer.inflight:
+            self._unref(index)
+        peer.inflight.clear()
+        peer.sock.close()
+
+    def _unref(self, index: int) -> None:
+        entry = self._held[index]
+        entry[1] -= 1
+        if not entry[1]:
+            del self._held[index]
+            entry[0].release()
+
+    def _receive(self, peer: _v4l2DmabufPeer) -> None:
+        while True:
+            try:
+                data = peer.sock.recv(sizeof(_share_release))
+            except BlockingIOError:
+                return
+            except OSError:
+                data = b""
+            if len(data) != sizeof(_share_release):
+                self._disconnect(peer)
+                return
+            message = _share_release.from_buffer_copy(data)
+            if message.generation != self._generation:
+                continue
+            if message.index in peer.inflight:
+                peer.inflight.discard(message.index)
+                self._unref(message.index)
+
+    def _describe(self, frame: "v4l2Frame") -> None:
+        camera = self._camera
+        message = self._message
+        buffer = frame._buffer
+        message.generation = self._generation
+        message.index = buffer.index
+        message.sequence = buffer.sequence
+        message.flags = buffer.flags
+        message.timestamp = frame.timestamp
+        message.pixelformat = camera.pixelformat
+        message.width, message.height = camera.size
+        message.bytesperline = camera._bytesperline
+        if camera._mplane:
+            message.num_planes = buffer.length
+            for plane, src in zip(message.planes, buffer.m.planes[: buffer.length]):
+                plane.length, plane.bytesused = src.length, src.bytesused
+                plane.data_offset = src.data_offset
+        else:
+            message.num_planes = 1
+            plane = message.planes[0]
+            plane.length, plane.bytesused = buffer.length, buffer.bytesused
+            plane.data_offset = 0
+
+    def _dispatch(self) -> None:
+        camera = self._camera
+        try:
+            frame = camera._dequeue()
+        except BlockingIOError:
+            return
+        index = frame.index
+        ready = [
+            peer
+            for peer in self._peers.values()
+            if len(peer.inflight) < self._max_inflight
+        ]
+        # Buffers are not handed out while a source change waits for them to
+        # come back, and the driver always keeps one to capture into.
+        if (
+            not ready
+            or camera._source_changed
+            or len(self._held) + 2 > len(self._dmabufs)
+        ):
+            if self._peers:
+                self._drops += 1
+            frame.release()
+            return
+        self._describe(frame)
+        flags = socket.MSG_DONTWAIT | socket.MSG_NOSIGNAL
+        refs = 0
+        for peer in ready:
+            try:
+                if index in peer.exported:
+                    peer.sock.send(self._message_view, flags)
+                else:
+                    socket.send_fds(
+                        peer.sock, [self._message_view], self._dmabufs[index], flags
+                    )
+            except BlockingIOError:
+                continue
+            except OSError:
+                self._disconnect(peer)
+                continue
+            peer.exported.add(index)
+            peer.inflight.add(index)
+            refs += 1
+        if not refs:
+            self._drops += 1
+            frame.release()
+            return
+        self._held[index] = [frame, refs]
+        self._frames += 1
+
+    def run(self) -> None:
+        camera = self._camera
+        if not camera.is_open:
+            camera.open()
+        self._export()
+        fd = camera.fileno()
+        self._poller.register(fd, select.POLLIN | select.POLLPRI)
+        self._poller.register(self._listener, select.POLLIN)
+        listener = self._listener.fileno()
+        while not self._stopped.is_set():
+            for ready, mask in self._poller.poll(100):
+                if ready == fd:
+                    if mask & select.POLLPRI:
+                        camera.process_events()
+                    if mask & select.POLLIN:
+                        self._dispatch()
+                elif ready == listener:
+                    self._accept()
+                elif (peer := self._peers.get(ready)) is not None:
+                    self._receive(peer)
+            if camera._source_changed and not self._held:
+                # New buffers mean new dmabufs, sent again to every peer.
+                camera._apply_source_change()
+                self._export()
+        self._poller.unregister(fd)
+        self._poller.unregister(self._listener)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.stop()
+        for peer in list(self._peers.values()):
+            self._disconnect(peer)
+        self._listener.close()
+        if not self._path.startswith("\0"):
+            try:
+                os.unlink(self._path)
+            except FileNotFoundError:
+                pass
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def peers(self) -> int:
+        return len(self._peers)
+
+    @property
+    def frames(self) -> int:
+        # Frames handed to at least one peer.
+        return self._frames
+
+    @property
+    def drops(self) -> int:
+        # Frames no peer could take.
+        return self._drops
+
+
+class v4l2DmabufFrame:
+    # Describes a buffer the server keeps dequeued for this client. `fds` are
+    # the buffer's dmabufs, owned by the client and valid until the buffers are
+    # reallocated; pass them on to a GPU or an encoder, or `map()` them.
+    def __init__(
+        self, client: "v4l2DmabufClient", message: _share_frame, fds: tuple[int, ...]
+    ) -> None:
+        self._client = client
+        self._views = None
+        self._released = False
+        self.generation = message.generation
+        self.index = message.index
+        self.timestamp = message.timestamp
+        self.sequence = message.sequence
+        self.flags = message.flags
+        self.pixelformat = message.pixelformat
+        self.size = (message.width, message.height)
+        self.bytesperline = message.bytesperline
+        self.planes = tuple(
+            v4l2DmabufPlane(fd, plane.length, plane.bytesused, plane.data_offset)
+            for fd, plane in zip(fds, message.planes[: message.num_planes])
+        )
+
+    def __del__(self) -> None:
+        self.release()
+
+    def __enter__(self) -> "v4l2DmabufFrame":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(index={self.index}, "
+            f"sequence={self.sequence}, released={self._released})"
+        )
+
+    def map(self) -> tuple[memoryview, ...]:
+        # Each buffer is mapped once by the client and reused for every frame.
+        if self._released:
+            raise WebCamException("frame has already been released")
+        if self._views is None:
+            maps = self._client._map(self.index, self.planes)
+            for plane in self.planes:
+                _sync(plane.fd, DMA_BUF_SYNC_START | DMA_BUF_SYNC_READ)
+            self._views = tuple(
+                memoryview(m)[plane.data_offset : plane.bytesused]
+                for m, plane in zip(maps, self.planes)
+            )
+        return self._views
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        if self._views is not None:
+            for view in self._views:
+                view.release()
+            self._views = None
+            for plane in self.planes:
+                _sync(plane.fd, DMA_BUF_SYNC_END | DMA_BUF_SYNC_READ)
+        self._client._release(self)
+
+    @property
+    def data(self) -> memoryview:
+        return self.map()[0]
+
+    @property
+    def fds(self) -> tuple[int, ...]:
+        return tuple(plane.fd for plane in self.planes)
+
+    @property
+    def bytesused(self) -> int:
+        return sum(plane.bytesused - plane.data_offset for plane in self.planes)
+
+    @property
+    def latency(self) -> float:
+        # Only meaningful for drivers stamping with CLOCK_MONOTONIC.
+        return time.monotonic() - self.timestamp
+
+
+class v4l2DmabufClient:
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._sock.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            self._sock.close()
+            raise WebCamException(f"no dmabuf server at {path!r}")
+        self._fds: dict[int, tuple[int, ...]] = {}
+        self._maps: dict[int, list[mmap]] = {}
+        self._generation = None
+        self._release_message = _share_release()
+        self._frames = 0
+        self._eof = False
+
+    def __enter__(self) -> "v4l2DmabufClient":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(path={self._path!r})"
+
+    def _forget(self, index: int) -> None:
+        for m in self._maps.pop(index, ()):
+            m.close()
+        for fd in self._fds.pop(index, ()):
+            os.close(fd)
+
+    def _map(self, index: int, planes: tuple[v4l2DmabufPlane, ...]) -> list[mmap]:
+        maps = self._maps.get(index)
+        if maps is None:
+            maps = self._maps[index] = [
+                mmap(plane.fd, plane.length, prot=PROT_READ) for plane in planes
+            ]
+        return maps
+
+    def _release(self, frame: v4l2DmabufFrame) -> None:
+        # Buffers of an earlier generation are no longer the server's concern.
+        if self._sock.fileno() < 0 or frame.generation != self._generation:
+            return
+        message = self._release_message
+        message.generation, message.index = frame.generation, frame.index
+        try:
+            self._sock.send(message, socket.MSG_NOSIGNAL)
+        except OSError:
+            pass
+
+    def read(self, timeout: float | None = None) -> v4l2DmabufFrame | None:
+        if self._eof:
+            raise WebCamException(f"dmabuf server at {self._path!r} went away")
+        if timeout is not None:
+            if not select.select([self._sock], [], [], timeout)[0]:
+                return None
+        data, fds, _, _ = socket.recv_fds(
+            self._sock, sizeof(_share_frame), VIDEO_MAX_PLANES, socket.MSG_CMSG_CLOEXEC
+        )
+        if len(data) != sizeof(_share_frame):
+            for fd in fds:
+                os.close(fd)
+            self._eof = True
+            raise WebCamException(f"dmabuf server at {self._path!r} went away")
+        message = _share_frame.from_buffer_copy(data)
+        if message.generation != self._generation:
+            for index in list(self._fds):
+                self._forget(index)
+            self._generation = message.generation
+        if fds:
+            self._forget(message.index)
+            self._fds[message.index] = tuple(fds)
+        self._frames += 1
+        return v4l2DmabufFrame(self, message, self._fds[message.index])
+
+    def __iter__(self) -> Iterator[v4l2DmabufFrame]:
+        while True:
+            try:
+                yield self.read()
+            except WebCamException:
+                if self._eof:
+                    return
+                raise
+
+    def close(self) -> None:
+        # Frames still held are returned by the server when the socket closes.
+        for index in list(self._fds):
+            self._forget(index)
+        self._sock.close()
+
+    def fileno(self) -> int:
+        return self._sock.fileno()
+
+    @property
+    def frames(self) -> int:
+        return self._frames
+
+
+__all__ = (
+    "v4l2DmabufPlane",
+    "v4l2DmabufServer",
+    "v4l2DmabufFrame",
+    "v4l2DmabufClient",
+)
@@ -4,6 +4,7 @@ from ctypes import c_int64 as _s64
 from ctypes import c_uint8 as _u8
 from ctypes import c_uint16 as _u16
 from ctypes import c_uint32 as _u32
+from ctypes import c_uint64 as _u64
 from ctypes import c_void_p
 from enum import IntEnum
 
@@ -122,6 +123,14 @@ class v4l2_rect(ctypes.Structure):
     ]
 
 
+# /usr/include/linux/videodev2.h:414
+class v4l2_fract(ctypes.Structure):
+    _fields_ = [
+        ("numerator", _u32),
+        ("denominator", _u32),
+    ]
+
+
 # /usr/include/linux/videodev2.h:435
 class v4l2_capability(ctypes.Structure):
     _fields_ = [
@@ -137,11 +146,36 @@ class v4l2_capability(ctypes.Structure):
 
 # /usr/include/linux/videodev2.h:446
 V4L2_CAP_VIDEO_CAPTURE = 0x00000001
+V4L2_CAP_VIDEO_OUTPUT = 0x00000002
+V4L2_CAP_VIDEO_OVERLAY = 0x00000004
+V4L2_CAP_VBI_CAPTURE = 0x00000010
+V4L2_CAP_VBI_OUTPUT = 0x00000020
+V4L2_CAP_SLICED_VBI_CAPTURE = 0x00000040
+V4L2_CAP_SLICED_VBI_OUTPUT = 0x00000080
+V4L2_CAP_RDS_CAPTURE = 0x00000100
+V4L2_CAP_VIDEO_OUTPUT_OVERLAY = 0x00000200
+V4L2_CAP_HW_FREQ_SEEK = 0x00000400
+V4L2_CAP_RDS_OUTPUT = 0x00000800
+V4L2_CAP_VIDEO_CAPTURE_MPLANE = 0x00001000
+V4L2_CAP_VIDEO_OUTPUT_MPLANE = 0x00002000
+V4L2_CAP_VIDEO_M2M_MPLANE = 0x00004000
+V4L2_CAP_VIDEO_M2M = 0x00008000
+V4L2_CAP_TUNER = 0x00010000
+V4L2_CAP_AUDIO = 0x00020000
+V4L2_CAP_RADIO = 0x00040000
+V4L2_CAP_MODULATOR = 0x00080000
+V4L2_CAP_SDR_CAPTURE = 0x00100000
+V4L2_CAP_EXT_PIX_FORMAT = 0x00200000
+V4L2_CAP_SDR_OUTPUT = 0x00400000
+V4L2_CAP_META_CAPTURE = 0x00800000
 
 # /usr/include/linux/videodev2.h:477
 V4L2_CAP_READWRITE = 0x01000000
 V4L2_CAP_STREAMING = 0x04000000
 V4L2_CAP_META_OUTPUT = 0x08000000
+V4L2_CAP_TOUCH = 0x10000000
+V4L2_CAP_IO_MC = 0x20000000
+V4L2_CAP_DEVICE_CAPS = 0x80000000
 
 
 # /usr/include/linux/videodev2.h:490
@@ -180,6 +214,87 @@ class v4l2_fmtdesc(ctypes.Structure):
     ]
 
 
+# /usr/include/linux/videodev2.h:820
+class v4l2_frmsizetypes(IntEnum):
+    V4L2_FRMSIZE_TYPE_DISCRETE = 1
+    V4L2_FRMSIZE_TYPE_CONTINUOUS = 2
+    V4L2_FRMSIZE_TYPE_STEPWISE = 3
+
+
+# /usr/include/linux/videodev2.h:826
+class v4l2_frmsize_discrete(ctypes.Structure):
+    _fields_ = [
+        ("width", _u32),
+        ("height", _u32),
+    ]
+
+
+# /usr/include/linux/videodev2.h:831
+class v4l2_frmsize_stepwise(ctypes.Structure):
+    _fields_ = [
+        ("min_width", _u32),
+        ("max_width", _u32),
+        ("step_width", _u32),
+        ("min_height", _u32),
+        ("max_height", _u32),
+        ("step_height", _u32),
+    ]
+
+
+# /usr/include/linux/videodev2.h:840
+class v4l2_frmsizeenum(ctypes.Structure):
+    class _v4l2_frmsizeenum_u0(ctypes.Union):
+        _fields_ = [
+            ("discrete", v4l2_frmsize_discrete),
+            ("stepwise", v4l2_frmsize_stepwise),
+        ]
+
+    _anonymous_ = ("_u0",)
+    _fields_ = [
+        ("index", _u32),
+        ("pixel_format", _u32),
+        ("type", _u32),  # enum v4l2_frmsizetypes
+        ("_u0", _v4l2_frmsizeenum_u0),
+        ("reserved", _u32 * 2),
+    ]
+
+
+# /usr/include/linux/videodev2.h:856
+class v4l2_frmivaltypes(IntEnum):
+    V4L2_FRMIVAL_TYPE_DISCRETE = 1
+    V4L2_FRMIVAL_TYPE_CONTINUOUS = 2
+    V4L2_FRMIVAL_TYPE_STEPWISE = 3
+
+
+# /usr/include/linux/videodev2.h:862
+class v4l2_frmival_stepwise(ctypes.Structure):
+    _fields_ = [
+        ("min", v4l2_fract),
+        ("max", v4l2_fract),
+        ("step", v4l2_fract),
+    ]
+
+
+# /usr/include/linux/videodev2.h:868
+class v4l2_frmivalenum(ctypes.Structure):
+    class _v4l2_frmivalenum_u0(ctypes.Union):
+        _fields_ = [
+            ("discrete", v4l2_fract),
+            ("stepwise", v4l2_frmival_stepwise),
+        ]
+
+    _anonymous_ = ("_u0",)
+    _fields_ = [
+        ("index", _u32),
+        ("pixel_format", _u32),
+        ("width", _u32),
+        ("height", _u32),
+        ("type", _u32),  # enum v4l2_frmivaltypes
+        ("_u0", _v4l2_frmivalenum_u0),
+        ("reserved", _u32 * 2),
+    ]
+
+
 # /usr/include/linux/videodev2.h:886
 class v4l2_timecode(ctypes.Structure):
     _fields_ = [
@@ -282,6 +397,7 @@ class v4l2_buffer(ctypes.Structure):
         ("field", _u32),
         ("timestamp", timeval),
         ("timecode", v4l2_timecode),
+        ("sequence", _u32),
         ("memory", _u32),
         ("m", _v4l2_buffer_m),
         ("length", _u32),
@@ -315,6 +431,18 @@ V4L2_BUF_FLAG_LAST = 0x00100000
 V4L2_BUF_FLAG_REQUEST_FD = 0x00800000
 
 
+# /usr/include/linux/videodev2.h:1131
+class v4l2_exportbuffer(ctypes.Structure):
+    _fields_ = [
+        ("type", _u32),
+        ("index", _u32),
+        ("plane", _u32),
+        ("flags", _u32),
+        ("fd", _s32),
+        ("reserved", _u32 * 11),
+    ]
+
+
 # /usr/include/linux/videodev2.h:1183
 class v4l2_clip(ctypes.Structure):
     pass
@@ -339,6 +467,70 @@ class v4l2_window(ctypes.Structure):
     ]
 
 
+# /usr/include/linux/videodev2.h:1196
+class v4l2_captureparm(ctypes.Structure):
+    _fields_ = [
+        ("capability", _u32),  # supported modes
+        ("capturemode", _u32),  # current mode
+        ("timeperframe", v4l2_fract),  # time per frame in seconds
+        ("extendedmode", _u32),
+        ("readbuffers", _u32),
+        ("reserved", _u32 * 4),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1206
+V4L2_MODE_HIGHQUALITY = 0x0001
+V4L2_CAP_TIMEPERFRAME = 0x1000
+
+
+# /usr/include/linux/videodev2.h:1209
+class v4l2_outputparm(ctypes.Structure):
+    _fields_ = [
+        ("capability", _u32),
+        ("outputmode", _u32),
+        ("timeperframe", v4l2_fract),
+        ("extendedmode", _u32),
+        ("writebuffers", _u32),
+        ("reserved", _u32 * 4),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1221
+class v4l2_cropcap(ctypes.Structure):
+    _fields_ = [
+        ("type", _u32),
+        ("bounds", v4l2_rect),
+        ("defrect", v4l2_rect),
+        ("pixelaspect", v4l2_fract),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1246
+class v4l2_selection(ctypes.Structure):
+    _fields_ = [
+        ("type", _u32),
+        ("target", _u32),
+        ("flags", _u32),
+        ("r", v4l2_rect),
+        ("reserved", _u32 * 9),
+    ]
+
+
+# /usr/include/linux/v4l2-common.h:66
+V4L2_SEL_TGT_CROP = 0x0000
+V4L2_SEL_TGT_CROP_DEFAULT = 0x0001
+V4L2_SEL_TGT_CROP_BOUNDS = 0x0002
+V4L2_SEL_TGT_NATIVE_SIZE = 0x0003
+V4L2_SEL_TGT_COMPOSE = 0x0100
+V4L2_SEL_TGT_COMPOSE_DEFAULT = 0x0101
+V4L2_SEL_TGT_COMPOSE_BOUNDS = 0x0102
+V4L2_SEL_TGT_COMPOSE_PADDED = 0x0103
+V4L2_SEL_FLAG_GE = 1 << 0
+V4L2_SEL_FLAG_LE = 1 << 1
+V4L2_SEL_FLAG_KEEP_CONFIG = 1 << 2
+
+
 # /usr/include/linux/videodev2.h:1717
 class v4l2_control(ctypes.Structure):
     _fields_ = [
@@ -347,6 +539,51 @@ class v4l2_control(ctypes.Structure):
     ]
 
 
+# /usr/include/linux/videodev2.h:1722
+class v4l2_ext_control(ctypes.Structure):
+    class _v4l2_ext_control_u0(ctypes.Union):
+        _pack_ = 1
+        _fields_ = [
+            ("value", _s32),
+            ("value64", _s64),
+            ("string", ctypes.c_char_p),
+            ("ptr", c_void_p),
+        ]
+
+    _pack_ = 1
+    _anonymous_ = ("_u0",)
+    _fields_ = [
+        ("id", _u32),
+        ("size", _u32),
+        ("reserved2", _u32 * 1),
+        ("_u0", _v4l2_ext_control_u0),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1756
+class v4l2_ext_controls(ctypes.Structure):
+    _fields_ = [
+        ("which", _u32),  # also ctrl_class
+        ("count", _u32),
+        ("error_idx", _u32),
+        ("request_fd", _s32),
+        ("reserved", _u32 * 1),
+        ("controls", ctypes.POINTER(v4l2_ext_control)),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1768
+V4L2_CTRL_ID_MASK = 0x0FFFFFFF
+V4L2_CTRL_MAX_DIMS = 4
+V4L2_CTRL_WHICH_CUR_VAL = 0
+V4L2_CTRL_WHICH_DEF_VAL = 0x0F000000
+V4L2_CTRL_WHICH_REQUEST_VAL = 0x0F010000
+
+
+def V4L2_CTRL_ID2CLASS(id: int) -> int:
+    return id & 0x0FFF0000
+
+
 # /usr/include/linux/videodev2.h:1776
 class v4l2_ctrl_type(IntEnum):
     V4L2_CTRL_TYPE_INTEGER = 1
@@ -400,6 +637,61 @@ class v4l2_queryctrl(ctypes.Structure):
     ]
 
 
+# /usr/include/linux/videodev2.h:1837
+class v4l2_query_ext_ctrl(ctypes.Structure):
+    _fields_ = [
+        ("id", _u32),
+        ("type", _u32),
+        ("name", _u8 * 32),
+        ("minimum", _s64),
+        ("maximum", _s64),
+        ("step", _u64),
+        ("default_value", _s64),
+        ("flags", _u32),
+        ("elem_size", _u32),
+        ("elems", _u32),
+        ("nr_of_dims", _u32),
+        ("dims", _u32 * V4L2_CTRL_MAX_DIMS),
+        ("reserved", _u32 * 32),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1854
+class v4l2_querymenu(ctypes.Structure):
+    class _v4l2_querymenu_u0(ctypes.Union):
+        _pack_ = 1
+        _fields_ = [
+            ("name", _u8 * 32),
+            ("value", _s64),
+        ]
+
+    _pack_ = 1
+    _anonymous_ = ("_u0",)
+    _fields_ = [
+        ("id", _u32),
+        ("index", _u32),
+        ("_u0", _v4l2_querymenu_u0),
+        ("reserved", _u32),
+    ]
+
+
+# /usr/include/linux/videodev2.h:1865
+V4L2_CTRL_FLAG_DISABLED = 0x0001
+V4L2_CTRL_FLAG_GRABBED = 0x0002
+V4L2_CTRL_FLAG_READ_ONLY = 0x0004
+V4L2_CTRL_FLAG_UPDATE = 0x0008
+V4L2_CTRL_FLAG_INACTIVE = 0x0010
+V4L2_CTRL_FLAG_SLIDER = 0x0020
+V4L2_CTRL_FLAG_WRITE_ONLY = 0x0040
+V4L2_CTRL_FLAG_VOLATILE = 0x0080
+V4L2_CTRL_FLAG_HAS_PAYLOAD = 0x0100
+V4L2_CTRL_FLAG_EXECUTE_ON_WRITE = 0x0200
+V4L2_CTRL_FLAG_MODIFY_LAYOUT = 0x0400
+V4L2_CTRL_FLAG_DYNAMIC_ARRAY = 0x0800
+V4L2_CTRL_FLAG_NEXT_CTRL = 0x80000000
+V4L2_CTRL_FLAG_NEXT_COMPOUND = 0x40000000
+
+
 # /usr/include/linux/videodev2.h:2131
 class v4l2_vbi_format(ctypes.Structure):
     _fields_ = [
@@ -460,6 +752,10 @@ class v42l_pix_format_mplane(ctypes.Structure):
     ]
 
 
+# Under the name the header gives it.
+v4l2_pix_format_mplane = v42l_pix_format_mplane
+
+
 # /usr/include/linux/videodev2.h:2307
 class v4l2_sdr_format(ctypes.Structure):
     _fields_ = [
@@ -497,6 +793,119 @@ class v4l2_format(ctypes.Structure):
     ]
 
 
+# /usr/include/linux/videodev2.h:2352
+class v4l2_streamparm(ctypes.Structure):
+    class _v4l2_streamparm_parm(ctypes.Union):
+        _fields_ = [
+            ("capture", v4l2_captureparm),
+            ("output", v4l2_outputparm),
+            ("raw_data", _u8 * 200),
+        ]
+
+    _fields_ = [
+        ("type", _u32),  # enum v4l2_buf_type
+        ("parm", _v4l2_streamparm_parm),
+    ]
+
+
+# /usr/include/linux/videodev2.h:2365
+V4L2_EVENT_ALL = 0
+V4L2_EVENT_VSYNC = 1
+V4L2_EVENT_EOS = 2
+V4L2_EVENT_CTRL = 3
+V4L2_EVENT_FRAME_SYNC = 4
+V4L2_EVENT_SOURCE_CHANGE = 5
+V4L2_EVENT_MOTION_DET = 6
+V4L2_EVENT_PRIVATE_START = 0x08000000
+
+# /usr/include/linux/videodev2.h:2380
+V4L2_EVENT_CTRL_CH_VALUE = 1 << 0
+V4L2_EVENT_CTRL_CH_FLAGS = 1 << 1
+V4L2_EVENT_CTRL_CH_RANGE = 1 << 2
+V4L2_EVENT_CTRL_CH_DIMENSIONS = 1 << 3
+
+
+# /usr/include/linux/videodev2.h:2385
+class v4l2_event_ctrl(ctypes.Structure):
+    class _v4l2_event_ctrl_u0(ctypes.Union):
+        _fields_ = [
+            ("value", _s32),
+            ("value64", _s64),
+        ]
+
+    _anonymous_ = ("_u0",)
+    _fields_ = [
+        ("changes", _u32),
+        ("type", _u32),
+        ("_u0", _v4l2_event_ctrl_u0),
+        ("flags", _u32),
+        ("minimum", _s32),
+        ("maximum", _s32),
+        ("step", _s32),
+        ("default_value", _s32),
+    ]
+
+
+# /usr/include/linux/videodev2.h:2399
+class v4l2_event_frame_sync(ctypes.Structure):
+    _fields_ = [
+        ("frame_sequence", _u32),
+    ]
+
+
+V4L2_EVENT_SRC_CH_RESOLUTION = 1 << 0
+
+
+# /usr/include/linux/videodev2.h:2405
+class v4l2_event_src_change(ctypes.Structure):
+    _fields_ = [
+        ("changes", _u32),
+    ]
+
+
+class timespec(ctypes.Structure):
+    _fields_ = [
+        ("tv_sec", _s64),
+        ("tv_nsec", _s64),
+    ]
+
+
+# /usr/include/linux/videodev2.h:2425
+class v4l2_event(ctypes.Structure):
+    class _v4l2_event_u(ctypes.Union):
+        _fields_ = [
+            ("ctrl", v4l2_event_ctrl),
+            ("frame_sync", v4l2_event_frame_sync),
+            ("src_change", v4l2_event_src_change),
+            ("data", _u8 * 64),
+        ]
+
+    _fields_ = [
+        ("type", _u32),
+        ("u", _v4l2_event_u),
+        ("pending", _u32),
+        ("sequence", _u32),
+        ("timestamp", timespec),
+        ("id", _u32),
+        ("reserved", _u32 * 8),
+    ]
+
+
+# /usr/include/linux/videodev2.h:2442
+V4L2_EVENT_SUB_FL_SEND_INITIAL = 1 << 0
+V4L2_EVENT_SUB_FL_ALLOW_FEEDBACK = 1 << 1
+
+
+# /usr/include/linux/videodev2.h:2445
+class v4l2_event_subscription(ctypes.Structure):
+    _fields_ = [
+        ("type", _u32),
+        ("id", _u32),
+        ("flags", _u32),
+        ("reserved", _u32 * 5),
+    ]
+
+
 # /usr/include/linux/videodev2.h:2523
 VIDIOC_QUERYCAP = _IOR("V", 0, v4l2_capability)
 VIDIOC_ENUM_FMT = _IOWR("V", 2, v4l2_fmtdesc)
@@ -505,10 +914,26 @@ VIDIOC_S_FMT = _IOWR("V", 5, v4l2_format)
 VIDIOC_REQBUFS = _IOWR("V", 8, v4l2_requestbuffers)
 VIDIOC_QUERYBUF = _IOWR("V", 9, v4l2_buffer)
 VIDIOC_QBUF = _IOWR("V", 15, v4l2_buffer)
+VIDIOC_EXPBUF = _IOWR("V", 16, v4l2_exportbuffer)
 VIDIOC_DQBUF = _IOWR("V", 17, v4l2_buffer)
 VIDIOC_STREAMON = _IOW("V", 18, ctypes.c_int)
 VIDIOC_STREAMOFF = _IOW("V", 19, ctypes.c_int)
+VIDIOC_G_PARM = _IOWR("V", 21, v4l2_streamparm)
+VIDIOC_S_PARM = _IOWR("V", 22, v4l2_streamparm)
 VIDIOC_G_CTRL = _IOWR("V", 27, v4l2_control)
 VIDIOC_S_CTRL = _IOWR("V", 28, v4l2_control)
 VIDIOC_QUERYCTRL = _IOWR("V", 36, v4l2_queryctrl)
+VIDIOC_QUERYMENU = _IOWR("V", 37, v4l2_querymenu)
+VIDIOC_CROPCAP = _IOWR("V", 58, v4l2_cropcap)
 VIDIOC_TRY_FMT = _IOWR("V", 64, v4l2_format)
+VIDIOC_G_EXT_CTRLS = _IOWR("V", 71, v4l2_ext_controls)
+VIDIOC_S_EXT_CTRLS = _IOWR("V", 72, v4l2_ext_controls)
+VIDIOC_TRY_EXT_CTRLS = _IOWR("V", 73, v4l2_ext_controls)
+VIDIOC_ENUM_FRAMESIZES = _IOWR("V", 74, v4l2_frmsizeenum)
+VIDIOC_ENUM_FRAMEINTERVALS = _IOWR("V", 75, v4l2_frmivalenum)
+VIDIOC_DQEVENT = _IOR("V", 89, v4l2_event)
+VIDIOC_SUBSCRIBE_EVENT = _IOW("V", 90, v4l2_event_subscription)
+VIDIOC_UNSUBSCRIBE_EVENT = _IOW("V", 91, v4l2_event_subscription)
+VIDIOC_G_SELECTION = _IOWR("V", 94, v4l2_selection)
+VIDIOC_S_SELECTION = _IOWR("V", 95, v4l2_selection)
+VIDIOC_QUERY_EXT_CTRL = _IOWR("V", 103, v4l2_query_ext_ctrl)